@@ -1,11 +1,27 @@
 #!/bin/bash
+# Usage: build-solidity.sh [--compile_only | --extract_only] [solc_cache.py arguments]
 pushd $(dirname $0)/..
 
+COMPILE=1
+EXTRACT=1
+if [ "$1" == "--compile_only" ]; then
+    EXTRACT=0
+    shift
+elif [ "$1" == "--extract_only" ]; then
+    COMPILE=0
+    shift
+fi
+
 mkdir -p artifacts
 
 set -e
-.downloads/solc-0.8.20 $(cat src/solidity/files_to_compile.txt) --allow-paths .=., --optimize --optimize-runs 200 --overwrite --combined-json abi,bin -o artifacts
-scripts/extract_artifacts.py
+if [ $COMPILE -eq 1 ]; then
+    # Compiles only when a source, one of its imports, the compiler or its flags changed.
+    scripts/solc_cache.py --solc .downloads/solc-0.8.20 --optimize_runs 200 "$@"
+fi
+if [ $EXTRACT -eq 1 ]; then
+    scripts/extract_artifacts.py --output_bundle artifacts/artifacts.bundle
+fi
 set +e
 
 popd
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+"""
+Compiles the Cairo contracts concurrently, reusing the previous output of a contract when
+neither the Cairo sources nor the compiler changed.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXECUTABLE = os.path.join(ROOT_DIR, ".downloads", "cairo", "bin", "starknet-compile")
+EXPECTED_EXECUTABLE_VERSION = "starknet-compile 2.6.3"
+
+CONTRACT_PATHS = [
+    "src::strk::erc20_lockable::ERC20Lockable",
+    "src::update_712_vars_eic::Update712VarsEIC",
+    "src::roles_init_eic::RolesExternalInitializer",
+    "src::legacy_bridge_eic::LegacyBridgeUpgradeEIC",
+    "src::token_bridge::TokenBridge",
+    "openzeppelin::token::erc20::presets::erc20_votes_lock::ERC20VotesLock",
+    "openzeppelin::token::erc20_v070::erc20::ERC20",
+]
+
+
+class CompileResult(NamedTuple):
+    contract_path: str
+    output: str
+    seconds: float
+    cached: bool
+
+
+def compiler_version() -> str:
+    try:
+        executable_version = (
+            subprocess.check_output([EXECUTABLE, "--version"]).decode("utf-8").strip()
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        print("Setup Error! Run : 'sh ./scripts/setup.sh' to solve this problem.")
+        sys.exit(1)
+
+    assert executable_version == EXPECTED_EXECUTABLE_VERSION, (
+        f"Wrong version got: {executable_version}, Expected: {EXPECTED_EXECUTABLE_VERSION}."
+        "Run : 'sh ./scripts/setup.sh' to solve this problem."
+    )
+    return executable_version
+
+
+def sources_hash(crate_dir: str) -> str:
+    """
+    Hashes the Cairo sources of the project (the .cairo files and cairo_project.toml), including
+    their paths, in a deterministic order.
+    """
+    sha = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(crate_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if not (file_name.endswith(".cairo") or file_name == "cairo_project.toml"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            sha.update(os.path.relpath(path, crate_dir).encode("utf-8") + b"\0")
+            with open(path, "rb") as source_file:
+                sha.update(hashlib.sha256(source_file.read()).digest())
+    return sha.hexdigest()
+
+
+def contract_name(contract_path: str) -> str:
+    return contract_path.split("::")[-1]
+
+
+def compile_contract(
+    contract_path: str, crate_dir: str, output_dir: str, cache_dir: str, key: str
+) -> CompileResult:
+    start = time.perf_counter()
+    output = os.path.join(output_dir, f"{contract_name(contract_path)}.sierra")
+    contract_key = hashlib.sha256(f"{key}:{contract_path}".encode("utf-8")).hexdigest()
+    cached_output = os.path.join(cache_dir, f"{contract_key}.sierra")
+
+    cached = os.path.exists(cached_output)
+    if not cached:
+        tmp_path = f"{cached_output}.{os.getpid()}.tmp"
+        try:
+            subprocess.check_call(
+                [EXECUTABLE, crate_dir, "--contract-path", contract_path, tmp_path]
+            )
+            os.replace(tmp_path, cached_output)
+        finally:
+            # Don't leave a partial output in the cache when the compilation fails.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    shutil.copyfile(cached_output, output)
+    return CompileResult(
+        contract_path=contract_path,
+        output=output,
+        seconds=time.perf_counter() - start,
+        cached=cached,
+    )
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--contract_paths",
+        nargs="+",
+        default=CONTRACT_PATHS,
+        help="The contracts to compile (default: all the deployed contracts).",
+    )
+    parser.add_argument("--crate_dir", type=str, default="src")
+    parser.add_argument("--output_dir", type=str, default="cairo_contracts")
+    parser.add_argument("--cache_dir", type=str, default=".downloads/cairo_cache")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="The number of contracts compiled at once (default: the number of CPUs).",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    key = hashlib.sha256(
+        f"{compiler_version()}:{sources_hash(args.crate_dir)}".encode("utf-8")
+    ).hexdigest()
+    os.makedirs(args.output_dir, exist_ok=True)
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(
+                compile_contract,
+                contract_path=contract_path,
+                crate_dir=args.crate_dir,
+                output_dir=args.output_dir,
+                cache_dir=args.cache_dir,
+                key=key,
+            )
+            for contract_path in args.contract_paths
+        ]
+        results: List[CompileResult] = []
+        failed: List[str] = []
+        for contract_path, future in zip(args.contract_paths, futures):
+            try:
+                results.append(future.result())
+            except subprocess.CalledProcessError:
+                failed.append(contract_path)
+
+    for result in results:
+        status = "cached" if result.cached else "compiled"
+        print(f"{contract_name(result.contract_path):<30} {result.seconds:7.2f}s  {status}")
+    print(f"Total: {time.perf_counter() - start:.2f}s")
+    if len(failed) > 0:
+        print("Failed to compile: " + ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,38 @@ import sys
 import argparse
 import subprocess
 import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set
+
+try:
+    import tomllib
+except ImportError:
+    # Python < 3.11. tomli is installed as a pytest dependency.
+    import tomli as tomllib
 
 ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
 EXECUTABLE = os.path.join(ROOT_DIR, ".downloads", "cairo", "bin", "cairo-test")
 EXPECTED_EXECUTABLE_VERSION = "cairo-test 2.6.3"
 
+# A line of the cairo-test output reporting the result of a single test, e.g.
+# "test src::roles_test::test_foo ... ok (gas usage est.: 12345)".
+TEST_RESULT_RE = re.compile(
+    r"^test (?P<name>\S+) \.\.\. (?P<status>\w+)(?: \(gas usage est\.: (?P<gas>\d+)\))?"
+)
 
-def main():
-    parser = argparse.ArgumentParser(add_help=False)
-    _, args = parser.parse_known_args()
-    # Check version
+
+class Shard(NamedTuple):
+    modules: List[str]
+    returncode: int
+    output: str
+    seconds: float
+
+
+def check_version():
     try:
         executable_version = (
             subprocess.check_output([EXECUTABLE, "--version"]).decode("utf-8").strip()
@@ -27,6 +49,229 @@ def main():
         "Run : 'sh ./scripts/setup.sh' to solve this problem."
     )
 
+
+def crate_roots(project_dir: str) -> Dict[str, str]:
+    with open(os.path.join(project_dir, "cairo_project.toml"), "rb") as project_file:
+        return tomllib.load(project_file).get("crate_roots", {})
+
+
+def project_modules(project_dir: str) -> Dict[str, str]:
+    """
+    Returns the module path (e.g. src::strk::erc20_lockable_test) of every Cairo file of the
+    project, by file path.
+    """
+    modules = {}
+    for crate, root in crate_roots(project_dir).items():
+        root_dir = os.path.join(project_dir, root)
+        for dir_path, _, file_names in os.walk(root_dir):
+            for file_name in file_names:
+                if file_name.endswith(".cairo"):
+                    path = os.path.join(dir_path, file_name)
+                    parts = os.path.relpath(path, root_dir)[: -len(".cairo")].split(os.sep)
+                    modules[os.path.normpath(path)] = "::".join([crate, *parts])
+    return modules
+
+
+def read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def test_modules(modules: Dict[str, str]) -> List[str]:
+    return sorted(module for path, module in modules.items() if "#[test]" in read(path))
+
+
+def changed_test_modules(modules: Dict[str, str], changed_paths: List[str]) -> Optional[List[str]]:
+    """
+    Returns the test modules affected by the changed files, or None if all of them may be.
+    A module is considered to depend on every module whose name it mentions as a path segment
+    (e.g. super::token_bridge::TokenBridge), transitively.
+    """
+    changed = {os.path.normpath(path) for path in changed_paths}
+    if len(changed) == 0:
+        return []
+    if any(path not in modules for path in changed):
+        # A change outside the Cairo modules (e.g. cairo_project.toml) may affect every test.
+        return None
+    sources = {module: read(path) for path, module in modules.items()}
+    dirty: Set[str] = {modules[path] for path in changed}
+    while True:
+        names = {module.split("::")[-1] for module in dirty}
+        pattern = re.compile(r"(?:\b|::)(%s)::" % "|".join(map(re.escape, names)))
+        mentioning = {module for module, source in sources.items() if pattern.search(source)}
+        if mentioning <= dirty:
+            break
+        dirty |= mentioning
+    return [module for module in test_modules(modules) if module in dirty]
+
+
+def shard_groups(modules: Dict[str, str], selected: List[str], n_shards: int) -> List[List[str]]:
+    """
+    Splits the selected test modules into up to n_shards groups of about the same total source
+    size (a proxy for their test time), so that the cost of compiling the package is paid once per
+    group rather than once per module.
+    """
+    sizes = {module: os.path.getsize(path) for path, module in modules.items()}
+    groups: List[List[str]] = [[] for _ in range(min(n_shards, len(selected)))]
+    totals = [0] * len(groups)
+    for module in sorted(selected, key=lambda module: sizes[module], reverse=True):
+        index = totals.index(min(totals))
+        groups[index].append(module)
+        totals[index] += sizes[module]
+    return [sorted(group) for group in groups]
+
+
+def removable_test_modules(modules: Dict[str, str]) -> Set[str]:
+    """
+    Returns the test modules that no other module mentions (as in changed_test_modules), and may
+    hence be left out of a shard. The others (e.g. a library module with inline tests) are compiled
+    in every shard, so their tests run in every shard.
+    """
+    sources = {module: read(path) for path, module in modules.items()}
+    removable = set()
+    for module in test_modules(modules):
+        pattern = re.compile(r"(?:\b|::)%s::" % re.escape(module.split("::")[-1]))
+        if not any(pattern.search(sources[other]) for other in sources if other != module):
+            removable.add(module)
+    return removable
+
+
+def shard_project(project_dir: str, shard_dir: str, excluded: List[str]):
+    """
+    Copies the crates of the project into shard_dir, without the excluded test modules (their
+    mod declarations are removed from their parent modules).
+    """
+    roots = crate_roots(project_dir)
+    shutil.copy(os.path.join(project_dir, "cairo_project.toml"), shard_dir)
+    for root in roots.values():
+        shutil.copytree(os.path.join(project_dir, root), os.path.join(shard_dir, root))
+    for module in excluded:
+        crate, *parents, name = module.split("::")
+        parent_file = os.path.join(shard_dir, roots[crate], *(parents or ["lib"])) + ".cairo"
+        source = read(parent_file)
+        declaration = re.compile(r"^[ \t]*mod %s;[ \t]*\n?" % re.escape(name), flags=re.M)
+        source, n_removed = declaration.subn("", source)
+        assert n_removed == 1, f"Failed to find the declaration of {module} in {parent_file}."
+        with open(parent_file, "w") as f:
+            f.write(source)
+
+
+def run_shard(group: List[str], excluded: List[str], args: List[str], project_dir: str) -> Shard:
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as shard_dir:
+        shard_project(project_dir=project_dir, shard_dir=shard_dir, excluded=excluded)
+        result = subprocess.run(
+            [EXECUTABLE, *[shard_dir if arg == project_dir else arg for arg in args]],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+    return Shard(
+        modules=group,
+        returncode=result.returncode,
+        output=result.stdout,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def print_report(shards: List[Shard]):
+    statuses: Dict[str, int] = {}
+    failed_tests = []
+    reported: Set[str] = set()
+    print("Tests:")
+    for shard in shards:
+        for line in shard.output.splitlines():
+            match = TEST_RESULT_RE.match(line)
+            # The tests of a module that can't be left out of a shard run in every shard.
+            if match is None or match["name"] in reported:
+                continue
+            reported.add(match["name"])
+            status = match["status"]
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "fail":
+                failed_tests.append(match["name"])
+            gas = "" if match["gas"] is None else f" (gas usage est.: {match['gas']})"
+            print(f"  {match['name']} ... {status}{gas}")
+
+    print("Shards:")
+    for shard in sorted(shards, key=lambda shard: shard.seconds, reverse=True):
+        status = "ok" if shard.returncode == 0 else "FAILED"
+        print(f"  {shard.seconds:7.2f}s  {status:<6} {', '.join(shard.modules)}")
+
+    for shard in shards:
+        # A shard may fail without a failing test (e.g. on a compilation error).
+        if shard.returncode != 0:
+            print(f"Output of {', '.join(shard.modules)}:\n{shard.output}")
+    if len(failed_tests) > 0:
+        print("Failures:\n" + "\n".join(f"  {name}" for name in failed_tests))
+
+    result = "ok" if all(shard.returncode == 0 for shard in shards) else "FAILED"
+    counts = "; ".join(
+        f"{statuses.get(status, 0)} {name}"
+        for status, name in [("ok", "passed"), ("fail", "failed"), ("ignored", "ignored")]
+    )
+    print(f"test result: {result}. {counts}.")
+
+
+def run_sharded(args: List[str], project_dir: str, changed_only: bool, jobs: Optional[int]):
+    modules = project_modules(project_dir)
+    selected = test_modules(modules)
+    if changed_only:
+        from script_utils import changed_files
+
+        changed = changed_test_modules(modules, changed_paths=changed_files(["cairo", "toml"]))
+        if changed is not None:
+            selected = changed
+    if len(selected) == 0:
+        print("No test modules to run.")
+        return 0
+
+    removable = removable_test_modules(modules)
+    groups = shard_groups(modules, selected=selected, n_shards=jobs or os.cpu_count() or 1)
+    print(
+        f"Running {len(selected)} test modules in {len(groups)} shards: {', '.join(selected)}",
+        flush=True,
+    )
+
+    def run_group(group: List[str]) -> Shard:
+        excluded = sorted(removable - set(group))
+        return run_shard(group=group, excluded=excluded, args=args, project_dir=project_dir)
+
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        shards = list(executor.map(run_group, groups))
+    print_report(shards)
+    return 0 if all(shard.returncode == 0 for shard in shards) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help=(
+            "Split the test modules into a shard per job, and run a cairo-test process per shard "
+            "concurrently."
+        ),
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="With --sharded, run only the test modules affected by the git diff.",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=None)
+    sharding_args, args = parser.parse_known_args()
+    check_version()
+
+    if sharding_args.sharded:
+        project_dirs = [arg for arg in args if os.path.isdir(arg)]
+        assert len(project_dirs) == 1, "Sharded mode expects exactly one project directory."
+        return run_sharded(
+            args=args,
+            project_dir=project_dirs[0],
+            changed_only=sharding_args.changed_only,
+            jobs=sharding_args.jobs,
+        )
+
     try:
         subprocess.check_call([EXECUTABLE, *args])
     except subprocess.CalledProcessError as e:
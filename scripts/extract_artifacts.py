@@ -1,8 +1,21 @@
 #!/usr/bin/env python3
 
+import hashlib
 import json
 import os
+import struct
 from argparse import ArgumentParser
+from typing import Dict, List, Optional, Tuple
+
+# Artifacts bundle format (read by src/solidity/utils.py:ArtifactBundle):
+#   BUNDLE_MAGIC | index size (8 bytes, big endian) | index | data.
+# The index is a compact json mapping each contract name to the [offset, size] of its abi (compact
+# json) and of its bytecode (raw bytes, or null if the contract has no bytecode) in data, and to its
+# hash. Readers use a bundled artifact only if its hash matches HASHES_FILE_NAME, so a bundle that
+# was not rebuilt along with the artifacts is ignored.
+BUNDLE_MAGIC = b"SGBUNDL1"
+# Maps each extracted contract to the content hash of its abi and bytecode.
+HASHES_FILE_NAME = "artifact_hashes.json"
 
 
 def remove_json_suffix(file_name: str):
@@ -12,6 +25,90 @@ def remove_json_suffix(file_name: str):
     return file_name
 
 
+def extract_artifact(path_and_name: str, val: dict) -> dict:
+    _, contract_name = path_and_name.split(":")
+
+    # 1. We cannot put "0x" in case of empty bin, as this would not prevent
+    #    loading an empty (virtual) contract. (We want it to fail)
+    # 2. Note that we can't put an assert len(val['bin']) > 0 here, because some contracts
+    #    are pure virtual and others lack external and public functions.
+    bytecode = None
+    if len(val["bin"]) > 0:
+        bytecode = "0x" + val["bin"]
+
+    # Support both solc-0.6 & solc-0.8 output format.
+    # In solc-0.6 the abi is a list in a json string,
+    # whereas in 0.8 it's a plain json.
+    try:
+        abi = json.loads(val["abi"])
+    except TypeError:
+        abi = val["abi"]
+
+    return {
+        "contractName": contract_name,
+        "abi": abi,
+        "bytecode": bytecode,
+    }
+
+
+def artifact_hash(artifact: dict) -> str:
+    content = json.dumps([artifact["abi"], artifact["bytecode"]], separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def write_artifact(
+    artifact: dict, output_dir: str, previous_hash: Optional[str]
+) -> Tuple[str, str, str]:
+    """
+    Writes the artifact json, unless it is identical to the existing one.
+    Returns the contract name, its hash and its status (added, updated or unchanged).
+    """
+    content_hash = artifact_hash(artifact)
+    path = os.path.join(output_dir, f"{artifact['contractName']}.json")
+    if previous_hash == content_hash and os.path.exists(path):
+        return artifact["contractName"], content_hash, "unchanged"
+
+    with open(path, "w") as artifact_file:
+        json.dump(artifact, artifact_file, indent=4)
+    return artifact["contractName"], content_hash, "added" if previous_hash is None else "updated"
+
+
+def load_hashes(hashes_path: str) -> Dict[str, str]:
+    if not os.path.exists(hashes_path):
+        return {}
+    with open(hashes_path) as hashes_file:
+        return json.load(hashes_file)
+
+
+def write_bundle(artifacts: List[dict], bundle_path: str):
+    index = {}
+    data = bytearray()
+
+    def append(blob: bytes) -> List[int]:
+        location = [len(data), len(blob)]
+        data.extend(blob)
+        return location
+
+    for artifact in artifacts:
+        abi = json.dumps(artifact["abi"], separators=(",", ":")).encode("utf-8")
+        bytecode = artifact["bytecode"]
+        index[artifact["contractName"]] = {
+            "abi": append(abi),
+            "bytecode": None if bytecode is None else append(bytes.fromhex(bytecode[2:])),
+            "hash": artifact_hash(artifact),
+        }
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    # Write to a temporary file and rename it, so that readers never map a partial bundle.
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, "wb") as bundle_file:
+        bundle_file.write(BUNDLE_MAGIC)
+        bundle_file.write(struct.pack(">Q", len(index_bytes)))
+        bundle_file.write(index_bytes)
+        bundle_file.write(data)
+    os.replace(tmp_path, bundle_path)
+
+
 def main():
     parser = ArgumentParser()
     parser.add_argument(
@@ -21,35 +118,54 @@ def main():
         required=False,
         default="artifacts/combined.json",
     )
+    parser.add_argument(
+        "--output_bundle",
+        type=str,
+        help="If given, all the artifacts are also written to a single indexed bundle file.",
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        help="The directory to write the artifacts to.",
+        required=False,
+        default="artifacts",
+    )
     args = parser.parse_args()
 
-    combined_json = json.load(open(os.path.join(args.input_json)))
+    with open(os.path.join(args.input_json)) as input_file:
+        combined_json = json.load(input_file)
 
+    # Later contracts with the same name override earlier ones.
+    artifacts = {}
     for path_and_name, val in combined_json["contracts"].items():
-        _, contract_name = path_and_name.split(":")
-
-        # 1. We cannot put "0x" in case of empty bin, as this would not prevent
-        #    loading an empty (virtual) contract. (We want it to fail)
-        # 2. Note that we can't put an assert len(val['bin']) > 0 here, because some contracts
-        #    are pure virtual and others lack external and public functions.
-        bytecode = None
-        if len(val["bin"]) > 0:
-            bytecode = "0x" + val["bin"]
-
-        # Support both solc-0.6 & solc-0.8 output format.
-        # In solc-0.6 the abi is a list in a json string,
-        # whereas in 0.8 it's a plain json.
-        try:
-            abi = json.loads(val["abi"])
-        except TypeError:
-            abi = val["abi"]
-
-        artifact = {
-            "contractName": contract_name,
-            "abi": abi,
-            "bytecode": bytecode,
-        }
-        json.dump(artifact, open(f"artifacts/{contract_name}.json", "w"), indent=4)
+        artifact = extract_artifact(path_and_name=path_and_name, val=val)
+        artifacts[artifact["contractName"]] = artifact
+
+    hashes_path = os.path.join(args.output_dir, HASHES_FILE_NAME)
+    previous_hashes = load_hashes(hashes_path)
+    results = [
+        write_artifact(
+            artifact=artifact, output_dir=args.output_dir, previous_hash=previous_hashes.get(name)
+        )
+        for name, artifact in artifacts.items()
+    ]
+
+    hashes = {name: content_hash for name, content_hash, _ in results}
+    changed = [(name, status) for name, _, status in results if status != "unchanged"]
+    if hashes != previous_hashes:
+        with open(hashes_path, "w") as hashes_file:
+            json.dump(hashes, hashes_file, indent=4, sort_keys=True)
+
+    if args.output_bundle is not None and (
+        len(changed) > 0 or hashes != previous_hashes or not os.path.exists(args.output_bundle)
+    ):
+        write_bundle(artifacts=list(artifacts.values()), bundle_path=args.output_bundle)
+
+    for name, status in changed:
+        print(f"{status}: {name}")
+    print(f"Extracted {len(results)} artifacts: {len(changed)} changed.")
 
 
 if __name__ == "__main__":
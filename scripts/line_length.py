@@ -1,8 +1,106 @@
 #!/usr/bin/env python3.9
 
 import argparse
+import json
+import mmap
+import os
 import sys
-from script_utils import changed_files, color_txt, git_files
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from script_utils import changed_files, color_txt, git_files, git_list_files, git_output
+
+CACHE_NAME = "line_length_cache.json"
+
+
+def file_long_lines(path: str, max_line_length: int) -> List[int]:
+    """
+    Returns the numbers of the lines of the file that are too long, reading it through mmap.
+    Lines are compared in characters, as in the line by line check.
+    """
+    long_lines = []
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return long_lines
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start, line_num = 0, 1
+            while start < len(data):
+                end = data.find(b"\n", start)
+                end = len(data) if end == -1 else end
+                # A line has at least as many bytes as characters, so short lines are not decoded.
+                if end - start > max_line_length:
+                    line = data[start:end].decode("utf-8").rstrip("\r")
+                    if not (line.startswith("from") or line.startswith("import")):
+                        if len(line) > max_line_length:
+                            long_lines.append(line_num)
+                start, line_num = end + 1, line_num + 1
+    return long_lines
+
+
+def clean_blob_hashes(files: List[str]) -> Dict[str, str]:
+    """
+    Returns the git blob hash of every given file that is identical to its version in the index.
+    """
+    cwd = os.getcwd()
+    staged = git_list_files(["ls-files", "-s", "-z", "--", *files], cwd=cwd)
+    modified = set(git_list_files(["ls-files", "-m", "-z", "--", *files], cwd=cwd))
+    blob_hashes = {}
+    for entry in staged:
+        # Entries are "<mode> <blob hash> <stage>\t<path>".
+        info, path = entry.split("\t", 1)
+        if path not in modified:
+            blob_hashes[path] = info.split()[1]
+    return blob_hashes
+
+
+def load_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def parallel_long_lines(files: List[str], max_line_length: int) -> List[Tuple[str, int]]:
+    """
+    Checks the files on a process pool. Results are cached by git blob hash, so files that did not
+    change since a previous run are not read at all.
+    """
+    git_dir, top_level = git_output(
+        ["rev-parse", "--absolute-git-dir", "--show-toplevel"], cwd=os.getcwd()
+    ).splitlines()
+    cache_path = os.path.join(git_dir, CACHE_NAME)
+    cache = load_cache(cache_path)
+    results = cache.setdefault(str(max_line_length), {})
+    # Files outside the repository have no blob hash, and are always checked.
+    repo_files = [f for f in files if os.path.abspath(f).startswith(top_level + os.sep)]
+    blob_hashes = clean_blob_hashes(repo_files) if len(repo_files) > 0 else {}
+
+    to_check = [f for f in files if blob_hashes.get(f) not in results]
+    with ProcessPoolExecutor() as executor:
+        checked = dict(
+            zip(
+                to_check,
+                executor.map(file_long_lines, to_check, [max_line_length] * len(to_check)),
+            )
+        )
+
+    long_lines = []
+    for f in files:
+        blob_hash = blob_hashes.get(f)
+        if f in checked:
+            file_lines = checked[f]
+            if blob_hash is not None:
+                results[blob_hash] = file_lines
+        else:
+            file_lines = results[blob_hash]
+        long_lines.extend((f, line_num) for line_num in file_lines)
+
+    if len(checked) > 0:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(tmp_path, cache_path)
+    return long_lines
 
 
 def main():
@@ -16,6 +114,12 @@ def main():
     )
     parser.add_argument("--files", nargs="+", help="Run on specified files. Ignore other flags.")
     parser.add_argument("--changes_only", action="store_true", help="Run only on changed files.")
+    parser.add_argument(
+        "--parallel",
+        "-p",
+        action="store_true",
+        help="Check the files in parallel, skipping files that did not change since the last run.",
+    )
     parser.add_argument("--quiet", "-q", dest="verbose", action="store_false")
 
     args = parser.parse_args()
@@ -33,13 +137,16 @@ def main():
         sys.stdout.flush()
 
     long_lines = []
-    for f in files:
-        for line_num, line in enumerate(open(f), 1):
-            line = line.rstrip("\n")
-            if line.startswith("from") or line.startswith("import"):
-                continue
-            if len(line) > args.max_line_length:
-                long_lines.append((f, line_num))
+    if args.parallel:
+        long_lines = parallel_long_lines(files=files, max_line_length=args.max_line_length)
+    else:
+        for f in files:
+            for line_num, line in enumerate(open(f), 1):
+                line = line.rstrip("\n")
+                if line.startswith("from") or line.startswith("import"):
+                    continue
+                if len(line) > args.max_line_length:
+                    long_lines.append((f, line_num))
 
     if len(long_lines) > 0:
         print(color_txt("red", "The following lines are too long:"))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+"""
+Builds the release tarball, running the independent build stages concurrently, and reports where
+the time went.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUIRED_PATHS = [
+    os.path.join(".downloads", "solc-0.8.20"),
+    os.path.join(".downloads", "cairo", "bin", "starknet-compile"),
+    "starkware",
+]
+# Build caches written into artifacts/ by build-solidity.sh, which are not part of the release.
+ARTIFACTS_CACHE_FILES = ["artifacts.bundle", "artifact_hashes.json"]
+
+
+class StageError(Exception):
+    pass
+
+
+@dataclass
+class Stage:
+    name: str
+    action: Callable[[], None]
+    dependencies: List[str] = field(default_factory=list)
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        assert self.start is not None and self.end is not None
+        return self.end - self.start
+
+
+def run(*command: str):
+    """
+    Runs a command, and prints its output at once when it is done, so that the output of
+    concurrent stages is not interleaved.
+    """
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    print(result.stdout, end="", flush=True)
+    if result.returncode != 0:
+        raise StageError(f"{' '.join(command)} exited with code {result.returncode}.")
+
+
+def setup_check():
+    missing = [path for path in REQUIRED_PATHS if not os.path.exists(path)]
+    if len(missing) > 0:
+        raise StageError(
+            f"Missing {', '.join(missing)}. Run : 'sh ./scripts/setup.sh' to solve this problem."
+        )
+
+
+def package(target: str):
+    target_dir = os.path.join("target", target)
+    starkgate_dir = os.path.join(target_dir, "starkgate")
+    os.makedirs(starkgate_dir, exist_ok=True)
+    shutil.copytree(
+        "cairo_contracts", os.path.join(starkgate_dir, "cairo_contracts"), dirs_exist_ok=True
+    )
+    shutil.copytree(
+        "artifacts",
+        os.path.join(starkgate_dir, "solidity_contracts"),
+        ignore=shutil.ignore_patterns(*ARTIFACTS_CACHE_FILES),
+        dirs_exist_ok=True,
+    )
+    with tarfile.open(os.path.join("target", f"{target}.tar.gz"), "w:gz") as tar:
+        tar.add(starkgate_dir, arcname="starkgate")
+
+
+def release_stages(target: str) -> List[Stage]:
+    return [
+        Stage(name="setup_check", action=setup_check),
+        Stage(
+            name="cairo_compile",
+            action=lambda: run("scripts/build-cairo.sh"),
+            dependencies=["setup_check"],
+        ),
+        Stage(
+            name="solidity_compile",
+            action=lambda: run("scripts/build-solidity.sh", "--compile_only"),
+            dependencies=["setup_check"],
+        ),
+        Stage(
+            name="extract_artifacts",
+            action=lambda: run("scripts/build-solidity.sh", "--extract_only"),
+            dependencies=["solidity_compile"],
+        ),
+        Stage(
+            name="package",
+            action=lambda: package(target=target),
+            dependencies=["cairo_compile", "extract_artifacts"],
+        ),
+    ]
+
+
+def run_stages(stages: List[Stage], jobs: Optional[int] = None):
+    """
+    Runs every stage once all its dependencies are done, stopping at the first failure (after the
+    running stages finish).
+    """
+    names = {stage.name for stage in stages}
+    unknown = {dep for stage in stages for dep in stage.dependencies} - names
+    if len(unknown) > 0:
+        raise StageError(f"Unknown stage dependencies: {', '.join(sorted(unknown))}.")
+    done: set = set()
+    running: Dict[Future, Stage] = {}
+
+    def timed(stage: Stage):
+        stage.start = time.perf_counter()
+        try:
+            stage.action()
+        finally:
+            stage.end = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        failure: Optional[BaseException] = None
+        while len(done) < len(stages) and failure is None:
+            started = set(done) | {stage.name for stage in running.values()}
+            for stage in stages:
+                if stage.name not in started and all(dep in done for dep in stage.dependencies):
+                    running[executor.submit(timed, stage)] = stage
+            if len(running) == 0:
+                raise StageError("The stage dependencies have a cycle.")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                if future.exception() is not None:
+                    failure = failure or future.exception()
+                    print(f"Stage {stage.name} failed: {future.exception()}")
+                else:
+                    done.add(stage.name)
+        wait(running)
+
+    if isinstance(failure, StageError):
+        raise failure
+    if failure is not None:
+        # An unexpected error of a stage action, which was already reported above.
+        raise StageError(f"Unexpected error: {failure!r}.") from failure
+
+
+def critical_path(stages: List[Stage]) -> List[Stage]:
+    """
+    Returns the chain of stages that determined the total time: starting from the stage that
+    ended last, repeatedly follows the dependency that ended last.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    stage = max(stages, key=lambda stage: stage.end)
+    path = [stage]
+    while len(stage.dependencies) > 0:
+        stage = max((by_name[dep] for dep in stage.dependencies), key=lambda dep: dep.end)
+        path.append(stage)
+    return path[::-1]
+
+
+def print_report(stages: List[Stage]):
+    origin = min(stage.start for stage in stages)
+    critical = {stage.name for stage in critical_path(stages)}
+    print(f"{'stage':<20}{'start':>9}{'duration':>10}{'end':>9}")
+    for stage in sorted(stages, key=lambda stage: stage.start):
+        marker = "  *" if stage.name in critical else ""
+        print(
+            f"{stage.name:<20}{stage.start - origin:8.2f}s{stage.duration:9.2f}s"
+            f"{stage.end - origin:8.2f}s{marker}"
+        )
+    total = max(stage.end for stage in stages) - origin
+    sequential = sum(stage.duration for stage in stages)
+    print(f"Total: {total:.2f}s (sequential: {sequential:.2f}s). * marks the critical path.")
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("target", type=str, help="The name of the release.")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=None, help="The number of stages to run at once."
+    )
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)
+    stages = release_stages(target=args.target)
+    try:
+        run_stages(stages=stages, jobs=args.jobs)
+    except StageError as e:
+        print(e)
+        sys.exit(1)
+    print_report(stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,135 @@
 #!/usr/bin/env python3.9
 
 import argparse
+import hashlib
+import json
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
-from script_utils import color_txt, find_command, git_files
+from script_utils import changed_files, color_txt, find_command, git_files, git_output
+
+CACHE_NAME = "prettier_cache.json"
+PRETTIER_CONFIG = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".prettierrc")
+SOLIDITY_PLUGIN = "prettier-plugin-solidity"
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def plugin_manifest(prettier_path: str) -> Optional[str]:
+    """
+    Finds the package.json of the Solidity plugin that prettier loads, by searching the
+    node_modules directories above the prettier installation.
+    """
+    directory = os.path.dirname(prettier_path)
+    while True:
+        manifest = os.path.join(directory, "node_modules", SOLIDITY_PLUGIN, "package.json")
+        if os.path.isfile(manifest):
+            return manifest
+        if os.path.basename(directory) == "node_modules":
+            manifest = os.path.join(directory, SOLIDITY_PLUGIN, "package.json")
+            if os.path.isfile(manifest):
+                return manifest
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def plugin_key(prettier_path: str) -> str:
+    manifest = plugin_manifest(prettier_path)
+    if manifest is None:
+        return "no-plugin"
+    try:
+        with open(manifest) as manifest_file:
+            version = json.load(manifest_file).get("version")
+    except (OSError, ValueError):
+        version = None
+    return f"{manifest}:{version}:{os.stat(manifest).st_mtime_ns}"
+
+
+def config_key(prettier: str) -> str:
+    """
+    Identifies the formatting rules: the prettier installation, the Solidity plugin installation
+    and the prettier configuration.
+    """
+    real_path = os.path.realpath(prettier)
+    with open(PRETTIER_CONFIG, "rb") as config_file:
+        config = config_file.read()
+    return hashlib.sha256(
+        f"{real_path}:{os.stat(real_path).st_mtime_ns}:{plugin_key(real_path)}:".encode("utf-8")
+        + config
+    ).hexdigest()
+
+
+class FormattedCache:
+    """
+    Remembers the content hashes of files that are known to be formatted, in the git directory.
+    """
+
+    def __init__(self, key: str):
+        git_dir = git_output(["rev-parse", "--absolute-git-dir"], cwd=os.getcwd()).strip()
+        self.path = os.path.join(git_dir, CACHE_NAME)
+        self.key = key
+        try:
+            with open(self.path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+        # Results of other formatting rules are dropped.
+        self.formatted = set(cache.get("formatted", [])) if cache.get("key") == key else set()
+
+    def is_formatted(self, path: str) -> bool:
+        return file_hash(path) in self.formatted
+
+    def add(self, paths: List[str]):
+        self.formatted.update(file_hash(path) for path in paths)
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump({"key": self.key, "formatted": sorted(self.formatted)}, cache_file)
+        os.replace(tmp_path, self.path)
+
+
+def run_batch(command_args: List[str], files: List[str]) -> Tuple[List[str], Optional[str]]:
+    """
+    Runs prettier on a batch of files. Returns the files that are formatted after the run, and the
+    prettier output if it failed.
+    """
+    try:
+        subprocess.check_output(command_args + files, stderr=subprocess.STDOUT)
+        return files, None
+    except subprocess.CalledProcessError as error:
+        output = error.stdout.decode("utf-8")
+        lines = output.splitlines()
+        if any(line.startswith("[error]") for line in lines):
+            return [], output
+        # prettier -c reports every unformatted file as "[warn] <file>".
+        unformatted = {line[len("[warn] ") :].strip() for line in lines}
+        return [f for f in files if f not in unformatted], output
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run Prettier on Solidity files")
     parser.add_argument("--files", nargs="+", help="Run on specified files. Ignore other flags.")
+    parser.add_argument("--changes_only", action="store_true", help="Run only on changed files.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files that were already formatted in a previous run.",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=None,
+        help="Run prettier on batches of this many files in parallel (default: a single batch).",
+    )
 
     parser.add_argument("--fix", action="store_true", help="Fix formatting errors")
     parser.add_argument("--quiet", "-q", dest="verbose", action="store_false")
@@ -17,7 +137,8 @@ def main():
     args = parser.parse_args()
 
     extensions = ["sol"]
-    command_args = [find_command("prettier")]
+    prettier = find_command("prettier")
+    command_args = [prettier]
     if args.fix:
         command_args.append("-w")
     else:
@@ -25,9 +146,15 @@ def main():
 
     if args.files:
         files = [path for path in args.files if path.endswith(tuple(extensions))]
+    elif args.changes_only:
+        files = changed_files(extensions)
     else:
         files = git_files(extensions=extensions)
 
+    cache = FormattedCache(key=config_key(prettier)) if args.incremental else None
+    if cache is not None:
+        files = [f for f in files if not cache.is_formatted(f)]
+
     if args.verbose:
         print(
             color_txt(
@@ -37,13 +164,22 @@ def main():
         )
         sys.stdout.flush()
 
-    if len(files) > 0:
-        try:
-            subprocess.check_output(command_args + files, stderr=subprocess.STDOUT)
-        except subprocess.CalledProcessError as error:
-            print(error.stdout.decode("utf-8"))
-            print(color_txt("red", f"=== prettier failed ===\n"))
-            sys.exit(1)
+    batch_size = args.batch_size or max(len(files), 1)
+    batches = [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(lambda batch: run_batch(command_args, batch), batches))
+
+    if cache is not None:
+        for formatted, _ in results:
+            cache.add(formatted)
+        cache.save()
+
+    failures = [output for _, output in results if output is not None]
+    if len(failures) > 0:
+        for output in failures:
+            print(output)
+        print(color_txt("red", f"=== prettier failed ===\n"))
+        sys.exit(1)
 
     if args.verbose:
         print(color_txt("yellow", "=== prettier completed successfully ==="))
@@ -1,3 +1,4 @@
+import json
 import os
 import re
 import subprocess
@@ -84,39 +85,92 @@ def get_parent_branch():
     return open(os.path.join(os.path.dirname(__file__), "parent_branch.txt")).read().strip()
 
 
-def create_grep_pipe_command(extensions):
-    if extensions is None:
-        return ""
-    return r' | { grep -E "\.(%s)$" || true; }' % ("|".join(extensions))
+EXCLUDE_SRC_FOLDERS_RE = re.compile(f'^({"|".join(exclude_src_folders)})')
+FILE_INDEX_CACHE_NAME = "script_utils_file_index.json"
+
+
+def git_output(git_args: List[str], cwd: str) -> str:
+    return subprocess.check_output(["git", *git_args], cwd=cwd).decode("utf-8")
+
+
+def git_list_files(git_args: List[str], cwd: str) -> List[str]:
+    """
+    Runs a git command that lists files, with NUL-delimited output (-z), so that paths are never
+    quoted or split.
+    """
+    return [path for path in git_output(git_args, cwd=cwd).split("\0") if path != ""]
+
+
+def cached_git_list_files(git_args: List[str], cwd: str) -> List[str]:
+    """
+    Same as git_list_files, for commands whose output only depends on HEAD and the index.
+    The result is cached in the git directory, keyed by HEAD, the index mtime, the current
+    directory and the command.
+    """
+    # The output of git commands is relative to the current directory (its prefix in the tree).
+    git_dir, prefix, head = git_output(
+        ["rev-parse", "--absolute-git-dir", "--show-prefix", "HEAD"], cwd=cwd
+    ).split("\n")[:3]
+    index_path = os.path.join(git_dir, "index")
+    index_mtime = os.stat(index_path).st_mtime_ns if os.path.exists(index_path) else 0
+    key = [head, index_mtime, prefix, git_args]
+
+    cache_path = os.path.join(git_dir, FILE_INDEX_CACHE_NAME)
+    try:
+        with open(cache_path) as cache_file:
+            cache = json.load(cache_file)
+        if cache["key"] == key:
+            return cache["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    files = git_list_files(git_args, cwd=cwd)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as cache_file:
+        json.dump({"key": key, "files": files}, cache_file)
+    os.replace(tmp_path, cache_path)
+    return files
 
 
 def git_files(extensions=None) -> List[str]:
-    return get_files("git ls-tree -r --name-only HEAD", extensions)
+    return get_files(["ls-tree", "-r", "-z", "--name-only", "HEAD"], extensions, cached=True)
 
 
 def changed_files(extensions=None, with_excluded_files=False) -> List[str]:
+    try:
+        merge_base = [
+            git_output(
+                ["merge-base", f"origin/{get_parent_branch()}", "HEAD"], cwd=os.getcwd()
+            ).strip()
+        ]
+    except subprocess.CalledProcessError:
+        # Without the parent branch, fall back to the changes in the working tree.
+        merge_base = []
+    # The diff depends on the working tree, hence it is not cached.
     return get_files(
-        f"git diff --name-only $(git merge-base origin/{get_parent_branch()} HEAD)",
+        ["diff", "-z", "--name-only", *merge_base],
         extensions=extensions,
         with_excluded_files=with_excluded_files,
     )
 
 
-def get_files(git_cmd: str, extensions, with_excluded_files=False, cwd=None) -> List[str]:
+def get_files(
+    git_args: List[str], extensions, with_excluded_files=False, cwd=None, cached=False
+) -> List[str]:
     if cwd is None:
         cwd = os.getcwd()
-    grep_cmd = create_grep_pipe_command(extensions)
-    command = f"{git_cmd} {grep_cmd}"  # All git files (we'll filter later)
-    files: List[str] = (
-        subprocess.check_output(command, shell=True, cwd=cwd).decode("utf-8").splitlines()
-    )
+    list_files = cached_git_list_files if cached else git_list_files
+    files = list_files(git_args, cwd=cwd)
+
+    if extensions is not None:
+        suffixes = tuple(f".{extension}" for extension in extensions)
+        files = [f for f in files if f.endswith(suffixes)]
 
     # Filter out exclusion list.
     if not with_excluded_files:
-        exclude_pattern = f'^({"|".join(exclude_src_folders)})'
-        files = [f for f in files if not re.match(exclude_pattern, f)]
+        files = [f for f in files if EXCLUDE_SRC_FOLDERS_RE.match(f) is None]
 
-    # Filter to include only real files (exclude git output artifacts).
+    # Filter to include only real files (e.g. exclude files deleted in the working tree).
     files = [f for f in files if os.path.exists(os.path.join(cwd, f))]
     return files
 
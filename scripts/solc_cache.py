@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Compiles the Solidity contracts into combined.json, reusing a previous compilation when none of
+its inputs changed.
+
+The cache key covers the content of every compiled source and of its transitive imports, the
+compiler version and the compiler flags, so a cache hit is byte-identical to a fresh compilation.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+from argparse import ArgumentParser
+from typing import Dict, List
+
+IMPORT_RE = re.compile(r"""^\s*import\s+(?:[^"';]*?\s+from\s+)?["']([^"']+)["']""", re.MULTILINE)
+
+
+def resolve_import(importing_file: str, imported: str) -> str:
+    # Relative imports are resolved against the importing file, the rest against the base path.
+    if imported.startswith("."):
+        return os.path.normpath(os.path.join(os.path.dirname(importing_file), imported))
+    return os.path.normpath(imported)
+
+
+def source_hashes(files: List[str]) -> Dict[str, str]:
+    """
+    Returns the content hash of every given source and of all the sources it transitively imports.
+    """
+    hashes: Dict[str, str] = {}
+    pending = [os.path.normpath(path) for path in files]
+    while len(pending) > 0:
+        path = pending.pop()
+        if path in hashes:
+            continue
+        with open(path, "rb") as source_file:
+            content = source_file.read()
+        hashes[path] = hashlib.sha256(content).hexdigest()
+        for imported in IMPORT_RE.findall(content.decode("utf-8")):
+            pending.append(resolve_import(importing_file=path, imported=imported))
+    return hashes
+
+
+def compiler_version(solc: str) -> str:
+    return subprocess.check_output([solc, "--version"], text=True).strip()
+
+
+def cache_key(files: List[str], solc: str, solc_args: List[str]) -> str:
+    key_data = {
+        "files": files,
+        "sources": source_hashes(files),
+        "compiler": compiler_version(solc),
+        "args": solc_args,
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def copy_if_changed(src: str, dst: str):
+    # Keep the destination (and its modification time) when its content is already up to date.
+    if os.path.exists(dst):
+        with open(src, "rb") as src_file, open(dst, "rb") as dst_file:
+            if src_file.read() == dst_file.read():
+                return
+    shutil.copyfile(src, dst)
+
+
+def prune_cache(cache_dir: str, max_entries: int):
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[max_entries:]:
+        os.remove(path)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--solc", type=str, default=".downloads/solc-0.8.20")
+    parser.add_argument(
+        "--files_list",
+        type=str,
+        default="src/solidity/files_to_compile.txt",
+        help="A file listing the sources to compile.",
+    )
+    parser.add_argument("--optimize_runs", type=int, default=200)
+    parser.add_argument("--output_dir", type=str, default="artifacts")
+    parser.add_argument("--cache_dir", type=str, default=".downloads/solc_cache")
+    parser.add_argument(
+        "--max_cache_entries",
+        type=int,
+        default=20,
+        help="The number of compilations to keep in the cache (default: 20).",
+    )
+    parser.add_argument("--no_cache", action="store_true", help="Always compile.")
+    args = parser.parse_args()
+
+    with open(args.files_list) as files_list:
+        files = files_list.read().split()
+    solc_args = [
+        "--allow-paths",
+        ".=.,",
+        "--optimize",
+        "--optimize-runs",
+        str(args.optimize_runs),
+        "--combined-json",
+        "abi,bin",
+    ]
+    combined_json = os.path.join(args.output_dir, "combined.json")
+    os.makedirs(args.output_dir, exist_ok=True)
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    key = cache_key(files=files, solc=args.solc, solc_args=solc_args)
+    cached_json = os.path.join(args.cache_dir, f"{key}.json")
+    if not args.no_cache and os.path.exists(cached_json):
+        print(f"Solidity sources are unchanged, using the cached compilation {key[:12]}.")
+        copy_if_changed(src=cached_json, dst=combined_json)
+        # Mark the entry as recently used.
+        os.utime(cached_json)
+        return
+
+    subprocess.check_call([args.solc, *files, *solc_args, "--overwrite", "-o", args.output_dir])
+    tmp_path = f"{cached_json}.tmp"
+    shutil.copyfile(combined_json, tmp_path)
+    os.replace(tmp_path, cached_json)
+    prune_cache(cache_dir=args.cache_dir, max_entries=args.max_cache_entries)
+
+
+if __name__ == "__main__":
+    main()
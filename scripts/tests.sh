@@ -35,7 +35,7 @@ else
 fi
 
 printf "${YELLOW}Run cairo test...\n"
-scripts/cairo-test.py --starknet src/
+scripts/cairo-test.py --sharded --starknet src/
 if [ $? -eq 0 ]; then
     printf "${GREEN}Run cairo succeed\n"
 else
@@ -60,7 +60,8 @@ else
 fi
 
 printf "${YELLOW}Pytest...\n"
-pytest src/solidity -sv
+# The gas benchmarks are run separately, against a recorded baseline (see README.md).
+pytest src/solidity -sv -n auto -m "not gas_benchmark"
 if [ $? -eq 0 ]; then
     printf "${GREEN}Pytest succeed\n"
 else
@@ -16,7 +16,7 @@ mod TokenBridge {
     use integer::BoundedInt;
     use core::result::ResultTrait;
     use starknet::SyscallResultTrait;
-    use array::ArrayTrait;
+    use array::{ArrayTrait, SpanTrait};
     use core::hash::LegacyHash;
     use integer::{Felt252IntoU256, U64IntoFelt252};
     use option::OptionTrait;
@@ -30,7 +30,8 @@ mod TokenBridge {
     };
     use starknet::class_hash::{ClassHash, Felt252TryIntoClassHash};
     use super::super::token_bridge_interface::{
-        ITokenBridge, ITokenBridgeDispatcher, ITokenBridgeDispatcherTrait
+        BatchDeposit, BatchWithdrawal, ITokenBridge, ITokenBridgeDispatcher,
+        ITokenBridgeDispatcherTrait
     };
     use super::super::token_bridge_admin_interface::{
         ITokenBridgeAdmin, ITokenBridgeAdminDispatcher, ITokenBridgeAdminDispatcherTrait
@@ -61,6 +62,9 @@ mod TokenBridge {
     use zeroable::Zeroable;
 
     const WITHDRAW_MESSAGE: felt252 = 0;
+    const WITHDRAW_BATCH_MESSAGE: felt252 = 1;
+    // The maximal number of withdrawals in a batch (bounds the gas of withdrawBatch on L1).
+    const MAX_BATCH_SIZE: u32 = 100;
     const CONTRACT_IDENTITY: felt252 = 'STARKGATE';
     const CONTRACT_VERSION: felt252 = 2;
 
@@ -130,9 +134,11 @@ mod TokenBridge {
         L2TokenGovernanceChanged: L2TokenGovernanceChanged,
         withdraw_initiated: withdraw_initiated,
         WithdrawInitiated: WithdrawInitiated,
+        WithdrawBatchInitiated: WithdrawBatchInitiated,
         deposit_handled: deposit_handled,
         DepositHandled: DepositHandled,
         DepositWithMessageHandled: DepositWithMessageHandled,
+        DepositBatchHandled: DepositBatchHandled,
         DeployHandled: DeployHandled,
         WithdrawalLimitEnabled: WithdrawalLimitEnabled,
         WithdrawalLimitDisabled: WithdrawalLimitDisabled,
@@ -208,6 +214,18 @@ mod TokenBridge {
         caller_address: ContractAddress,
     }
 
+    // Emitted when initiate_token_withdraw_batch is called, after the WithdrawInitiated events of
+    // the withdrawals of the batch.
+    #[derive(Copy, Drop, PartialEq, starknet::Event)]
+    struct WithdrawBatchInitiated {
+        #[key]
+        l1_token: EthAddress,
+        #[key]
+        caller_address: ContractAddress,
+        n_withdrawals: u32,
+        total_amount: u256,
+    }
+
     // Legacy event, for backward competability. Emitted only for upgraded bridge when
     // `handle_deposit` is called.
     #[derive(Copy, Drop, PartialEq, starknet::Event)]
@@ -239,6 +257,18 @@ mod TokenBridge {
         message: Span<felt252>,
     }
 
+    // Emitted when handle_deposit_batch is called, after the DepositHandled events of the deposits
+    // of the batch.
+    #[derive(Copy, Drop, PartialEq, starknet::Event)]
+    struct DepositBatchHandled {
+        #[key]
+        depositor: EthAddress,
+        #[key]
+        l1_token: EthAddress,
+        n_deposits: u32,
+        total_amount: u256,
+    }
+
     // Emitted upon processing of the handle_token_deployment L1 handler.
     #[derive(Copy, Drop, PartialEq, starknet::Event)]
     struct DeployHandled {
@@ -532,6 +562,79 @@ mod TokenBridge {
             assert(result.is_ok(), 'MESSAGE_SEND_FAIILED');
             self.emit(WithdrawInitiated { l1_token, l1_recipient, amount, caller_address });
         }
+
+        // Initiates l2-to-l1 withdrawals of a single token to many l1 recipients, in one message.
+        // The quota is consumed and the tokens are burnt once, for the total amount.
+        fn initiate_token_withdraw_batch(
+            ref self: ContractState, l1_token: EthAddress, withdrawals: Span<BatchWithdrawal>
+        ) {
+            let n_withdrawals = withdrawals.len();
+            assert(n_withdrawals != 0, 'EMPTY_BATCH');
+            assert(n_withdrawals <= MAX_BATCH_SIZE, 'BATCH_TOO_LARGE');
+
+            // Read addresses.
+            let caller_address = get_caller_address();
+            let l2_token = self.get_l2_token(:l1_token);
+            assert(l2_token.is_non_zero(), 'TOKEN_NOT_IN_BRIDGE');
+            let l1_bridge_address = self.get_l1_bridge_address();
+
+            // Validate the withdrawals.
+            let mut total_amount: u256 = 0;
+            let mut withdrawals_to_validate = withdrawals;
+            loop {
+                match withdrawals_to_validate.pop_front() {
+                    Option::Some(withdrawal) => {
+                        // Prevent burn to zero.
+                        assert((*withdrawal.l1_recipient).is_non_zero(), 'INVALID_RECIPIENT');
+                        assert(*withdrawal.amount != 0, 'ZERO_WITHDRAWAL');
+                        total_amount = total_amount + *withdrawal.amount;
+                    },
+                    Option::None(()) => { break; },
+                };
+            };
+            let caller_balance = IERC20Dispatcher { contract_address: l2_token }
+                .balance_of(account: caller_address);
+            assert(total_amount <= caller_balance, 'INSUFFICIENT_FUNDS');
+
+            if (self.is_withdrawal_limit_applied(:l2_token)) {
+                self.consume_withdrawal_quota(:l1_token, amount_to_withdraw: total_amount);
+            }
+
+            // Call burn on l2_token contract.
+            IMintableTokenDispatcher { contract_address: l2_token }
+                .permissioned_burn(account: caller_address, amount: total_amount);
+
+            // Send the message. The withdrawals are serialized as their count, followed by
+            // (l1_recipient, amount.low, amount.high) per withdrawal.
+            let mut message_payload = ArrayTrait::new();
+            WITHDRAW_BATCH_MESSAGE.serialize(ref message_payload);
+            l1_token.serialize(ref message_payload);
+            withdrawals.serialize(ref message_payload);
+
+            let result = send_message_to_l1_syscall(
+                to_address: l1_bridge_address.into(), payload: message_payload.span()
+            );
+            assert(result.is_ok(), 'MESSAGE_SEND_FAIILED');
+
+            let mut withdrawals_to_emit = withdrawals;
+            loop {
+                match withdrawals_to_emit.pop_front() {
+                    Option::Some(withdrawal) => {
+                        let l1_recipient = *withdrawal.l1_recipient;
+                        let amount = *withdrawal.amount;
+                        self
+                            .emit(
+                                WithdrawInitiated { l1_token, l1_recipient, amount, caller_address }
+                            );
+                    },
+                    Option::None(()) => { break; },
+                };
+            };
+            self
+                .emit(
+                    WithdrawBatchInitiated { l1_token, caller_address, n_withdrawals, total_amount }
+                );
+        }
     }
 
     // -- Replaceability --
@@ -1066,6 +1169,36 @@ mod TokenBridge {
         self.emit(DepositWithMessageHandled { depositor, l1_token, l2_recipient, amount, message });
     }
 
+    // Handles a batch of l1-to-l2 deposits of a single token and depositor, sent in one message.
+    #[l1_handler]
+    fn handle_deposit_batch(
+        ref self: ContractState,
+        from_address: felt252,
+        l1_token: EthAddress,
+        depositor: EthAddress,
+        mut deposits: Span<BatchDeposit>,
+    ) {
+        // Verify deposit originating from the l1 bridge.
+        self.only_from_l1_bridge(:from_address);
+
+        let l2_token = self.get_l2_token(:l1_token);
+        let n_deposits = deposits.len();
+        let mut total_amount: u256 = 0;
+        loop {
+            match deposits.pop_front() {
+                Option::Some(deposit) => {
+                    let l2_recipient = *deposit.l2_recipient;
+                    let amount = *deposit.amount;
+                    self.handle_deposit_common(:l2_recipient, :l2_token, :amount);
+                    self.emit(DepositHandled { l1_token, l2_recipient, amount });
+                    total_amount = total_amount + amount;
+                },
+                Option::None(()) => { break; },
+            };
+        };
+        self.emit(DepositBatchHandled { depositor, l1_token, n_deposits, total_amount });
+    }
+
     #[l1_handler]
     fn handle_token_deployment(
         ref self: ContractState,
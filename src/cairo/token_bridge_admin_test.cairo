@@ -18,7 +18,9 @@ mod token_bridge_admin_test {
         default_amount, deploy_new_token_and_deposit,
     };
 
-    use super::super::token_bridge_interface::{ITokenBridgeDispatcher, ITokenBridgeDispatcherTrait};
+    use super::super::token_bridge_interface::{
+        BatchWithdrawal, ITokenBridgeDispatcher, ITokenBridgeDispatcherTrait
+    };
     use super::super::token_bridge_admin_interface::{
         ITokenBridgeAdminDispatcher, ITokenBridgeAdminDispatcherTrait
     };
@@ -549,6 +551,44 @@ mod token_bridge_admin_test {
             );
     }
 
+    // Tests the case where the withdrawal limit is on and a batch withdrawal is above the maximum
+    // allowed amount, although each of its withdrawals is not.
+    #[test]
+    #[available_gas(30000000)]
+    #[should_panic(expected: ('LIMIT_EXCEEDED', 'ENTRYPOINT_FAILED',))]
+    fn test_failed_initiate_token_withdraw_batch_limit_exceeded() {
+        let (l1_bridge_address, l1_token, l1_recipient) = get_default_l1_addresses();
+        let depositor = EthAddress { address: DEFAULT_DEPOSITOR_ETH_ADDRESS };
+        let token_bridge_address = deploy_token_bridge();
+
+        // Deploy a new token and deposit funds to this token.
+        let l2_recipient = initial_owner();
+        let amount_to_deposit = default_amount();
+        deploy_new_token_and_deposit(
+            :token_bridge_address,
+            :l1_bridge_address,
+            :l1_token,
+            :depositor,
+            :l2_recipient,
+            :amount_to_deposit
+        );
+
+        enable_withdrawal_limit(:token_bridge_address, :l1_token);
+
+        let daily_withdrawal_limit = _get_daily_withdrawal_limit(:token_bridge_address, :l1_token);
+        let first_withdrawal_amount = daily_withdrawal_limit / 2;
+        let withdrawals = array![
+            BatchWithdrawal { l1_recipient: l1_recipient, amount: first_withdrawal_amount },
+            BatchWithdrawal {
+                l1_recipient: l1_recipient,
+                amount: daily_withdrawal_limit - first_withdrawal_amount + 1
+            },
+        ];
+        starknet::testing::set_contract_address(address: l2_recipient);
+        get_token_bridge(:token_bridge_address)
+            .initiate_token_withdraw_batch(:l1_token, withdrawals: withdrawals.span());
+    }
+
     // Tests the case where the withdrawal limit is on and there are two withdrawals in two
     // different times but in the same day, where the sum of both withdrawal's amount is above the
     // maximum allowed amount per that day.
@@ -2,6 +2,20 @@ use starknet::ClassHash;
 use starknet::ContractAddress;
 use starknet::EthAddress;
 
+// A single deposit of a batch deposit, sent in one message by StarknetTokenBridge.depositBatch.
+#[derive(Copy, Drop, Serde, PartialEq)]
+struct BatchDeposit {
+    l2_recipient: ContractAddress,
+    amount: u256,
+}
+
+// A single withdrawal of a batch withdrawal, sent in one message by initiate_token_withdraw_batch.
+#[derive(Copy, Drop, Serde, PartialEq)]
+struct BatchWithdrawal {
+    l1_recipient: EthAddress,
+    amount: u256,
+}
+
 #[starknet::interface]
 trait ITokenBridge<TContractState> {
     fn get_version(self: @TContractState) -> felt252;
@@ -13,4 +27,7 @@ trait ITokenBridge<TContractState> {
     fn initiate_token_withdraw(
         ref self: TContractState, l1_token: EthAddress, l1_recipient: EthAddress, amount: u256
     );
+    fn initiate_token_withdraw_batch(
+        ref self: TContractState, l1_token: EthAddress, withdrawals: Span<BatchWithdrawal>
+    );
 }
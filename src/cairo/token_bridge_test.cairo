@@ -23,7 +23,8 @@ mod token_bridge_test {
     use super::super::token_bridge::TokenBridge;
     use super::super::token_bridge::TokenBridge::{
         Event, L1BridgeSet, Erc20ClassHashStored, DeployHandled, WithdrawInitiated, DepositHandled,
-        deposit_handled, DepositWithMessageHandled, withdraw_initiated,
+        deposit_handled, DepositWithMessageHandled, DepositBatchHandled, withdraw_initiated,
+        WithdrawBatchInitiated, MAX_BATCH_SIZE,
     };
     use super::super::roles_interface::{
         IRolesDispatcher, IRolesDispatcherTrait, APP_GOVERNOR, APP_ROLE_ADMIN, GOVERNANCE_ADMIN,
@@ -33,7 +34,9 @@ mod token_bridge_test {
         UpgradeGovernorRemoved,
     };
 
-    use super::super::token_bridge_interface::{ITokenBridgeDispatcher, ITokenBridgeDispatcherTrait};
+    use super::super::token_bridge_interface::{
+        BatchDeposit, BatchWithdrawal, ITokenBridgeDispatcher, ITokenBridgeDispatcherTrait
+    };
     use super::super::token_bridge_admin_interface::{
         ITokenBridgeAdminDispatcher, ITokenBridgeAdminDispatcherTrait
     };
@@ -711,6 +714,152 @@ mod token_bridge_test {
             .initiate_token_withdraw(:l1_token, :l1_recipient, amount: amount_to_deposit + 1);
     }
 
+    #[test]
+    #[available_gas(30000000)]
+    fn test_successful_initiate_token_withdraw_batch() {
+        let (l1_bridge_address, l1_token, l1_recipient) = get_default_l1_addresses();
+        let depositor = EthAddress { address: DEFAULT_DEPOSITOR_ETH_ADDRESS };
+        let token_bridge_address = deploy_token_bridge();
+
+        // Deploy a new token and deposit funds to this token.
+        let l2_recipient = initial_owner();
+        let amount_to_deposit = default_amount();
+        deploy_new_token_and_deposit(
+            :token_bridge_address,
+            :l1_bridge_address,
+            :l1_token,
+            :depositor,
+            :l2_recipient,
+            :amount_to_deposit
+        );
+        let l2_token = get_token_bridge(:token_bridge_address).get_l2_token(:l1_token);
+        let erc20_token = get_erc20_token(:l2_token);
+        let total_supply = erc20_token.total_supply();
+
+        // Initiate a batch withdraw (set the caller to be the initial_owner), with two of its
+        // withdrawals to the same recipient.
+        let second_recipient = EthAddress { address: 8 };
+        let withdrawals = array![
+            BatchWithdrawal { l1_recipient: l1_recipient, amount: u256 { low: 700, high: 0 } },
+            BatchWithdrawal { l1_recipient: second_recipient, amount: u256 { low: 300, high: 0 } },
+            BatchWithdrawal { l1_recipient: l1_recipient, amount: u256 { low: 1, high: 0 } },
+        ];
+        let total_amount = u256 { low: 1001, high: 0 };
+        starknet::testing::set_contract_address(address: l2_recipient);
+        get_token_bridge(:token_bridge_address)
+            .initiate_token_withdraw_batch(:l1_token, withdrawals: withdrawals.span());
+
+        // The total amount is burnt at once.
+        assert(
+            erc20_token.balance_of(l2_recipient) == amount_to_deposit - total_amount,
+            'INCONSISTENT_WITHDRAW_BALANCE'
+        );
+        assert(
+            erc20_token.total_supply() == total_supply - total_amount,
+            'INIT_WITHDRAW_SUPPLY_ERROR'
+        );
+
+        // Validate event emission: a WithdrawInitiated event per withdrawal, then a
+        // WithdrawBatchInitiated.
+        let events = pop_last_k_events(address: token_bridge_address, k: 4);
+        let mut i = 0;
+        loop {
+            if i == withdrawals.len() {
+                break;
+            }
+            let withdrawal = *withdrawals[i];
+            let emitted_event = deserialize_event(*events.at(i));
+            assert(
+                emitted_event == Event::WithdrawInitiated(
+                    WithdrawInitiated {
+                        l1_token: l1_token,
+                        l1_recipient: withdrawal.l1_recipient,
+                        amount: withdrawal.amount,
+                        caller_address: l2_recipient
+                    }
+                ),
+                'WithdrawInitiated Error'
+            );
+            i = i + 1;
+        };
+        let emitted_event = deserialize_event(*events.at(3));
+        assert(
+            emitted_event == Event::WithdrawBatchInitiated(
+                WithdrawBatchInitiated {
+                    l1_token: l1_token,
+                    caller_address: l2_recipient,
+                    n_withdrawals: 3,
+                    total_amount: total_amount
+                }
+            ),
+            'WithdrawBatchInitiated Error'
+        );
+    }
+
+    #[test]
+    #[should_panic(expected: ('EMPTY_BATCH', 'ENTRYPOINT_FAILED',))]
+    #[available_gas(30000000)]
+    fn test_empty_initiate_token_withdraw_batch() {
+        let (_, l1_token, _) = get_default_l1_addresses();
+        let token_bridge_address = deploy_token_bridge();
+        let withdrawals: Array<BatchWithdrawal> = array![];
+        get_token_bridge(:token_bridge_address)
+            .initiate_token_withdraw_batch(:l1_token, withdrawals: withdrawals.span());
+    }
+
+    #[test]
+    #[should_panic(expected: ('BATCH_TOO_LARGE', 'ENTRYPOINT_FAILED',))]
+    #[available_gas(30000000)]
+    fn test_too_large_initiate_token_withdraw_batch() {
+        let (_, l1_token, l1_recipient) = get_default_l1_addresses();
+        let token_bridge_address = deploy_token_bridge();
+        let mut withdrawals: Array<BatchWithdrawal> = array![];
+        let mut i = 0;
+        loop {
+            if i == MAX_BATCH_SIZE + 1 {
+                break;
+            }
+            withdrawals
+                .append(
+                    BatchWithdrawal { l1_recipient: l1_recipient, amount: u256 { low: 1, high: 0 } }
+                );
+            i = i + 1;
+        };
+        get_token_bridge(:token_bridge_address)
+            .initiate_token_withdraw_batch(:l1_token, withdrawals: withdrawals.span());
+    }
+
+    #[test]
+    #[should_panic(expected: ('INSUFFICIENT_FUNDS', 'ENTRYPOINT_FAILED',))]
+    #[available_gas(30000000)]
+    fn test_excessive_amount_initiate_token_withdraw_batch() {
+        let (l1_bridge_address, l1_token, l1_recipient) = get_default_l1_addresses();
+
+        let token_bridge_address = deploy_token_bridge();
+        let depositor = EthAddress { address: DEFAULT_DEPOSITOR_ETH_ADDRESS };
+
+        // Deploy a new token and deposit funds to this token.
+        let l2_recipient = initial_owner();
+        let amount_to_deposit = default_amount();
+        deploy_new_token_and_deposit(
+            :token_bridge_address,
+            :l1_bridge_address,
+            :l1_token,
+            :depositor,
+            :l2_recipient,
+            :amount_to_deposit
+        );
+
+        // Each withdrawal is covered by the balance, but their total is not.
+        let withdrawals = array![
+            BatchWithdrawal { l1_recipient: l1_recipient, amount: amount_to_deposit },
+            BatchWithdrawal { l1_recipient: l1_recipient, amount: u256 { low: 1, high: 0 } },
+        ];
+        starknet::testing::set_contract_address(address: l2_recipient);
+        get_token_bridge(:token_bridge_address)
+            .initiate_token_withdraw_batch(:l1_token, withdrawals: withdrawals.span());
+    }
+
     #[test]
     #[available_gas(30000000)]
     fn test_successful_handle_token_deposit() {
@@ -816,6 +965,119 @@ mod token_bridge_test {
     }
 
 
+    #[test]
+    #[available_gas(30000000)]
+    fn test_successful_handle_deposit_batch() {
+        let (l1_bridge_address, l1_token, _) = get_default_l1_addresses();
+
+        let token_bridge_address = deploy_token_bridge();
+        let depositor = EthAddress { address: DEFAULT_DEPOSITOR_ETH_ADDRESS };
+
+        // Deploy a new token and deposit funds to this token.
+        let first_recipient = initial_owner();
+        let first_amount = default_amount();
+        deploy_new_token_and_deposit(
+            :token_bridge_address,
+            :l1_bridge_address,
+            :l1_token,
+            :depositor,
+            l2_recipient: first_recipient,
+            amount_to_deposit: first_amount
+        );
+
+        // Simulate an "handle_deposit_batch" l1 message, with two of its deposits to the same
+        // recipient.
+        let second_recipient = not_caller();
+        let batch_amounts = array![u256 { low: 17, high: 0 }, u256 { low: 5, high: 0 }];
+        let deposits = array![
+            BatchDeposit { l2_recipient: first_recipient, amount: *batch_amounts[0] },
+            BatchDeposit { l2_recipient: second_recipient, amount: *batch_amounts[1] },
+            BatchDeposit { l2_recipient: second_recipient, amount: *batch_amounts[1] },
+        ];
+        let mut token_bridge_state = TokenBridge::contract_state_for_testing();
+        TokenBridge::handle_deposit_batch(
+            ref token_bridge_state,
+            from_address: l1_bridge_address.into(),
+            :l1_token,
+            :depositor,
+            deposits: deposits.span()
+        );
+        assert_l2_account_balance(
+            :token_bridge_address,
+            :l1_token,
+            owner: first_recipient,
+            amount: first_amount + *batch_amounts[0]
+        );
+        assert_l2_account_balance(
+            :token_bridge_address,
+            :l1_token,
+            owner: second_recipient,
+            amount: *batch_amounts[1] + *batch_amounts[1]
+        );
+
+        // Validate event emission: a DepositHandled event per deposit, then a DepositBatchHandled.
+        let events = pop_last_k_events(address: token_bridge_address, k: 4);
+        let mut i = 0;
+        loop {
+            if i == deposits.len() {
+                break;
+            }
+            let deposit = *deposits[i];
+            let emitted_event = deserialize_event(*events.at(i));
+            assert(
+                emitted_event == Event::DepositHandled(
+                    DepositHandled {
+                        l1_token: l1_token,
+                        l2_recipient: deposit.l2_recipient,
+                        amount: deposit.amount
+                    }
+                ),
+                'DepositHandled Error'
+            );
+            i = i + 1;
+        };
+        let emitted_event = deserialize_event(*events.at(3));
+        assert(
+            emitted_event == Event::DepositBatchHandled(
+                DepositBatchHandled {
+                    depositor: depositor,
+                    l1_token: l1_token,
+                    n_deposits: 3,
+                    total_amount: *batch_amounts[0] + *batch_amounts[1] + *batch_amounts[1]
+                }
+            ),
+            'DepositBatchHandled Error'
+        );
+    }
+
+    #[test]
+    #[should_panic(expected: ('EXPECTED_FROM_BRIDGE_ONLY',))]
+    #[available_gas(30000000)]
+    fn test_handle_deposit_batch_not_from_l1_bridge() {
+        let (l1_bridge_address, l1_token, _) = get_default_l1_addresses();
+        let token_bridge_address = deploy_token_bridge();
+        let depositor = EthAddress { address: DEFAULT_DEPOSITOR_ETH_ADDRESS };
+        deploy_new_token_and_deposit(
+            :token_bridge_address,
+            :l1_bridge_address,
+            :l1_token,
+            :depositor,
+            l2_recipient: initial_owner(),
+            amount_to_deposit: default_amount()
+        );
+
+        let l1_not_bridge_address = EthAddress { address: NON_DEFAULT_L1_BRIDGE_ETH_ADDRESS };
+        let deposits = array![BatchDeposit { l2_recipient: initial_owner(), amount: 1 }];
+        let mut token_bridge_state = TokenBridge::contract_state_for_testing();
+        TokenBridge::handle_deposit_batch(
+            ref token_bridge_state,
+            from_address: l1_not_bridge_address.into(),
+            :l1_token,
+            :depositor,
+            deposits: deposits.span()
+        );
+    }
+
     #[test]
     #[should_panic(expected: ('DEPOSIT_REJECTED',))]
     #[available_gas(30000000)]
@@ -4,6 +4,7 @@ import "src/solidity/utils/Felt252.sol";
 
 contract FeltToStrTester {
     using Felt252 for string;
+    using UintFelt252 for uint256;
 
     function testSafeStrToFelt(string memory string_) public pure returns (uint256) {
         return string_.safeToFelt();
@@ -12,4 +13,65 @@ contract FeltToStrTester {
     function testStrToFelt(string memory string_) public pure returns (uint256) {
         return string_.toFelt();
     }
+
+    function testIsFelt(uint256 maybeFelt) public pure returns (bool) {
+        return maybeFelt.isFelt();
+    }
+
+    function testIsValidL2Address(uint256 l2Address) public pure returns (bool) {
+        return l2Address.isValidL2Address();
+    }
+
+    /*
+      Batched versions of the functions above, to evaluate many inputs in a single call.
+      reverted[i] is set (and felts[i] is 0) when toFelt reverts on strings[i].
+    */
+    function testStrToFeltBatch(string[] memory strings)
+        external
+        view
+        returns (uint256[] memory felts, bool[] memory reverted)
+    {
+        felts = new uint256[](strings.length);
+        reverted = new bool[](strings.length);
+        for (uint256 i = 0; i < strings.length; i++) {
+            try this.testStrToFelt(strings[i]) returns (uint256 felt) {
+                felts[i] = felt;
+            } catch {
+                reverted[i] = true;
+            }
+        }
+    }
+
+    function testSafeStrToFeltBatch(string[] memory strings)
+        external
+        pure
+        returns (uint256[] memory felts)
+    {
+        felts = new uint256[](strings.length);
+        for (uint256 i = 0; i < strings.length; i++) {
+            felts[i] = strings[i].safeToFelt();
+        }
+    }
+
+    function testIsFeltBatch(uint256[] memory values)
+        external
+        pure
+        returns (bool[] memory results)
+    {
+        results = new bool[](values.length);
+        for (uint256 i = 0; i < values.length; i++) {
+            results[i] = values[i].isFelt();
+        }
+    }
+
+    function testIsValidL2AddressBatch(uint256[] memory values)
+        external
+        pure
+        returns (bool[] memory results)
+    {
+        results = new bool[](values.length);
+        for (uint256 i = 0; i < values.length; i++) {
+            results[i] = values[i].isValidL2Address();
+        }
+    }
 }
@@ -7,9 +7,17 @@ uint256 constant HANDLE_TOKEN_DEPOSIT_SELECTOR = 7743973795241394462212061688409
 
 uint256 constant HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR = 247015267890530308727663503380700973440961674638638362173641612402089762826;
 
+uint256 constant HANDLE_DEPOSIT_BATCH_SELECTOR = 314959309503151657470730095839120732652636635566782679855646083691524097506;
+
 uint256 constant HANDLE_TOKEN_DEPLOYMENT_SELECTOR = 1737780302748468118210503507461757847859991634169290761669750067796330642876;
 
 uint256 constant TRANSFER_FROM_STARKNET = 0;
+uint256 constant TRANSFER_BATCH_FROM_STARKNET = 1;
+// The maximal number of deposits or withdrawals in a batch (bounds the gas of the L1 handler on L2
+// and of withdrawBatch on L1).
+uint256 constant MAX_BATCH_SIZE = 100;
+// The gas forwarded to the transfer of each withdrawal in a batch.
+uint256 constant BATCH_TRANSFER_GAS = 200000;
 uint256 constant UINT256_PART_SIZE_BITS = 128;
 uint256 constant UINT256_PART_SIZE = 2**UINT256_PART_SIZE_BITS;
 uint256 constant MAX_PENDING_DURATION = 5 days;
@@ -61,6 +61,7 @@ contract StarknetTokenBridge is
         uint256 nonce
     );
     event Withdrawal(address indexed recipient, address indexed token, uint256 amount);
+    event WithdrawalDeferred(address indexed recipient, address indexed token, uint256 amount);
     event SetL2TokenBridge(uint256 value);
     event SetMaxTotalBalance(address indexed token, uint256 value);
     event Deposit(
@@ -85,13 +86,43 @@ contract StarknetTokenBridge is
         uint256 indexed l2Recipient,
         uint256 nonce
     );
+    event DepositBatch(
+        address indexed sender,
+        address indexed token,
+        uint256[] amounts,
+        uint256[] l2Recipients,
+        uint256 nonce,
+        uint256 fee
+    );
+    event DepositBatchCancelRequest(
+        address indexed sender,
+        address indexed token,
+        uint256[] amounts,
+        uint256[] l2Recipients,
+        uint256 nonce
+    );
+    event DepositBatchReclaimed(
+        address indexed sender,
+        address indexed token,
+        uint256[] amounts,
+        uint256[] l2Recipients,
+        uint256 nonce
+    );
     event WithdrawalLimitEnabled(address indexed sender, address indexed token);
     event WithdrawalLimitDisabled(address indexed sender, address indexed token);
     uint256 constant N_DEPOSIT_PAYLOAD_ARGS = 5;
     uint256 constant DEPOSIT_MESSAGE_FIXED_SIZE = 1;
+    // A batch deposit payload is (token, depositor, nDeposits) followed by
+    // (l2Recipient, amountLow, amountHigh) per deposit.
+    uint256 constant DEPOSIT_BATCH_FIXED_SIZE = 3;
+    uint256 constant N_BATCH_DEPOSIT_ARGS = 3;
+    // A batch withdrawal payload is (TRANSFER_BATCH_FROM_STARKNET, token, nWithdrawals) followed by
+    // (recipient, amountLow, amountHigh) per withdrawal.
+    uint256 constant WITHDRAWAL_BATCH_FIXED_SIZE = 3;
+    uint256 constant N_BATCH_WITHDRAWAL_ARGS = 3;
 
     function identify() external pure virtual returns (string memory) {
-        return "StarkWare_StarknetTokenBridge_2.0_5";
+        return "StarkWare_StarknetTokenBridge_2.0_6";
     }
 
     function validateInitData(bytes calldata data) internal view virtual override {
@@ -311,6 +342,30 @@ contract StarknetTokenBridge is
         checkDeploymentStatus(token);
     }
 
+    /**
+        Deposits amounts[i] of the token to l2Recipients[i], for every i, in a single L1-to-L2
+        message (handled by the handle_deposit_batch L1 handler). The message fee and the fixed
+        costs of a deposit are paid once for the whole batch.
+        The batch is cancelled and reclaimed as a unit (see depositBatchCancelRequest).
+     */
+    function depositBatch(
+        address token,
+        uint256[] calldata amounts,
+        uint256[] calldata l2Recipients
+    ) external payable onlyServicingToken(token) {
+        require(l2TokenBridge() != 0, "L2_BRIDGE_NOT_SET");
+        uint256 fee = acceptDeposit(token, batchTotalAmount(amounts, l2Recipients));
+        (, uint256 nonce) = messagingContract().sendMessageToL2{value: fee}(
+            l2TokenBridge(),
+            HANDLE_DEPOSIT_BATCH_SELECTOR,
+            depositBatchMessagePayload(token, amounts, l2Recipients)
+        );
+        emit DepositBatch(msg.sender, token, amounts, l2Recipients, nonce, fee);
+
+        // Piggy-back the deposit tx to check and update the status of token bridge deployment.
+        checkDeploymentStatus(token);
+    }
+
     function emitDepositEvent(
         address token,
         uint256 amount,
@@ -428,6 +483,44 @@ contract StarknetTokenBridge is
             );
     }
 
+    /*
+      Validates a batch deposit and returns the total amount deposited in it.
+    */
+    function batchTotalAmount(uint256[] calldata amounts, uint256[] calldata l2Recipients)
+        private
+        pure
+        returns (uint256 totalAmount)
+    {
+        require(amounts.length == l2Recipients.length, "BATCH_LENGTH_MISMATCH");
+        require(amounts.length > 0, "EMPTY_BATCH");
+        require(amounts.length <= MAX_BATCH_SIZE, "BATCH_TOO_LARGE");
+        for (uint256 i = 0; i < amounts.length; i++) {
+            require(amounts[i] > 0, "ZERO_DEPOSIT");
+            require(l2Recipients[i].isValidL2Address(), "L2_ADDRESS_OUT_OF_RANGE");
+            totalAmount += amounts[i];
+        }
+    }
+
+    function depositBatchMessagePayload(
+        address token,
+        uint256[] calldata amounts,
+        uint256[] calldata l2Recipients
+    ) private view returns (uint256[] memory) {
+        uint256[] memory payload = new uint256[](
+            DEPOSIT_BATCH_FIXED_SIZE + N_BATCH_DEPOSIT_ARGS * amounts.length
+        );
+        payload[0] = uint256(uint160(token));
+        payload[1] = uint256(uint160(msg.sender));
+        payload[2] = amounts.length;
+        for (uint256 i = 0; i < amounts.length; i++) {
+            uint256 offset = DEPOSIT_BATCH_FIXED_SIZE + N_BATCH_DEPOSIT_ARGS * i;
+            payload[offset] = l2Recipients[i];
+            payload[offset + 1] = amounts[i] & (UINT256_PART_SIZE - 1);
+            payload[offset + 2] = amounts[i] >> UINT256_PART_SIZE_BITS;
+        }
+        return payload;
+    }
+
     function sendDeployMessage(address token) internal returns (bytes32) {
         require(l2TokenBridge() != 0, "L2_BRIDGE_NOT_SET");
         Fees.checkFee(msg.value);
@@ -503,6 +596,102 @@ contract StarknetTokenBridge is
         withdraw(token, amount, msg.sender);
     }
 
+    /**
+        Withdraws amounts[i] of the token to recipients[i], for every i, by consuming a single
+        message sent by initiate_token_withdraw_batch on L2. The withdrawal quota is consumed once,
+        for the total amount.
+        A recipient whose transfer fails (e.g. it is blacklisted by the token, or rejects ETH) does
+        not fail the batch. Its amount is deferred instead, and can be claimed later with
+        claimDeferredWithdrawal.
+        Note: unlike withdraw, each transfer of a batch is given only BATCH_TRANSFER_GAS (200k) gas.
+        A token or a recipient whose transfer needs more gas than that is always deferred, and its
+        amount can be received only through claimDeferredWithdrawal (which forwards all the gas).
+     */
+    function withdrawBatch(
+        address token,
+        address[] calldata recipients,
+        uint256[] calldata amounts
+    ) external {
+        require(recipients.length == amounts.length, "BATCH_LENGTH_MISMATCH");
+        require(amounts.length <= MAX_BATCH_SIZE, "BATCH_TOO_LARGE");
+        require(l2TokenBridge() != 0, "L2_BRIDGE_NOT_SET");
+
+        uint256[] memory payload = new uint256[](
+            WITHDRAWAL_BATCH_FIXED_SIZE + N_BATCH_WITHDRAWAL_ARGS * amounts.length
+        );
+        payload[0] = TRANSFER_BATCH_FROM_STARKNET;
+        payload[1] = uint256(uint160(token));
+        payload[2] = amounts.length;
+        uint256 totalAmount;
+        for (uint256 i = 0; i < amounts.length; i++) {
+            // Make sure we don't accidentally burn funds.
+            require(recipients[i] != address(0x0), "INVALID_RECIPIENT");
+            uint256 offset = WITHDRAWAL_BATCH_FIXED_SIZE + N_BATCH_WITHDRAWAL_ARGS * i;
+            payload[offset] = uint256(uint160(recipients[i]));
+            payload[offset + 1] = amounts[i] & (UINT256_PART_SIZE - 1);
+            payload[offset + 2] = amounts[i] >> UINT256_PART_SIZE_BITS;
+            totalAmount += amounts[i];
+        }
+        // The call to consumeMessageFromL2 will succeed only if a matching L2->L1 message
+        // exists and is ready for consumption.
+        messagingContract().consumeMessageFromL2(l2TokenBridge(), payload);
+
+        if (tokenSettings()[token].withdrawalLimitApplied) {
+            WithdrawalLimit.consumeWithdrawQuota(token, totalAmount);
+        }
+        for (uint256 i = 0; i < amounts.length; i++) {
+            // Make sure a failed transfer is caused by the recipient, and not by the caller
+            // starving it of gas.
+            require(gasleft() > 2 * BATCH_TRANSFER_GAS, "INSUFFICIENT_GAS");
+            try
+                this.transferOutBatchWithdrawal{gas: BATCH_TRANSFER_GAS}(
+                    token,
+                    amounts[i],
+                    recipients[i]
+                )
+            {
+                emit Withdrawal(recipients[i], token, amounts[i]);
+            } catch {
+                deferredWithdrawals()[keccak256(abi.encode(token, recipients[i]))] += amounts[i];
+                emit WithdrawalDeferred(recipients[i], token, amounts[i]);
+            }
+        }
+    }
+
+    /**
+        Transfers a single withdrawal of a batch. Called only by withdrawBatch (through an
+        external call, so that a failed transfer can be caught).
+     */
+    function transferOutBatchWithdrawal(
+        address token,
+        uint256 amount,
+        address recipient
+    ) external {
+        require(msg.sender == address(this), "ONLY_SELF");
+        transferOutFunds(token, amount, recipient);
+    }
+
+    /**
+        Transfers to the recipient the withdrawals of the token that were deferred by
+        withdrawBatch. May be called by anyone.
+     */
+    function claimDeferredWithdrawal(address token, address recipient) external {
+        bytes32 key = keccak256(abi.encode(token, recipient));
+        uint256 amount = deferredWithdrawals()[key];
+        require(amount > 0, "NO_DEFERRED_WITHDRAWAL");
+        deferredWithdrawals()[key] = 0;
+        transferOutFunds(token, amount, recipient);
+        emit Withdrawal(recipient, token, amount);
+    }
+
+    function getDeferredWithdrawal(address token, address recipient)
+        external
+        view
+        returns (uint256)
+    {
+        return deferredWithdrawals()[keccak256(abi.encode(token, recipient))];
+    }
+
     /*
       A deposit cancellation requires two steps:
       1. The depositor should send a depositCancelRequest request with deposit details & nonce.
@@ -602,4 +791,40 @@ contract StarknetTokenBridge is
         transferOutFunds(token, amount, msg.sender);
         emit DepositReclaimed(msg.sender, token, amount, l2Recipient, nonce);
     }
+
+    /*
+        See: depositCancelRequest docstring. A batch deposit is cancelled as a whole.
+    */
+    function depositBatchCancelRequest(
+        address token,
+        uint256[] calldata amounts,
+        uint256[] calldata l2Recipients,
+        uint256 nonce
+    ) external {
+        messagingContract().startL1ToL2MessageCancellation(
+            l2TokenBridge(),
+            HANDLE_DEPOSIT_BATCH_SELECTOR,
+            depositBatchMessagePayload(token, amounts, l2Recipients),
+            nonce
+        );
+
+        emit DepositBatchCancelRequest(msg.sender, token, amounts, l2Recipients, nonce);
+    }
+
+    function depositBatchReclaim(
+        address token,
+        uint256[] calldata amounts,
+        uint256[] calldata l2Recipients,
+        uint256 nonce
+    ) external {
+        messagingContract().cancelL1ToL2Message(
+            l2TokenBridge(),
+            HANDLE_DEPOSIT_BATCH_SELECTOR,
+            depositBatchMessagePayload(token, amounts, l2Recipients),
+            nonce
+        );
+
+        transferOutFunds(token, batchTotalAmount(amounts, l2Recipients), msg.sender);
+        emit DepositBatchReclaimed(msg.sender, token, amounts, l2Recipients, nonce);
+    }
 }
@@ -11,6 +11,7 @@ abstract contract StarknetTokenStorage {
     string internal constant MANAGER_TAG = "STARKNET_TOKEN_BRIDGE_MANAGER_SLOT_TAG";
     string internal constant MESSAGING_CONTRACT_TAG = "STARKNET_TOKEN_BRIDGE_MESSAGING_CONTRACT";
     string internal constant DEPOSITOR_ADDRESSES_TAG = "STARKNET_TOKEN_BRIDGE_DEPOSITOR_ADDRESSES";
+    string internal constant DEFERRED_WITHDRAWALS_TAG = "STARKNET_TOKEN_BRIDGE_DEFERRED_WITHDRAWALS";
 
     enum TokenStatus {
         Unknown,
@@ -54,6 +55,11 @@ abstract contract StarknetTokenStorage {
         return IStarknetMessaging(NamedStorage.getAddressValue(MESSAGING_CONTRACT_TAG));
     }
 
+    // Withdrawals of a batch whose transfer failed, keyed by (token, recipient).
+    function deferredWithdrawals() internal pure returns (mapping(bytes32 => uint256) storage) {
+        return NamedStorage.bytes32ToUint256Mapping(DEFERRED_WITHDRAWALS_TAG);
+    }
+
     // Storage Setters.
     function setManager(address contract_) internal {
         NamedStorage.setAddressValueOnce(MANAGER_TAG, contract_);
@@ -12,6 +12,8 @@ library WithdrawalLimit {
     uint256 constant DEFAULT_WITHDRAW_LIMIT_PCT = 5;
     string internal constant WITHDRAW_LIMIT_PCT_TAG = "WITHDRAWL_LIMIT_WITHDRAW_LIMIT_PCT_SLOT_TAG";
     string internal constant INTRADAY_QUOTA_TAG = "WITHDRAWL_LIMIT_INTRADAY_QUOTA_SLOT_TAG";
+    string internal constant PACKED_INTRADAY_QUOTA_TAG =
+        "WITHDRAWL_LIMIT_PACKED_INTRADAY_QUOTA_SLOT_TAG";
 
     function getWithdrawLimitPct() internal view returns (uint256) {
         return NamedStorage.getUintValue(WITHDRAW_LIMIT_PCT_TAG);
@@ -21,10 +23,13 @@ library WithdrawalLimit {
         NamedStorage.setUintValue(WITHDRAW_LIMIT_PCT_TAG, value);
     }
 
-    // Returns the key for the intraday allowance mapping.
+    function currentDay() private view returns (uint256) {
+        return block.timestamp / 86400;
+    }
+
+    // Returns the key for the legacy intraday allowance mapping.
     function withdrawQuotaKey(address token) internal view returns (bytes32) {
-        uint256 day = block.timestamp / 86400;
-        return keccak256(abi.encode(token, day));
+        return keccak256(abi.encode(token, currentDay()));
     }
 
     /**
@@ -44,25 +49,59 @@ library WithdrawalLimit {
     }
 
     /**
-        Returns the intraday quota mapping.
+        Returns the legacy intraday quota mapping, keyed by (token, day).
+        It is no longer written, and is read only for tokens without a packed intraday quota, so
+        that the quota of the day of the upgrade is kept.
      */
     function intradayQuota() internal pure returns (mapping(bytes32 => uint256) storage) {
         return NamedStorage.bytes32ToUint256Mapping(INTRADAY_QUOTA_TAG);
     }
 
+    /**
+        Returns the packed intraday quota mapping. The intraday quota of a token is kept in a single
+        slot, which is overwritten when the day changes: the day (offset by OFFSET) in the high
+        bits, and the remaining quota in the low QUOTA_BITS bits.
+     */
+    function packedIntradayQuota() internal pure returns (mapping(address => uint256) storage) {
+        return NamedStorage.addressToUint256Mapping(PACKED_INTRADAY_QUOTA_TAG);
+    }
+
     // The offset is used to distinguish between an unset value and a value of 0.
     uint256 constant OFFSET = 1;
+    uint256 constant QUOTA_BITS = 224;
+    uint256 constant MAX_PACKED_QUOTA = 2**QUOTA_BITS - 1;
 
-    function isWithdrawQuotaInitialized(address token) private view returns (bool) {
-        return intradayQuota()[withdrawQuotaKey(token)] != 0;
-    }
-
-    function getIntradayQuota(address token) internal view returns (uint256) {
-        return intradayQuota()[withdrawQuotaKey(token)] - OFFSET;
+    /**
+        Returns the remaining quota stored for today, if there is one.
+     */
+    function getIntradayQuota(address token)
+        internal
+        view
+        returns (bool isInitialized, uint256 quota)
+    {
+        uint256 packedQuota = packedIntradayQuota()[token];
+        if (packedQuota >> QUOTA_BITS == currentDay() + OFFSET) {
+            return (true, packedQuota & MAX_PACKED_QUOTA);
+        }
+        if (packedQuota == 0) {
+            // The quota of today may have been stored before the upgrade to the packed layout.
+            uint256 legacyQuota = intradayQuota()[withdrawQuotaKey(token)];
+            if (legacyQuota != 0) {
+                return (true, legacyQuota - OFFSET);
+            }
+        }
+        return (false, 0);
     }
 
+    /**
+        Stores the remaining quota of today. Quotas above MAX_PACKED_QUOTA are capped, which may
+        only make the limit stricter.
+     */
     function setIntradayQuota(address token, uint256 value) private {
-        intradayQuota()[withdrawQuotaKey(token)] = value + OFFSET;
+        if (value > MAX_PACKED_QUOTA) {
+            value = MAX_PACKED_QUOTA;
+        }
+        packedIntradayQuota()[token] = ((currentDay() + OFFSET) << QUOTA_BITS) | value;
     }
 
     /**
@@ -70,10 +109,11 @@ library WithdrawalLimit {
         If the daily allowance was not yet set, it is calculated and returned.
      */
     function getRemainingIntradayAllowance(address token) internal view returns (uint256) {
-        if (!isWithdrawQuotaInitialized(token)) {
+        (bool isInitialized, uint256 quota) = getIntradayQuota(token);
+        if (!isInitialized) {
             return calculateIntradayAllowance(token);
         }
-        return getIntradayQuota(token);
+        return quota;
     }
 
     /**
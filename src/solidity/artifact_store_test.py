@@ -0,0 +1,120 @@
+import importlib.util
+import json
+import os
+
+from solidity.utils import ARTIFACT_HASHES_FILE_NAME, ArtifactBundle, ArtifactStore
+
+EXTRACT_ARTIFACTS_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts", "extract_artifacts.py"
+)
+
+
+def load_extract_artifacts():
+    spec = importlib.util.spec_from_file_location("extract_artifacts", EXTRACT_ARTIFACTS_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_artifact(directory, name: str, abi: list):
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as artifact_file:
+        json.dump({"contractName": name, "abi": abi, "bytecode": None}, artifact_file)
+    return path
+
+
+def test_artifacts_are_loaded_lazily_and_cached(tmp_path):
+    store = ArtifactStore(directory=str(tmp_path))
+    write_artifact(tmp_path, "Contract", abi=[])
+
+    artifact = store.Contract
+    assert artifact["contractName"] == "Contract"
+    assert store.load("Contract") is artifact
+
+
+def test_rebuilt_artifacts_are_reloaded(tmp_path):
+    store = ArtifactStore(directory=str(tmp_path))
+    path = write_artifact(tmp_path, "Contract", abi=[])
+    assert store.Contract["abi"] == []
+
+    write_artifact(tmp_path, "Contract", abi=[{"type": "fallback"}])
+    # Make sure the modification time changes, even on coarse-grained file systems.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.Contract["abi"] == [{"type": "fallback"}]
+
+
+def test_least_recently_used_artifacts_are_evicted(tmp_path):
+    store = ArtifactStore(directory=str(tmp_path), max_size=2)
+    for name in ["A", "B", "C"]:
+        write_artifact(tmp_path, name, abi=[])
+
+    a = store.A
+    store.B
+    assert store.A is a
+    store.C
+    # B is the least recently used artifact, hence evicted.
+    assert store._cache.keys() == {"A", "C"}
+
+
+def write_hashes(directory, artifacts: list):
+    extract_artifacts = load_extract_artifacts()
+    hashes = {
+        artifact["contractName"]: extract_artifacts.artifact_hash(artifact)
+        for artifact in artifacts
+    }
+    with open(os.path.join(directory, ARTIFACT_HASHES_FILE_NAME), "w") as hashes_file:
+        json.dump(hashes, hashes_file)
+
+
+def test_bundle(tmp_path):
+    bundled = [
+        {"contractName": "A", "abi": [{"type": "fallback"}], "bytecode": "0x6080604052"},
+        {"contractName": "Virtual", "abi": [], "bytecode": None},
+    ]
+    bundle_path = str(tmp_path / "artifacts.bundle")
+    load_extract_artifacts().write_bundle(artifacts=bundled, bundle_path=bundle_path)
+    write_hashes(tmp_path, bundled)
+
+    bundle = ArtifactBundle(bundle_path)
+    assert "A" in bundle and "B" not in bundle
+    assert [bundle.load(artifact["contractName"]) for artifact in bundled] == bundled
+    bundle.close()
+
+    # Artifacts that are not in the bundle are read from their json files.
+    write_artifact(tmp_path, "B", abi=[])
+    store = ArtifactStore(directory=str(tmp_path), bundle_path=bundle_path)
+    assert store.A == bundled[0]
+    assert store.B["contractName"] == "B"
+
+
+def test_stale_bundle_is_ignored(tmp_path):
+    bundled = {"contractName": "A", "abi": [], "bytecode": "0x6080604052"}
+    bundle_path = str(tmp_path / "artifacts.bundle")
+    load_extract_artifacts().write_bundle(artifacts=[bundled], bundle_path=bundle_path)
+    write_hashes(tmp_path, [bundled])
+    store = ArtifactStore(directory=str(tmp_path), bundle_path=bundle_path)
+    assert store.A == bundled
+
+    # A is extracted again (without --output_bundle), so the bundled A is outdated.
+    write_artifact(tmp_path, "A", abi=[{"type": "fallback"}])
+    write_hashes(tmp_path, [{"contractName": "A", "abi": [{"type": "fallback"}], "bytecode": None}])
+    hashes_path = os.path.join(tmp_path, ARTIFACT_HASHES_FILE_NAME)
+    stat = os.stat(hashes_path)
+    os.utime(hashes_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.A["abi"] == [{"type": "fallback"}]
+
+
+def test_unchanged_artifacts_are_not_rewritten(tmp_path):
+    extract_artifacts = load_extract_artifacts()
+    artifact = {"contractName": "A", "abi": [], "bytecode": "0x6080604052"}
+    _, content_hash, status = extract_artifacts.write_artifact(artifact, str(tmp_path), None)
+    assert status == "added"
+
+    path = str(tmp_path / "A.json")
+    mtime_ns = os.stat(path).st_mtime_ns
+    assert extract_artifacts.write_artifact(artifact, str(tmp_path), content_hash)[2] == "unchanged"
+    assert os.stat(path).st_mtime_ns == mtime_ns
+
+    artifact["bytecode"] = "0x6081604052"
+    assert extract_artifacts.write_artifact(artifact, str(tmp_path), content_hash)[2] == "updated"
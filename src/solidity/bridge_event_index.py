@@ -0,0 +1,344 @@
+"""
+An on-disk (SQLite) index of the Deposit, DepositWithMessage, DepositBatch and Withdrawal events of
+the token bridges, with secondary indexes on token, depositor, L2 recipient and nonce.
+A DepositBatch event is indexed as a deposit per recipient, all with the nonce of the batch.
+The index is caught up incrementally: every catch_up() call only fetches the blocks after the
+last indexed one.
+"""
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+from web3._utils.events import get_event_data
+
+DEPOSIT_EVENTS = ("Deposit", "DepositWithMessage")
+DEPOSIT_BATCH_EVENT = "DepositBatch"
+WITHDRAWAL_EVENT = "Withdrawal"
+# The number of blocks fetched in a single eth_getLogs request.
+DEFAULT_BLOCK_CHUNK_SIZE = 2000
+
+# Stored as the user_version of the database. An index of another version is rebuilt.
+SCHEMA_VERSION = 1
+DROP_SCHEMA = """
+DROP TABLE IF EXISTS deposits;
+DROP TABLE IF EXISTS withdrawals;
+DROP TABLE IF EXISTS indexed_blocks;
+"""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deposits (
+    bridge TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    token TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    l2_recipient TEXT NOT NULL,
+    nonce TEXT NOT NULL,
+    fee TEXT NOT NULL,
+    message TEXT,
+    batch_index INTEGER NOT NULL,
+    PRIMARY KEY (block_number, log_index, batch_index)
+);
+CREATE INDEX IF NOT EXISTS deposits_token ON deposits (token);
+CREATE INDEX IF NOT EXISTS deposits_sender ON deposits (sender);
+CREATE INDEX IF NOT EXISTS deposits_l2_recipient ON deposits (l2_recipient);
+CREATE INDEX IF NOT EXISTS deposits_nonce ON deposits (nonce);
+CREATE TABLE IF NOT EXISTS withdrawals (
+    bridge TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    token TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS withdrawals_recipient ON withdrawals (recipient);
+CREATE INDEX IF NOT EXISTS withdrawals_token ON withdrawals (token);
+CREATE TABLE IF NOT EXISTS indexed_blocks (
+    bridge TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL
+);
+"""
+
+
+class DepositRecord(NamedTuple):
+    bridge: str
+    block_number: int
+    log_index: int
+    tx_hash: str
+    event: str
+    sender: str
+    token: str
+    amount: int
+    l2_recipient: int
+    nonce: int
+    fee: int
+    # None for Deposit and DepositBatch events.
+    message: Optional[List[int]]
+    # The position of the deposit in its DepositBatch event (0 for the other events).
+    batch_index: int
+
+
+class WithdrawalRecord(NamedTuple):
+    bridge: str
+    block_number: int
+    log_index: int
+    tx_hash: str
+    recipient: str
+    token: str
+    amount: int
+
+
+def encode_uint(value: int) -> str:
+    # uint256 values do not fit in SQLite integers. Fixed-width hex keeps them comparable.
+    return f"{value:064x}"
+
+
+def decode_uint(value: str) -> int:
+    return int(value, 16)
+
+
+def normalize_address(address: str) -> str:
+    return address.lower()
+
+
+class BridgeEventDecoder:
+    """
+    Decodes the logs of the given events of a contract in a single pass, by their topic.
+    """
+
+    def __init__(self, w3: Web3, abi: List[dict], event_names: List[str]):
+        self.w3 = w3
+        self.event_abis: Dict[bytes, dict] = {
+            event_abi_to_log_topic(entry): entry
+            for entry in abi
+            if entry["type"] == "event" and entry["name"] in event_names
+        }
+
+    @property
+    def topics(self) -> List[str]:
+        return [Web3.toHex(topic) for topic in self.event_abis]
+
+    def decode(self, log: Dict[str, Any]) -> Optional[Any]:
+        """
+        Returns the decoded event of the log, or None if it is not one of the decoded events.
+        """
+        if len(log["topics"]) == 0:
+            return None
+        event_abi = self.event_abis.get(bytes(log["topics"][0]))
+        return None if event_abi is None else get_event_data(self.w3.codec, event_abi, log)
+
+    def decode_receipt(self, w3_tx_receipt: dict, address: Optional[str] = None) -> List[Any]:
+        events = [self.decode(log) for log in w3_tx_receipt["logs"]]
+        return [
+            event
+            for event in events
+            if event is not None
+            and (address is None or normalize_address(event.address) == normalize_address(address))
+        ]
+
+
+class BridgeEventIndex:
+    """
+    Indexes the deposit and withdrawal events of a single bridge into a SQLite database, which may
+    be shared by the indexes of several bridges.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        w3: Web3,
+        bridge_address: str,
+        bridge_abi: List[dict],
+        start_block: int = 0,
+        block_chunk_size: int = DEFAULT_BLOCK_CHUNK_SIZE,
+    ):
+        self.w3 = w3
+        self.bridge = normalize_address(bridge_address)
+        self.checksum_bridge = Web3.toChecksumAddress(bridge_address)
+        self.start_block = start_block
+        self.block_chunk_size = block_chunk_size
+        self.decoder = BridgeEventDecoder(
+            w3=w3,
+            abi=bridge_abi,
+            event_names=[*DEPOSIT_EVENTS, DEPOSIT_BATCH_EVENT, WITHDRAWAL_EVENT],
+        )
+        self.connection = sqlite3.connect(path)
+        # Readers do not block the indexer, nor the other way around.
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            # The index only holds chain data, so an index of an older schema is re-indexed.
+            self.connection.executescript(DROP_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    @property
+    def last_indexed_block(self) -> int:
+        row = self.connection.execute(
+            "SELECT last_block FROM indexed_blocks WHERE bridge = ?", (self.bridge,)
+        ).fetchone()
+        return self.start_block - 1 if row is None else row[0]
+
+    def catch_up(self, to_block: Optional[int] = None, confirmations: int = 0) -> int:
+        """
+        Indexes the events from the block after the last indexed one, up to to_block (by default,
+        the latest block that has the given number of confirmations).
+        Every chunk of blocks is committed atomically with the new last indexed block, so an
+        interrupted catch up resumes where it stopped.
+        Returns the number of newly indexed deposits and withdrawals (a batch deposit counts once
+        per recipient).
+        """
+        if to_block is None:
+            to_block = self.w3.eth.block_number - confirmations
+        n_events = 0
+        from_block = self.last_indexed_block + 1
+        while from_block <= to_block:
+            chunk_end = min(from_block + self.block_chunk_size - 1, to_block)
+            logs = self.w3.eth.get_logs(
+                {
+                    "address": self.checksum_bridge,
+                    "fromBlock": from_block,
+                    "toBlock": chunk_end,
+                    "topics": [self.decoder.topics],
+                }
+            )
+            n_events += self._index_logs(logs=logs, last_block=chunk_end)
+            from_block = chunk_end + 1
+        return n_events
+
+    def _index_logs(self, logs: List[dict], last_block: int) -> int:
+        deposits = []
+        withdrawals = []
+        for log in logs:
+            event = self.decoder.decode(log)
+            if event is None:
+                continue
+            location = (self.bridge, event.blockNumber, event.logIndex, event.transactionHash.hex())
+            args = event.args
+            if event.event == WITHDRAWAL_EVENT:
+                withdrawals.append(
+                    (
+                        *location,
+                        normalize_address(args.recipient),
+                        normalize_address(args.token),
+                        encode_uint(args.amount),
+                    )
+                )
+            elif event.event == DEPOSIT_BATCH_EVENT:
+                # The fee of the batch is paid once, and is attributed to its first deposit.
+                for batch_index, (amount, l2_recipient) in enumerate(
+                    zip(args.amounts, args.l2Recipients)
+                ):
+                    deposits.append(
+                        (
+                            *location,
+                            event.event,
+                            normalize_address(args.sender),
+                            normalize_address(args.token),
+                            encode_uint(amount),
+                            encode_uint(l2_recipient),
+                            encode_uint(args.nonce),
+                            encode_uint(args.fee if batch_index == 0 else 0),
+                            None,
+                            batch_index,
+                        )
+                    )
+            else:
+                message = args.get("message")
+                deposits.append(
+                    (
+                        *location,
+                        event.event,
+                        normalize_address(args.sender),
+                        normalize_address(args.token),
+                        encode_uint(args.amount),
+                        encode_uint(args.l2Recipient),
+                        encode_uint(args.nonce),
+                        encode_uint(args.fee),
+                        None if message is None else json.dumps(list(message)),
+                        0,
+                    )
+                )
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO deposits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", deposits
+            )
+            self.connection.executemany(
+                "INSERT INTO withdrawals VALUES (?, ?, ?, ?, ?, ?, ?)", withdrawals
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO indexed_blocks VALUES (?, ?)", (self.bridge, last_block)
+            )
+        return len(deposits) + len(withdrawals)
+
+    def iter_deposits(
+        self,
+        token: Optional[str] = None,
+        depositor: Optional[str] = None,
+        l2_recipient: Optional[int] = None,
+        nonce: Optional[int] = None,
+    ) -> Iterator[DepositRecord]:
+        """
+        Yields the indexed deposits of the bridge that match all the given filters, in chain order
+        (hence, in nonce order, and in batch order within a batch), without loading them all to
+        memory.
+        """
+        filters = {
+            "token": None if token is None else normalize_address(token),
+            "sender": None if depositor is None else normalize_address(depositor),
+            "l2_recipient": None if l2_recipient is None else encode_uint(l2_recipient),
+            "nonce": None if nonce is None else encode_uint(nonce),
+        }
+        rows = self._select(
+            table="deposits", filters=filters, order_by=("block_number", "log_index", "batch_index")
+        )
+        for row in rows:
+            yield DepositRecord(
+                *row[:7],
+                amount=decode_uint(row[7]),
+                l2_recipient=decode_uint(row[8]),
+                nonce=decode_uint(row[9]),
+                fee=decode_uint(row[10]),
+                message=None if row[11] is None else json.loads(row[11]),
+                batch_index=row[12],
+            )
+
+    def deposits(self, **filters) -> List[DepositRecord]:
+        return list(self.iter_deposits(**filters))
+
+    def withdrawals(
+        self, token: Optional[str] = None, recipient: Optional[str] = None
+    ) -> List[WithdrawalRecord]:
+        filters = {
+            "token": None if token is None else normalize_address(token),
+            "recipient": None if recipient is None else normalize_address(recipient),
+        }
+        return [
+            WithdrawalRecord(*row[:6], amount=decode_uint(row[6]))
+            for row in self._select(table="withdrawals", filters=filters)
+        ]
+
+    def _select(
+        self,
+        table: str,
+        filters: Dict[str, Optional[str]],
+        order_by: Tuple[str, ...] = ("block_number", "log_index"),
+    ) -> sqlite3.Cursor:
+        conditions = {"bridge": self.bridge}
+        conditions.update((column, value) for column, value in filters.items() if value is not None)
+        where = " AND ".join(f"{column} = ?" for column in conditions)
+        return self.connection.execute(
+            f"SELECT * FROM {table} WHERE {where} ORDER BY {', '.join(order_by)}",
+            tuple(conditions.values()),
+        )
@@ -1,10 +1,20 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Iterator, List, Optional, Type
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple, Type
 
 import pytest
 import pytest_asyncio
-from solidity.utils import load_contract, load_legacy_contract, str_to_felt
+from solidity.bridge_event_index import DEPOSIT_BATCH_EVENT, DEPOSIT_EVENTS, BridgeEventDecoder
+from solidity.deposit_messages import (
+    HANDLE_DEPOSIT_BATCH_SELECTOR,
+    HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR,
+    HANDLE_TOKEN_DEPOSIT_SELECTOR,
+)
+from solidity.eth_snapshot import EthSnapshots
+from solidity.fee_oracle import FeeOracle
+from solidity.utils import artifacts, legacy_artifacts, str_to_felt
+from solidity.worker_chain import shared_tmp_dir, worker_eth_test_utils
 from starkware.starknet.business_logic.state.state_api_objects import BlockInfo
 
 from starkware.eth.eth_test_utils import (
@@ -15,15 +25,8 @@ from starkware.eth.eth_test_utils import (
 )
 
 from starkware.starknet.testing.starknet import Starknet
-from starkware.starknet.testing.contracts import MockStarknetMessaging
-from solidity.contracts import StarknetTokenBridge, starkgate_registry, starkgate_manager
-from solidity.test_contracts import (
-    StarknetEthBridgeTester,
-    StarknetTokenBridgeTester,
-    StarknetERC20BridgeTester,
-    SelfRemoveTester,
-    FeeTester,
-)
+from web3.contract import ContractFunction
+from solidity import contracts, test_contracts
 
 DYNAMIC_FEE = -1
 DEFAULT_DEPOSIT_FEE = 100_000 * 10**9  # 100_000 gwei.
@@ -34,17 +37,19 @@ PENDING = 1
 ACTIVE = 2
 DEACTIVATED = 3
 
-HANDLE_TOKEN_DEPOSIT_SELECTOR = (
-    774397379524139446221206168840917193112228400237242521560346153613428128537
-)
-HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR = (
-    247015267890530308727663503380700973440961674638638362173641612402089762826
-)
-
 HANDLE_TOKEN_DEPLOYMENT_SELECTOR = (
     1737780302748468118210503507461757847859991634169290761669750067796330642876
 )
 
+# The type of an L2-L1 withdrawal message (first payload element).
+TRANSFER_FROM_STARKNET = 0
+TRANSFER_BATCH_FROM_STARKNET = 1
+WITHDRAWAL_PAYLOAD_LENGTH = 5
+# The number of withdrawal messages registered in a single mock messaging transaction.
+WITHDRAWAL_REGISTRATION_BATCH_SIZE = 500
+# The maximal number of deposits in a batch, as in StarkgateConstants.sol.
+MAX_BATCH_SIZE = 100
+
 
 UPGRADE_DELAY = 0
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
@@ -57,6 +62,30 @@ INITIAL_BALANCE = 10**20
 L2_TOKEN_CONTRACT = 42
 MAX_UINT = 2**256 - 1
 DAY_IN_SECONDS = 24 * 60 * 60
+# Gas limit of each pipelined transaction (set explicitly to save a gas estimation per call).
+BATCH_TX_GAS = 1_000_000
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="Record the gas used by the benchmarks as the new baseline instead of checking it.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "gas_benchmark: checks the gas used against the recorded gas baseline."
+    )
+
+
+def pytest_collection_modifyitems(items):
+    # A test that checks the gas baseline fails until its baseline is recorded, so the benchmarks
+    # are marked to be run separately (tests.sh deselects them).
+    for item in items:
+        if "gas_baseline" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.gas_benchmark)
 
 
 @pytest.fixture(scope="session")
@@ -66,17 +95,6 @@ def event_loop():
     loop.close()
 
 
-TestERC20 = load_contract("TestERC20")
-Proxy = load_contract("Proxy")
-LegacyProxy = load_legacy_contract("Proxy")
-LegacyEthBridge = load_legacy_contract("StarknetEthBridge")
-LegacyERC20Bridge = load_legacy_contract("StarknetERC20Bridge")
-UpgradeAssistEIC = load_contract("StarkgateUpgradeAssistExternalInitializer")
-StarknetEthBridge = load_contract("StarknetEthBridge")
-StarknetERC20Bridge = load_contract("StarknetERC20Bridge")
-StarknetTokenBridge = load_contract("StarknetTokenBridge")
-
-
 def advance_time(starknet: Starknet, block_time_diff: int, block_num_diff: int = 1):
     """
     Advances timestamp/blocknum on the starknet object.
@@ -106,22 +124,22 @@ async def session_starknet() -> Starknet:
 
 
 def deploy_proxy(governor: EthAccount) -> EthContract:
-    proxy = governor.deploy(Proxy, UPGRADE_DELAY)
+    proxy = governor.deploy(artifacts.Proxy, UPGRADE_DELAY)
     proxy.registerUpgradeGovernor(governor.address)
     return proxy
 
 
 def deploy_legacy_proxy(governor: EthAccount) -> EthContract:
-    legacyProxy = governor.deploy(LegacyProxy, UPGRADE_DELAY)
+    legacyProxy = governor.deploy(legacy_artifacts.Proxy, UPGRADE_DELAY)
     return legacyProxy
 
 
 def deploy_legacy_eth_bridge(governor: EthAccount) -> EthContract:
-    return governor.deploy(LegacyEthBridge)
+    return governor.deploy(legacy_artifacts.StarknetEthBridge)
 
 
 def deploy_legacy_erc20_bridge(governor: EthAccount) -> EthContract:
-    return governor.deploy(LegacyERC20Bridge)
+    return governor.deploy(legacy_artifacts.StarknetERC20Bridge)
 
 
 def add_implementation_and_upgrade(proxy, new_impl, init_data, governor, is_finalizing=False):
@@ -176,8 +194,9 @@ def chain_hexes_to_bytes(hexes: List[str]) -> bytes:
 
 
 @pytest.fixture(scope="session")
-def eth_test_utils() -> Iterator[EthTestUtils]:
-    with EthTestUtils.context_manager() as val:
+def eth_test_utils(tmp_path_factory: pytest.TempPathFactory) -> Iterator[EthTestUtils]:
+    # Each pytest-xdist worker runs its own session, and therefore gets its own local chain.
+    with worker_eth_test_utils(lock_dir=shared_tmp_dir(tmp_path_factory)) as val:
         yield val
 
 
@@ -192,55 +211,82 @@ def regular_user(eth_test_utils: EthTestUtils) -> EthContract:
     return eth_test_utils.accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def eth_snapshots(eth_test_utils: EthTestUtils) -> EthSnapshots:
+    return EthSnapshots(eth_test_utils)
+
+
+@pytest.fixture(autouse=True)
+def eth_isolation(request: pytest.FixtureRequest) -> Iterator[None]:
+    """
+    Reverts the local chain after every test that uses it.
+    The contracts deployed by the session-scoped fixtures are deployed once per session, and each
+    test starts from a snapshot taken right after them (pytest sets up higher-scoped fixtures
+    first), so tests never observe each other's transactions.
+    Tests that don't depend on the chain (directly or through other fixtures) don't start it.
+    """
+    if "eth_test_utils" not in request.fixturenames:
+        yield
+        return
+    eth_snapshots: EthSnapshots = request.getfixturevalue("eth_snapshots")
+    with eth_snapshots.isolate():
+        yield
+
+
+@pytest.fixture(scope="session")
 def fee_tester(governor: EthAccount) -> EthContract:
-    return governor.deploy(FeeTester)
+    return governor.deploy(test_contracts.FeeTester)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def withdrawal_limit_tester(governor: EthAccount) -> EthContract:
+    return governor.deploy(test_contracts.WithdrawalLimitTester)
+
+
+@pytest.fixture(scope="session")
 def mock_erc20_contract(governor: EthAccount) -> EthContract:
-    erc20_contract = governor.deploy(TestERC20)
+    erc20_contract = governor.deploy(artifacts.TestERC20)
     erc20_contract.setBalance.transact(governor.address, INITIAL_BALANCE)
     return erc20_contract
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def erc20_contract_address_list(governor: EthAccount) -> list[str]:
-    return [governor.deploy(TestERC20).address for _ in range(3)]
+    return [governor.deploy(artifacts.TestERC20).address for _ in range(3)]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def messaging_contract(governor: EthAccount) -> EthContract:
-    return governor.deploy(MockStarknetMessaging, MESSAGE_CANCEL_DELAY)
+    return governor.deploy(test_contracts.BulkMockStarknetMessaging, MESSAGE_CANCEL_DELAY)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def registry_proxy(governor: EthAccount) -> EthContract:
     return deploy_proxy(governor=governor)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def manager_proxy(governor: EthAccount, registry_proxy: EthContract) -> EthContract:
     assert registry_proxy  # Order enforcement.
     return deploy_proxy(governor=governor)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def bridge_proxy(governor: EthAccount, manager_proxy: EthContract) -> EthContract:
     assert manager_proxy  # Order enforcement.
     return deploy_proxy(governor=governor)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def self_remove_tester_proxy(governor: EthAccount) -> EthContract:
     return deploy_proxy(governor=governor)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def self_remove_tester_contract(
     governor: EthAccount, self_remove_tester_proxy: EthContract
 ) -> EthContract:
-    self_remove_tester_impl = governor.deploy(SelfRemoveTester)
+    self_remove_tester_impl = governor.deploy(test_contracts.SelfRemoveTester)
     init_data = chain_hexes_to_bytes([ZERO_ADDRESS])
     add_implementation_and_upgrade(
         proxy=self_remove_tester_proxy,
@@ -251,11 +297,11 @@ def self_remove_tester_contract(
     return self_remove_tester_proxy.replace_abi(abi=self_remove_tester_impl.abi)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def registry_contract(
     governor: EthAccount, registry_proxy: EthContract, manager_proxy: EthContract
 ) -> EthContract:
-    starkgate_registry_impl = governor.deploy(starkgate_registry)
+    starkgate_registry_impl = governor.deploy(contracts.starkgate_registry)
     init_data = chain_hexes_to_bytes([ZERO_ADDRESS, manager_proxy.address])
     add_implementation_and_upgrade(
         proxy=registry_proxy,
@@ -266,14 +312,14 @@ def registry_contract(
     return registry_proxy.replace_abi(abi=starkgate_registry_impl.abi)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def manager_contract(
     governor: EthAccount,
     registry_proxy: EthContract,
     manager_proxy: EthContract,
     bridge_proxy: EthContract,
 ) -> EthContract:
-    starkgate_manager_impl = governor.deploy(starkgate_manager)
+    starkgate_manager_impl = governor.deploy(contracts.starkgate_manager)
     init_data = chain_hexes_to_bytes([ZERO_ADDRESS, registry_proxy.address, bridge_proxy.address])
     add_implementation_and_upgrade(
         proxy=manager_proxy,
@@ -284,14 +330,14 @@ def manager_contract(
     return manager_proxy.replace_abi(abi=starkgate_manager_impl.abi)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def bridge_contract(
     governor: EthAccount,
     bridge_proxy: EthContract,
     manager_contract: EthContract,
     messaging_contract: EthContract,
 ) -> EthContract:
-    starkgate_bridge_impl = governor.deploy(StarknetTokenBridge)
+    starkgate_bridge_impl = governor.deploy(contracts.StarknetTokenBridge)
     init_data = chain_hexes_to_bytes(
         [
             ZERO_ADDRESS,
@@ -312,7 +358,7 @@ def bridge_contract(
     return bridge
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app_role_admin(
     eth_test_utils: EthTestUtils, governor: EthAccount, manager_contract: EthContract
 ) -> EthContract:
@@ -322,7 +368,7 @@ def app_role_admin(
     return eth_test_utils.accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def token_admin(
     eth_test_utils: EthTestUtils, app_role_admin: EthContract, manager_contract: EthContract
 ) -> EthContract:
@@ -332,6 +378,21 @@ def token_admin(
     return eth_test_utils.accounts[2]
 
 
+@dataclass
+class BatchOperationResult:
+    """
+    The outcome of a single operation of a pipelined batch.
+    """
+
+    w3_tx_receipt: dict
+    # The amount of tokens the operation cost (see TokenBridgeWrapper.get_tx_cost).
+    cost: int
+
+    @property
+    def succeeded(self) -> bool:
+        return self.w3_tx_receipt["status"] == 1
+
+
 class TokenBridgeWrapper(ABC):
     """
     Wraps a StarknetTokenBridge so that all deriving contracts of it can be called with the same
@@ -348,10 +409,11 @@ class TokenBridgeWrapper(ABC):
         eth_test_utils: EthTestUtils,
         init_data: bytes,
     ):
+        self.w3 = eth_test_utils.w3
         self.default_user = eth_test_utils.accounts[0]
         self.non_default_user = eth_test_utils.accounts[1]
         self.contract = self.default_user.deploy(compiled_bridge_contract)
-        proxy = self.default_user.deploy(Proxy, UPGRADE_DELAY)
+        proxy = self.default_user.deploy(artifacts.Proxy, UPGRADE_DELAY)
         proxy.registerAppRoleAdmin(self.default_user.address)
         proxy.registerAppGovernor(self.default_user.address)
         proxy.registerUpgradeGovernor(self.default_user.address)
@@ -365,6 +427,9 @@ class TokenBridgeWrapper(ABC):
             governor=self.default_user,
         )
         self.contract = proxy.replace_abi(abi=self.contract.abi)
+        # The wrappers are shared by the tests, and the chain is reverted between them, so the fees
+        # must be of the latest block (rather than of a block that may have been reverted).
+        self.fee_oracle = FeeOracle(w3=self.w3, block_ttl=0)
 
     @abstractmethod
     def deposit(
@@ -408,14 +473,158 @@ class TokenBridgeWrapper(ABC):
             )
 
     def get_deposit_fee(self, receipt: EthReceipt) -> int:
-        logs = self.contract.w3_contract.events.Deposit().processReceipt(
-            receipt.w3_tx_receipt
-        ) + self.contract.w3_contract.events.DepositWithMessage().processReceipt(
-            receipt.w3_tx_receipt
-        )
+        return self.get_w3_deposit_fee(receipt.w3_tx_receipt)
 
+    def get_w3_deposit_fee(self, w3_tx_receipt: dict) -> int:
+        logs = self.deposit_logs(w3_tx_receipt)
         return 0 if len(logs) == 0 else logs[0].args.fee
 
+    def get_deposit_nonce(self, receipt: EthReceipt) -> int:
+        """
+        Returns the L1-to-L2 message nonce of the deposit, from its event.
+        """
+        (log,) = self.deposit_logs(receipt.w3_tx_receipt)
+        return log.args.nonce
+
+    def deposit_logs(self, w3_tx_receipt: dict) -> list:
+        decoder = BridgeEventDecoder(
+            w3=self.w3,
+            abi=self.contract.w3_contract.abi,
+            event_names=[*DEPOSIT_EVENTS, DEPOSIT_BATCH_EVENT],
+        )
+        return decoder.decode_receipt(w3_tx_receipt, address=self.contract.address)
+
+    def send_batch(self, calls: List[Tuple[ContractFunction, int]], user: EthAccount) -> List[dict]:
+        """
+        Submits the given (function, value) calls from the user without waiting for each of them
+        to be mined. Nonces are assigned locally, and the receipts are collected once all the
+        calls were sent.
+        """
+        nonce = self.w3.eth.get_transaction_count(user.address, "pending")
+        gas_price = self.w3.eth.gas_price
+        tx_hashes = [
+            function.transact(
+                {
+                    "from": user.address,
+                    "value": value,
+                    "nonce": nonce + i,
+                    "gas": BATCH_TX_GAS,
+                    "gasPrice": gas_price,
+                }
+            )
+            for i, (function, value) in enumerate(calls)
+        ]
+        return [self.w3.eth.wait_for_transaction_receipt(tx_hash) for tx_hash in tx_hashes]
+
+    def deposit_approvals(self, total_amount: int) -> List[Tuple[ContractFunction, int]]:
+        """
+        Returns the calls that should precede a batch of deposits of total_amount tokens.
+        """
+        return []
+
+    def deposit_value(self, amount: int, fee: int) -> int:
+        """
+        Returns the value (in Wei) to send with a deposit of the given amount.
+        """
+        return fee
+
+    def deposit_many(
+        self,
+        amounts: List[int],
+        l2_recipients: List[int],
+        fee: int = 0,
+        user: Optional[EthAccount] = None,
+        messages: Optional[List[Optional[List[int]]]] = None,
+    ) -> List[BatchOperationResult]:
+        """
+        Deposits amounts[i] to l2_recipients[i] (with messages[i], if given) for every i, as one
+        pipelined batch. If user isn't specified, the default user will be used.
+        """
+        assert len(amounts) == len(l2_recipients), "Mismatching amounts and recipients."
+        if messages is None:
+            messages = [None] * len(amounts)
+        assert len(messages) == len(amounts), "Mismatching amounts and messages."
+        if user is None:
+            user = self.default_user
+        if fee == DYNAMIC_FEE:
+            fee = self.fee_oracle.deposit_fee(self.contract.address)
+
+        functions = self.contract.w3_contract.functions
+        deposits = [
+            (
+                functions.deposit(self.token_address(), amount, l2_recipient)
+                if message is None
+                else functions.depositWithMessage(
+                    self.token_address(), amount, l2_recipient, message
+                ),
+                self.deposit_value(amount=amount, fee=fee),
+            )
+            for amount, l2_recipient, message in zip(amounts, l2_recipients, messages)
+        ]
+        approvals = self.deposit_approvals(total_amount=sum(amounts))
+        receipts = self.send_batch(calls=approvals + deposits, user=user)[len(approvals) :]
+        return [
+            BatchOperationResult(w3_tx_receipt=receipt, cost=self.get_w3_tx_cost(receipt))
+            for receipt in receipts
+        ]
+
+    def deposit_batch(
+        self,
+        amounts: List[int],
+        l2_recipients: List[int],
+        fee: int = 0,
+        user: Optional[EthAccount] = None,
+    ) -> EthReceipt:
+        """
+        Deposits amounts[i] to l2_recipients[i] for every i, in a single depositBatch transaction.
+        If user isn't specified, the default user will be used.
+        """
+        if user is None:
+            user = self.default_user
+        if fee == DYNAMIC_FEE:
+            fee = self.fee_oracle.deposit_fee(self.contract.address)
+        approvals = self.deposit_approvals(total_amount=sum(amounts))
+        if len(approvals) > 0:
+            self.send_batch(calls=approvals, user=user)
+        return self.contract.depositBatch(
+            self.token_address(),
+            amounts,
+            l2_recipients,
+            transact_args={"from": user, "value": self.deposit_value(amount=sum(amounts), fee=fee)},
+        )
+
+    def withdraw_many(
+        self, amounts: List[int], recipients: Optional[List[EthAccount]] = None
+    ) -> List[BatchOperationResult]:
+        """
+        Withdraws amounts[i] to recipients[i] for every i, as one pipelined batch sent by the
+        default user. If recipients aren't specified, the default user is the recipient.
+        """
+        if recipients is None:
+            recipients = [self.default_user] * len(amounts)
+        assert len(recipients) == len(amounts), "Mismatching amounts and recipients."
+        functions = self.contract.w3_contract.functions
+        withdrawals = [
+            (functions.withdraw(self.token_address(), amount, recipient.address), 0)
+            for amount, recipient in zip(amounts, recipients)
+        ]
+        return [
+            BatchOperationResult(w3_tx_receipt=receipt, cost=self.get_w3_tx_cost(receipt))
+            for receipt in self.send_batch(calls=withdrawals, user=self.default_user)
+        ]
+
+    def withdraw_batch(self, amounts: List[int], recipients: List[EthAccount]) -> EthReceipt:
+        """
+        Withdraws amounts[i] to recipients[i] for every i, consuming a single batch withdrawal
+        message. Sent by the default user.
+        """
+        return self.contract.withdrawBatch.transact(
+            self.token_address(),
+            [recipient.address for recipient in recipients],
+            amounts,
+            transact_args={"from": self.default_user},
+        )
+
     def deposit_cancel_request(
         self,
         amount: int,
@@ -465,6 +674,32 @@ class TokenBridgeWrapper(ABC):
                 transact_args={"from": user},
             )
 
+    def deposit_batch_cancel_request(
+        self,
+        amounts: List[int],
+        l2_recipients: List[int],
+        nonce: int,
+        user: Optional[EthAccount] = None,
+    ) -> EthReceipt:
+        if user is None:
+            user = self.default_user
+        return self.contract.depositBatchCancelRequest(
+            self.token_address(), amounts, l2_recipients, nonce, transact_args={"from": user}
+        )
+
+    def deposit_batch_reclaim(
+        self,
+        amounts: List[int],
+        l2_recipients: List[int],
+        nonce: int,
+        user: Optional[EthAccount] = None,
+    ) -> EthReceipt:
+        if user is None:
+            user = self.default_user
+        return self.contract.depositBatchReclaim(
+            self.token_address(), amounts, l2_recipients, nonce, transact_args={"from": user}
+        )
+
     @abstractmethod
     def get_account_balance(self, account: EthAccount) -> int:
         pass
@@ -483,6 +718,12 @@ class TokenBridgeWrapper(ABC):
         Get the amount of tokens executing a transaction will cost (for example, from gas).
         """
 
+    @abstractmethod
+    def get_w3_tx_cost(self, w3_tx_receipt: dict) -> int:
+        """
+        Same as get_tx_cost, for a raw web3 transaction receipt.
+        """
+
 
 class StarknetTokenBridgeWrapper(TokenBridgeWrapper):
     TRANSACTION_COSTS_BOUND: int = 0
@@ -493,10 +734,10 @@ class StarknetTokenBridgeWrapper(TokenBridgeWrapper):
         registry_contract: EthContract,
         eth_test_utils: EthTestUtils,
     ):
-        self.mock_erc20_contract = eth_test_utils.accounts[0].deploy(TestERC20)
+        self.mock_erc20_contract = eth_test_utils.accounts[0].deploy(artifacts.TestERC20)
 
         super().__init__(
-            compiled_bridge_contract=StarknetTokenBridgeTester,
+            compiled_bridge_contract=test_contracts.StarknetTokenBridgeTester,
             eth_test_utils=eth_test_utils,
             init_data=chain_hexes_to_bytes(
                 [
@@ -529,7 +770,7 @@ class StarknetTokenBridgeWrapper(TokenBridgeWrapper):
             self.contract.address, amount, transact_args={"from": user}
         )
         if fee == DYNAMIC_FEE:
-            fee = self.contract.estimateDepositFeeWei.call()
+            fee = self.fee_oracle.deposit_fee(self.contract.address)
         if message is None:
             return self.contract.deposit(
                 self.token_address(),
@@ -561,6 +802,16 @@ class StarknetTokenBridgeWrapper(TokenBridgeWrapper):
     def get_tx_cost(self, tx_receipt: EthReceipt) -> int:
         return 0
 
+    def get_w3_tx_cost(self, w3_tx_receipt: dict) -> int:
+        return 0
+
+    def deposit_approvals(self, total_amount: int) -> List[Tuple[ContractFunction, int]]:
+        # A single approval covers the whole batch.
+        approve = self.mock_erc20_contract.w3_contract.functions.approve(
+            self.contract.address, total_amount
+        )
+        return [(approve, 0)]
+
     def reset_balances(self):
         self.set_bridge_balance(amount=0)
         for account in (self.default_user, self.non_default_user):
@@ -576,10 +827,10 @@ class StarknetERC20BridgeWrapper(TokenBridgeWrapper):
         registry_contract: EthContract,
         eth_test_utils: EthTestUtils,
     ):
-        self.mock_erc20_contract = eth_test_utils.accounts[0].deploy(TestERC20)
+        self.mock_erc20_contract = eth_test_utils.accounts[0].deploy(artifacts.TestERC20)
 
         super().__init__(
-            compiled_bridge_contract=StarknetERC20BridgeTester,
+            compiled_bridge_contract=test_contracts.StarknetERC20BridgeTester,
             eth_test_utils=eth_test_utils,
             init_data=chain_hexes_to_bytes(
                 [
@@ -612,7 +863,7 @@ class StarknetERC20BridgeWrapper(TokenBridgeWrapper):
             self.contract.address, amount, transact_args={"from": user}
         )
         if fee == DYNAMIC_FEE:
-            fee = self.contract.estimateDepositFeeWei.call()
+            fee = self.fee_oracle.deposit_fee(self.contract.address)
         if message is None:
             return self.contract.deposit(
                 self.token_address(),
@@ -644,6 +895,16 @@ class StarknetERC20BridgeWrapper(TokenBridgeWrapper):
     def get_tx_cost(self, tx_receipt: EthReceipt) -> int:
         return 0
 
+    def get_w3_tx_cost(self, w3_tx_receipt: dict) -> int:
+        return 0
+
+    def deposit_approvals(self, total_amount: int) -> List[Tuple[ContractFunction, int]]:
+        # A single approval covers the whole batch.
+        approve = self.mock_erc20_contract.w3_contract.functions.approve(
+            self.contract.address, total_amount
+        )
+        return [(approve, 0)]
+
     def reset_balances(self):
         self.set_bridge_balance(amount=0)
         for account in (self.default_user, self.non_default_user):
@@ -661,7 +922,7 @@ class EthBridgeWrapper(TokenBridgeWrapper):
         eth_test_utils: EthTestUtils,
     ):
         super().__init__(
-            compiled_bridge_contract=StarknetEthBridgeTester,
+            compiled_bridge_contract=test_contracts.StarknetEthBridgeTester,
             eth_test_utils=eth_test_utils,
             init_data=chain_hexes_to_bytes(
                 [ZERO_ADDRESS, registry_contract.address, messaging_contract.address]
@@ -684,7 +945,7 @@ class EthBridgeWrapper(TokenBridgeWrapper):
         if user is None:
             user = self.default_user
         if fee == DYNAMIC_FEE:
-            fee = self.contract.estimateDepositFeeWei.call()
+            fee = self.fee_oracle.deposit_fee(self.contract.address)
         if message is None:
             return self.contract.deposit(
                 self.token_address(),
@@ -713,6 +974,13 @@ class EthBridgeWrapper(TokenBridgeWrapper):
     def get_tx_cost(self, tx_receipt: EthReceipt) -> int:
         return tx_receipt.get_cost() + self.get_deposit_fee(tx_receipt)
 
+    def get_w3_tx_cost(self, w3_tx_receipt: dict) -> int:
+        gas_cost = w3_tx_receipt["gasUsed"] * w3_tx_receipt["effectiveGasPrice"]
+        return gas_cost + self.get_w3_deposit_fee(w3_tx_receipt)
+
+    def deposit_value(self, amount: int, fee: int) -> int:
+        return amount + fee
+
 
 @pytest.fixture(
     params=[StarknetTokenBridgeWrapper, EthBridgeWrapper, StarknetERC20BridgeWrapper],
@@ -722,6 +990,108 @@ def token_type(request) -> Type[TokenBridgeWrapper]:
     return request.param
 
 
+@pytest.fixture(
+    params=[StarknetTokenBridgeWrapper, EthBridgeWrapper, StarknetERC20BridgeWrapper],
+    scope="session",
+)
+def token_bridge_wrapper(
+    request,
+    messaging_contract: EthContract,
+    eth_test_utils: EthTestUtils,
+    registry_contract: EthContract,
+) -> TokenBridgeWrapper:
+    return request.param(
+        messaging_contract=messaging_contract,
+        registry_contract=registry_contract,
+        eth_test_utils=eth_test_utils,
+    )
+
+
+def withdrawal_message_payload(recipient: str, token: str, amount: int) -> List[int]:
+    """
+    Returns the payload of an L2-L1 withdrawal message, as consumed by the bridge on withdraw.
+    """
+    return [
+        TRANSFER_FROM_STARKNET,
+        int(recipient, 16),
+        int(token, 16),
+        amount % 2**128,
+        amount // 2**128,
+    ]
+
+
+def withdrawal_batch_message_payload(
+    recipients: List[str], token: str, amounts: List[int]
+) -> List[int]:
+    """
+    Returns the payload of an L2-L1 batch withdrawal message, as consumed by the bridge on
+    withdrawBatch.
+    """
+    payload = [TRANSFER_BATCH_FROM_STARKNET, int(token, 16), len(amounts)]
+    for recipient, amount in zip(recipients, amounts):
+        payload += [int(recipient, 16), amount % 2**128, amount // 2**128]
+    return payload
+
+
+def register_l1_withdrawal(
+    token_bridge_wrapper: TokenBridgeWrapper, messaging_contract: EthContract, withdraw_amount: int
+):
+    messaging_contract.mockSendMessageFromL2.transact(
+        L2_TOKEN_CONTRACT,
+        int(token_bridge_wrapper.contract.address, 16),
+        withdrawal_message_payload(
+            recipient=token_bridge_wrapper.default_user.address,
+            token=token_bridge_wrapper.token_address(),
+            amount=withdraw_amount,
+        ),
+    )
+
+
+def register_l1_withdrawals(
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+    withdraw_amounts: List[int],
+    recipients: Optional[List[str]] = None,
+):
+    """
+    Registers many withdrawal messages, WITHDRAWAL_REGISTRATION_BATCH_SIZE per transaction.
+    The recipients default to the default user of the wrapper.
+    """
+    if recipients is None:
+        recipients = [token_bridge_wrapper.default_user.address] * len(withdraw_amounts)
+    assert len(recipients) == len(withdraw_amounts)
+    token = token_bridge_wrapper.token_address()
+    payloads = [
+        withdrawal_message_payload(recipient=recipient, token=token, amount=amount)
+        for recipient, amount in zip(recipients, withdraw_amounts)
+    ]
+    for i in range(0, len(payloads), WITHDRAWAL_REGISTRATION_BATCH_SIZE):
+        batch = payloads[i : i + WITHDRAWAL_REGISTRATION_BATCH_SIZE]
+        messaging_contract.mockSendMessagesFromL2.transact(
+            L2_TOKEN_CONTRACT,
+            int(token_bridge_wrapper.contract.address, 16),
+            WITHDRAWAL_PAYLOAD_LENGTH,
+            [word for payload in batch for word in payload],
+        )
+
+
+def register_l1_withdrawal_batch(
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+    withdraw_amounts: List[int],
+    recipients: List[str],
+):
+    messaging_contract.mockSendMessageFromL2.transact(
+        L2_TOKEN_CONTRACT,
+        int(token_bridge_wrapper.contract.address, 16),
+        withdrawal_batch_message_payload(
+            recipients=recipients,
+            token=token_bridge_wrapper.token_address(),
+            amounts=withdraw_amounts,
+        ),
+    )
+
+
 @pytest.fixture(scope="session")
 def fee() -> int:
     return DYNAMIC_FEE
@@ -1,6 +1,18 @@
-from solidity.utils import load_contract
+from solidity.utils import artifacts
 
-StarknetTokenBridge = load_contract("StarknetTokenBridge")
-StarknetEthBridge = load_contract("StarknetEthBridge")
-starkgate_registry = load_contract("StarkgateRegistry")
-starkgate_manager = load_contract("StarkgateManager")
+# Maps the contracts exported by this module to their artifact names.
+CONTRACT_ARTIFACTS = {
+    "StarknetTokenBridge": "StarknetTokenBridge",
+    "StarknetEthBridge": "StarknetEthBridge",
+    "StarknetERC20Bridge": "StarknetERC20Bridge",
+    "UpgradeAssistEIC": "StarkgateUpgradeAssistExternalInitializer",
+    "starkgate_registry": "StarkgateRegistry",
+    "starkgate_manager": "StarkgateManager",
+}
+
+
+def __getattr__(name: str) -> dict:
+    # The artifacts are loaded on first access rather than on import.
+    if name in CONTRACT_ARTIFACTS:
+        return artifacts.load(CONTRACT_ARTIFACTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,129 @@
+"""
+Offline computation of the L1->L2 messages sent by StarknetTokenBridge deposits.
+Reproduces StarknetTokenBridge.depositMessagePayload and the Starknet messaging hash
+(StarknetMessaging.getL1ToL2MsgHash), so that deposits can be matched against the messaging
+contract without RPC calls.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from eth_hash.auto import keccak
+
+from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
+
+HANDLE_TOKEN_DEPOSIT_SELECTOR = (
+    774397379524139446221206168840917193112228400237242521560346153613428128537
+)
+HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR = (
+    247015267890530308727663503380700973440961674638638362173641612402089762826
+)
+HANDLE_DEPOSIT_BATCH_SELECTOR = (
+    314959309503151657470730095839120732652636635566782679855646083691524097506
+)
+UINT256_PART_SIZE_BITS = 128
+UINT256_PART_SIZE = 2**UINT256_PART_SIZE_BITS
+# The number of deposits hashed by a worker at once, in batch mode.
+HASH_CHUNK_SIZE = 10_000
+
+Address = Union[str, int]
+
+
+class DepositMessage(NamedTuple):
+    """
+    A deposit, as seen by the messaging contract.
+    from_address is the L1 bridge, to_address the L2 bridge and message is None for deposits
+    without a message.
+    """
+
+    from_address: Address
+    to_address: int
+    token: Address
+    depositor: Address
+    l2_recipient: int
+    amount: int
+    nonce: int
+    message: Optional[Sequence[int]] = None
+
+
+def to_uint(address: Address) -> int:
+    return int(address, 16) if isinstance(address, str) else address
+
+
+def split_uint256(value: int) -> List[int]:
+    """
+    Splits a uint256 into its [low, high] 128-bit parts, as Cairo represents it.
+    """
+    return [value & (UINT256_PART_SIZE - 1), value >> UINT256_PART_SIZE_BITS]
+
+
+def deposit_selector(message: Optional[Sequence[int]]) -> int:
+    return (
+        HANDLE_TOKEN_DEPOSIT_SELECTOR if message is None else HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR
+    )
+
+
+def deposit_message_payload(
+    token: Address,
+    depositor: Address,
+    l2_recipient: int,
+    amount: int,
+    message: Optional[Sequence[int]] = None,
+) -> List[int]:
+    payload = [to_uint(token), to_uint(depositor), l2_recipient, *split_uint256(amount)]
+    if message is not None:
+        if not all(0 <= value < DEFAULT_PRIME for value in message):
+            raise ValueError("INVALID_MESSAGE_DATA")
+        payload += [len(message), *message]
+    return payload
+
+
+def deposit_batch_message_payload(
+    token: Address, depositor: Address, amounts: Sequence[int], l2_recipients: Sequence[int]
+) -> List[int]:
+    """
+    Reproduces StarknetTokenBridge.depositBatchMessagePayload.
+    """
+    payload = [to_uint(token), to_uint(depositor), len(amounts)]
+    for amount, l2_recipient in zip(amounts, l2_recipients):
+        payload += [l2_recipient, *split_uint256(amount)]
+    return payload
+
+
+def l1_to_l2_message_hash(
+    from_address: Address, to_address: int, nonce: int, selector: int, payload: Sequence[int]
+) -> bytes:
+    """
+    keccak256(abi.encodePacked(fromAddress, toAddress, nonce, selector, payload.length, payload)).
+    """
+    words = [to_uint(from_address), to_address, nonce, selector, len(payload), *payload]
+    return keccak(b"".join(word.to_bytes(32, "big") for word in words))
+
+
+def deposit_message_hash(deposit: DepositMessage) -> bytes:
+    return l1_to_l2_message_hash(
+        from_address=deposit.from_address,
+        to_address=deposit.to_address,
+        nonce=deposit.nonce,
+        selector=deposit_selector(deposit.message),
+        payload=deposit_message_payload(
+            token=deposit.token,
+            depositor=deposit.depositor,
+            l2_recipient=deposit.l2_recipient,
+            amount=deposit.amount,
+            message=deposit.message,
+        ),
+    )
+
+
+def deposit_message_hashes(
+    deposits: Iterable[DepositMessage], processes: Optional[int] = 1
+) -> List[bytes]:
+    """
+    Hashes many deposits. With processes != 1, the deposits are hashed in chunks on a process pool
+    (processes=None uses all the CPUs).
+    """
+    if processes == 1:
+        return [deposit_message_hash(deposit) for deposit in deposits]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(deposit_message_hash, deposits, chunksize=HASH_CHUNK_SIZE))
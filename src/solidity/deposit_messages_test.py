@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
+from starkware.starknet.services.api.messages import StarknetMessageToL2
+from solidity.deposit_messages import (
+    HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR,
+    HANDLE_TOKEN_DEPOSIT_SELECTOR,
+    DepositMessage,
+    deposit_batch_message_payload,
+    deposit_message_hash,
+    deposit_message_hashes,
+    deposit_message_payload,
+)
+
+N_DEPOSITS = 100
+
+
+def random_deposit(rng: random.Random) -> DepositMessage:
+    return DepositMessage(
+        from_address=f"0x{rng.getrandbits(160):040x}",
+        to_address=rng.randrange(DEFAULT_PRIME),
+        token=f"0x{rng.getrandbits(160):040x}",
+        depositor=rng.getrandbits(160),
+        l2_recipient=rng.randrange(DEFAULT_PRIME),
+        amount=rng.getrandbits(256),
+        nonce=rng.getrandbits(64),
+        message=(
+            None
+            if rng.random() < 0.5
+            else [rng.randrange(DEFAULT_PRIME) for _ in range(rng.randint(0, 10))]
+        ),
+    )
+
+
+def test_deposit_message_hash_matches_starknet_message():
+    rng = random.Random(0)
+    deposits = [random_deposit(rng) for _ in range(N_DEPOSITS)]
+    for deposit, offline_hash in zip(deposits, deposit_message_hashes(deposits)):
+        message = StarknetMessageToL2(
+            from_address=int(deposit.from_address, 16),
+            to_address=deposit.to_address,
+            l1_handler_selector=(
+                HANDLE_TOKEN_DEPOSIT_SELECTOR
+                if deposit.message is None
+                else HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR
+            ),
+            payload=[
+                int(deposit.token, 16),
+                deposit.depositor,
+                deposit.l2_recipient,
+                deposit.amount % 2**128,
+                deposit.amount // 2**128,
+                *([] if deposit.message is None else [len(deposit.message), *deposit.message]),
+            ],
+            nonce=deposit.nonce,
+        )
+        assert int(message.get_hash(), 16) == int.from_bytes(offline_hash, "big")
+        assert offline_hash == deposit_message_hash(deposit)
+
+
+def test_invalid_message_data():
+    with pytest.raises(ValueError, match="INVALID_MESSAGE_DATA"):
+        deposit_message_payload(
+            token=1, depositor=2, l2_recipient=3, amount=4, message=[1, DEFAULT_PRIME]
+        )
+
+
+def test_deposit_batch_message_payload():
+    amounts = [5, 2**128 + 3]
+    assert deposit_batch_message_payload(
+        token="0x0000000000000000000000000000000000000011",
+        depositor=0x22,
+        amounts=amounts,
+        l2_recipients=[7, 8],
+    ) == [0x11, 0x22, 2, 7, 5, 0, 8, 3, 1]
@@ -0,0 +1,272 @@
+"""
+Reconciliation of the L1 deposit events (Deposit, DepositWithMessage and DepositBatch, emitted by
+StarknetTokenBridge) with the L2 events that handled them (DepositHandled and
+DepositWithMessageHandled, emitted by token_bridge.cairo).
+Both sides are joined by the nonce of the L1->L2 message, and their payloads are compared. The
+deposits of a batch share the nonce of their message, and are told apart by their position in the
+batch (batch_index): the order of the DepositBatch arrays on L1, and the order of the
+DepositHandled events of the handle_deposit_batch transaction on L2.
+The join is streaming: sorted inputs are merged in constant memory, and unsorted inputs are
+first hash-partitioned by nonce into temporary files, so that only one partition is in memory at a
+time.
+"""
+
+import functools
+import os
+import pickle
+import tempfile
+from collections import Counter
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from solidity.bridge_event_index import BridgeEventIndex, DepositRecord
+from solidity.deposit_messages import UINT256_PART_SIZE_BITS
+from starkware.starknet.public.abi import get_selector_from_name
+
+DEPOSIT_HANDLED_KEY = get_selector_from_name("DepositHandled")
+DEPOSIT_WITH_MESSAGE_HANDLED_KEY = get_selector_from_name("DepositWithMessageHandled")
+# Deposits that are handled on L2 later than that (in seconds) after they were made are late.
+DEFAULT_MAX_HANDLING_DELAY = 60 * 60
+DEFAULT_N_PARTITIONS = 64
+
+
+class L1Deposit(NamedTuple):
+    nonce: int
+    token: int
+    depositor: int
+    l2_recipient: int
+    amount: int
+    # None for deposits without a message.
+    message: Optional[Tuple[int, ...]]
+    timestamp: int
+    # The position of the deposit in its batch (0 for a deposit that is not part of a batch).
+    batch_index: int = 0
+
+    @classmethod
+    def from_record(cls, record: DepositRecord, timestamp: int) -> "L1Deposit":
+        return cls(
+            nonce=record.nonce,
+            token=int(record.token, 16),
+            depositor=int(record.sender, 16),
+            l2_recipient=record.l2_recipient,
+            amount=record.amount,
+            message=None if record.message is None else tuple(record.message),
+            timestamp=timestamp,
+            batch_index=record.batch_index,
+        )
+
+
+class L2Deposit(NamedTuple):
+    # The nonce of the L1 handler transaction that emitted the event.
+    nonce: int
+    token: int
+    # DepositHandled does not include the depositor.
+    depositor: Optional[int]
+    l2_recipient: int
+    amount: int
+    message: Optional[Tuple[int, ...]]
+    timestamp: int
+    batch_index: int = 0
+
+
+class ReconciliationStatus(Enum):
+    MATCHED = "MATCHED"
+    # Handled on L2, but later than the maximal handling delay.
+    LATE = "LATE"
+    # Not handled on L2 yet, but still within the maximal handling delay.
+    PENDING = "PENDING"
+    # Not handled on L2 within the maximal handling delay.
+    UNHANDLED = "UNHANDLED"
+    # Handled on L2 with a different payload than the L1 deposit of the same nonce and batch index.
+    MISMATCHED = "MISMATCHED"
+    # Handled on L2 without a matching L1 deposit.
+    UNEXPECTED = "UNEXPECTED"
+
+
+class Reconciliation(NamedTuple):
+    status: ReconciliationStatus
+    nonce: int
+    l1: Optional[L1Deposit]
+    l2: Optional[L2Deposit]
+    batch_index: int = 0
+
+
+def join_key(deposit: NamedTuple) -> Tuple[int, int]:
+    return deposit.nonce, deposit.batch_index
+
+
+def parse_l2_deposit_event(
+    keys: Sequence[int], data: Sequence[int], nonce: int, timestamp: int, batch_index: int = 0
+) -> L2Deposit:
+    """
+    Parses a DepositHandled or DepositWithMessageHandled event of the L2 bridge, given its raw keys
+    and data. For the DepositHandled events of a handle_deposit_batch transaction, batch_index is
+    the position of the event among them.
+    """
+    if keys[0] == DEPOSIT_HANDLED_KEY:
+        _, token, l2_recipient = keys
+        depositor = None
+        message = None
+    elif keys[0] == DEPOSIT_WITH_MESSAGE_HANDLED_KEY:
+        _, depositor, token, l2_recipient = keys
+        message_length = data[2]
+        message = tuple(data[3 : 3 + message_length])
+    else:
+        raise ValueError(f"Not a deposit handling event: {keys[0]:#x}.")
+    return L2Deposit(
+        nonce=nonce,
+        token=token,
+        depositor=depositor,
+        l2_recipient=l2_recipient,
+        amount=data[0] + (data[1] << UINT256_PART_SIZE_BITS),
+        message=message,
+        timestamp=timestamp,
+        batch_index=batch_index,
+    )
+
+
+def deposits_match(l1: L1Deposit, l2: L2Deposit) -> bool:
+    return (
+        l1.token == l2.token
+        and l1.l2_recipient == l2.l2_recipient
+        and l1.amount == l2.amount
+        and l1.message == l2.message
+        and (l2.depositor is None or l1.depositor == l2.depositor)
+    )
+
+
+def classify(
+    l1: Optional[L1Deposit], l2: Optional[L2Deposit], max_delay: int, as_of: Optional[int]
+) -> ReconciliationStatus:
+    """
+    as_of is the current time. Without it, every L1 deposit that was not handled on L2 is
+    UNHANDLED.
+    """
+    if l1 is None:
+        return ReconciliationStatus.UNEXPECTED
+    if l2 is None:
+        if as_of is not None and as_of - l1.timestamp <= max_delay:
+            return ReconciliationStatus.PENDING
+        return ReconciliationStatus.UNHANDLED
+    if not deposits_match(l1=l1, l2=l2):
+        return ReconciliationStatus.MISMATCHED
+    if l2.timestamp - l1.timestamp > max_delay:
+        return ReconciliationStatus.LATE
+    return ReconciliationStatus.MATCHED
+
+
+def _check_sorted(deposits: Iterable[NamedTuple], side: str) -> Iterator[NamedTuple]:
+    last_key = (-1, 0)
+    for deposit in deposits:
+        key = join_key(deposit)
+        if key <= last_key:
+            raise ValueError(
+                f"{side} deposits are not sorted by nonce and batch index: {key} after {last_key}."
+            )
+        last_key = key
+        yield deposit
+
+
+def merge_reconcile(
+    l1_deposits: Iterable[L1Deposit],
+    l2_deposits: Iterable[L2Deposit],
+    max_delay: int = DEFAULT_MAX_HANDLING_DELAY,
+    as_of: Optional[int] = None,
+) -> Iterator[Reconciliation]:
+    """
+    Sorted-merge join of the two sides, which must be sorted by nonce and batch index (as L1
+    deposits are in chain order). Yields a Reconciliation per deposit, in that order, in constant
+    memory.
+    """
+    l1_iter = _check_sorted(l1_deposits, side="L1")
+    l2_iter = _check_sorted(l2_deposits, side="L2")
+    l1 = next(l1_iter, None)
+    l2 = next(l2_iter, None)
+    while l1 is not None or l2 is not None:
+        if l2 is None or (l1 is not None and join_key(l1) < join_key(l2)):
+            matched_l1, matched_l2 = l1, None
+        elif l1 is None or join_key(l2) < join_key(l1):
+            matched_l1, matched_l2 = None, l2
+        else:
+            matched_l1, matched_l2 = l1, l2
+        if matched_l1 is not None:
+            l1 = next(l1_iter, None)
+        if matched_l2 is not None:
+            l2 = next(l2_iter, None)
+        nonce, batch_index = join_key(matched_l1 or matched_l2)
+        yield Reconciliation(
+            status=classify(l1=matched_l1, l2=matched_l2, max_delay=max_delay, as_of=as_of),
+            nonce=nonce,
+            l1=matched_l1,
+            l2=matched_l2,
+            batch_index=batch_index,
+        )
+
+
+def _spill_partitions(deposits: Iterable[NamedTuple], paths: List[str]):
+    files = [open(path, "wb") for path in paths]
+    try:
+        for deposit in deposits:
+            pickle.dump(tuple(deposit), files[deposit.nonce % len(files)])
+    finally:
+        for file in files:
+            file.close()
+
+
+def _load_partition(path: str, deposit_type: type) -> List[NamedTuple]:
+    deposits = []
+    with open(path, "rb") as file:
+        while True:
+            try:
+                deposits.append(deposit_type(*pickle.load(file)))
+            except EOFError:
+                return sorted(deposits, key=join_key)
+
+
+def partitioned_reconcile(
+    l1_deposits: Iterable[L1Deposit],
+    l2_deposits: Iterable[L2Deposit],
+    max_delay: int = DEFAULT_MAX_HANDLING_DELAY,
+    as_of: Optional[int] = None,
+    n_partitions: int = DEFAULT_N_PARTITIONS,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Reconciliation]:
+    """
+    Hash-partitioned join of two unsorted sides (e.g., L2 events in the order the messages were
+    consumed). Both sides are spilled to n_partitions files by nonce (so a batch is in a single
+    partition), and every partition is then sorted and merged on its own, so the memory used is
+    about 1/n_partitions of the input.
+    Yields a Reconciliation per deposit, in nonce and batch index order within each partition.
+    """
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as partitions_dir:
+        paths = {
+            side: [os.path.join(partitions_dir, f"{side}_{i}") for i in range(n_partitions)]
+            for side in ("l1", "l2")
+        }
+        _spill_partitions(l1_deposits, paths["l1"])
+        _spill_partitions(l2_deposits, paths["l2"])
+        for l1_path, l2_path in zip(paths["l1"], paths["l2"]):
+            yield from merge_reconcile(
+                l1_deposits=_load_partition(l1_path, L1Deposit),
+                l2_deposits=_load_partition(l2_path, L2Deposit),
+                max_delay=max_delay,
+                as_of=as_of,
+            )
+            os.remove(l1_path)
+            os.remove(l2_path)
+
+
+def l1_deposits_from_index(index: BridgeEventIndex) -> Iterator[L1Deposit]:
+    """
+    Streams the deposits of an event index, in nonce and batch index order, with the timestamps of
+    their blocks.
+    """
+    block_timestamp: Callable[[int], int] = functools.lru_cache(maxsize=1024)(
+        lambda block_number: index.w3.eth.get_block(block_number).timestamp
+    )
+    for record in index.iter_deposits():
+        yield L1Deposit.from_record(record=record, timestamp=block_timestamp(record.block_number))
+
+
+def summarize(reconciliations: Iterable[Reconciliation]) -> Dict[ReconciliationStatus, int]:
+    return Counter(reconciliation.status for reconciliation in reconciliations)
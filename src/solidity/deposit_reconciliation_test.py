@@ -0,0 +1,187 @@
+import random
+from typing import List, Tuple
+
+import pytest
+
+from solidity.deposit_reconciliation import (
+    DEPOSIT_HANDLED_KEY,
+    DEPOSIT_WITH_MESSAGE_HANDLED_KEY,
+    L1Deposit,
+    L2Deposit,
+    ReconciliationStatus,
+    join_key,
+    merge_reconcile,
+    parse_l2_deposit_event,
+    partitioned_reconcile,
+    summarize,
+)
+
+N_DEPOSITS = 1000
+MAX_DELAY = 100
+DEPOSIT_TIME = 1000
+
+
+def random_l1_deposit(rng: random.Random, nonce: int) -> L1Deposit:
+    return L1Deposit(
+        nonce=nonce,
+        token=rng.getrandbits(160),
+        depositor=rng.getrandbits(160),
+        l2_recipient=rng.getrandbits(251),
+        amount=rng.getrandbits(256),
+        message=None if rng.random() < 0.5 else tuple(range(rng.randint(0, 5))),
+        timestamp=DEPOSIT_TIME,
+    )
+
+
+def handled(l1: L1Deposit, delay: int) -> L2Deposit:
+    return L2Deposit(
+        nonce=l1.nonce,
+        token=l1.token,
+        depositor=None if l1.message is None else l1.depositor,
+        l2_recipient=l1.l2_recipient,
+        amount=l1.amount,
+        message=l1.message,
+        timestamp=l1.timestamp + delay,
+        batch_index=l1.batch_index,
+    )
+
+
+def random_deposits(
+    rng: random.Random,
+) -> Tuple[List[L1Deposit], List[L2Deposit], List[ReconciliationStatus]]:
+    """
+    Returns L1 deposits with increasing (non-consecutive) nonces, the L2 deposits that handled them
+    and the expected status of every nonce.
+    """
+    l1_deposits, l2_deposits, expected = [], [], []
+    for nonce in range(0, 2 * N_DEPOSITS, 2):
+        l1 = random_l1_deposit(rng=rng, nonce=nonce)
+        status = rng.choice(list(ReconciliationStatus))
+        if status is ReconciliationStatus.UNEXPECTED:
+            l2_deposits.append(handled(l1=l1, delay=0))
+        elif status is ReconciliationStatus.MATCHED:
+            l1_deposits.append(l1)
+            l2_deposits.append(handled(l1=l1, delay=MAX_DELAY))
+        elif status is ReconciliationStatus.LATE:
+            l1_deposits.append(l1)
+            l2_deposits.append(handled(l1=l1, delay=MAX_DELAY + 1))
+        elif status is ReconciliationStatus.MISMATCHED:
+            l1_deposits.append(l1)
+            l2_deposits.append(handled(l1=l1, delay=0)._replace(amount=l1.amount ^ 1))
+        elif status is ReconciliationStatus.PENDING:
+            l1_deposits.append(l1._replace(timestamp=DEPOSIT_TIME + 2 * MAX_DELAY))
+        else:
+            l1_deposits.append(l1)
+        expected.append(status)
+    return l1_deposits, l2_deposits, expected
+
+
+def test_merge_reconcile():
+    l1_deposits, l2_deposits, expected = random_deposits(rng=random.Random(0))
+    reconciliations = list(
+        merge_reconcile(
+            l1_deposits=l1_deposits,
+            l2_deposits=l2_deposits,
+            max_delay=MAX_DELAY,
+            as_of=DEPOSIT_TIME + 2 * MAX_DELAY,
+        )
+    )
+    assert [reconciliation.nonce for reconciliation in reconciliations] == list(
+        range(0, 2 * N_DEPOSITS, 2)
+    )
+    assert [reconciliation.status for reconciliation in reconciliations] == expected
+
+
+def test_partitioned_reconcile_matches_merge(tmp_path):
+    l1_deposits, l2_deposits, _ = random_deposits(rng=random.Random(1))
+    kwargs = dict(max_delay=MAX_DELAY, as_of=DEPOSIT_TIME + 2 * MAX_DELAY)
+    merged = list(merge_reconcile(l1_deposits=l1_deposits, l2_deposits=l2_deposits, **kwargs))
+    # L2 deposits are not necessarily handled in nonce order.
+    random.Random(2).shuffle(l2_deposits)
+    partitioned = partitioned_reconcile(
+        l1_deposits=l1_deposits,
+        l2_deposits=l2_deposits,
+        n_partitions=7,
+        tmp_dir=str(tmp_path),
+        **kwargs,
+    )
+    assert sorted(partitioned, key=lambda reconciliation: reconciliation.nonce) == merged
+    assert summarize(merged) == summarize(partitioned_reconcile(l1_deposits, l2_deposits, **kwargs))
+    # The partitions are removed.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_merge_reconcile_unsorted():
+    l1 = random_l1_deposit(rng=random.Random(0), nonce=1)
+    with pytest.raises(ValueError, match="L2 deposits are not sorted by nonce"):
+        list(merge_reconcile(l1_deposits=[l1], l2_deposits=[handled(l1, 0), handled(l1, 0)]))
+
+
+def test_reconcile_batch(tmp_path):
+    """
+    The deposits of a batch share the nonce of their message, and are joined by their position in
+    the batch.
+    """
+    rng = random.Random(3)
+    batch = [
+        random_l1_deposit(rng=rng, nonce=1)._replace(message=None, batch_index=batch_index)
+        for batch_index in range(3)
+    ]
+    l1_deposits = [random_l1_deposit(rng=rng, nonce=0), *batch, random_l1_deposit(rng=rng, nonce=2)]
+    l2_deposits = [handled(l1=l1, delay=0) for l1 in l1_deposits]
+    # The second deposit of the batch is handled with another amount, and the third is not handled.
+    l2_deposits[2] = l2_deposits[2]._replace(amount=l2_deposits[2].amount ^ 1)
+    del l2_deposits[3]
+
+    reconciliations = list(merge_reconcile(l1_deposits=l1_deposits, l2_deposits=l2_deposits))
+    assert [
+        (reconciliation.nonce, reconciliation.batch_index, reconciliation.status)
+        for reconciliation in reconciliations
+    ] == [
+        (0, 0, ReconciliationStatus.MATCHED),
+        (1, 0, ReconciliationStatus.MATCHED),
+        (1, 1, ReconciliationStatus.MISMATCHED),
+        (1, 2, ReconciliationStatus.UNHANDLED),
+        (2, 0, ReconciliationStatus.MATCHED),
+    ]
+    partitioned = partitioned_reconcile(
+        l1_deposits=l1_deposits,
+        l2_deposits=l2_deposits[::-1],
+        n_partitions=2,
+        tmp_dir=str(tmp_path),
+    )
+    assert sorted(partitioned, key=join_key) == reconciliations
+
+
+def test_pending_without_as_of():
+    l1 = random_l1_deposit(rng=random.Random(0), nonce=1)
+    (reconciliation,) = merge_reconcile(l1_deposits=[l1], l2_deposits=[])
+    assert reconciliation.status is ReconciliationStatus.UNHANDLED
+
+
+def test_parse_l2_deposit_event():
+    amount = 2**130 + 5
+    assert parse_l2_deposit_event(
+        keys=[DEPOSIT_HANDLED_KEY, 1, 2], data=[5, 4], nonce=3, timestamp=4
+    ) == L2Deposit(
+        nonce=3, token=1, depositor=None, l2_recipient=2, amount=amount, message=None, timestamp=4
+    )
+    assert parse_l2_deposit_event(
+        keys=[DEPOSIT_WITH_MESSAGE_HANDLED_KEY, 7, 1, 2], data=[5, 4, 2, 8, 9], nonce=3, timestamp=4
+    ) == L2Deposit(
+        nonce=3, token=1, depositor=7, l2_recipient=2, amount=amount, message=(8, 9), timestamp=4
+    )
+    assert parse_l2_deposit_event(
+        keys=[DEPOSIT_HANDLED_KEY, 1, 2], data=[5, 4], nonce=3, timestamp=4, batch_index=2
+    ) == L2Deposit(
+        nonce=3,
+        token=1,
+        depositor=None,
+        l2_recipient=2,
+        amount=amount,
+        message=None,
+        timestamp=4,
+        batch_index=2,
+    )
+    with pytest.raises(ValueError, match="Not a deposit handling event"):
+        parse_l2_deposit_event(keys=[0, 1, 2], data=[5, 4], nonce=3, timestamp=4)
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from starkware.eth.eth_test_utils import EthTestUtils
+
+
+class EthSnapshotError(Exception):
+    pass
+
+
+class EthSnapshots:
+    """
+    Takes and reverts snapshots of the local chain behind an EthTestUtils instance.
+    Relies on the evm_snapshot/evm_revert RPC methods of the local node (ganache).
+    Note that reverting to a snapshot also discards it, together with every snapshot taken after it.
+    """
+
+    def __init__(self, eth_test_utils: EthTestUtils):
+        self.w3 = eth_test_utils.w3
+
+    def _request(self, method: str, params: Optional[List] = None):
+        response = self.w3.provider.make_request(
+            method=method, params=[] if params is None else params
+        )
+        if "error" in response:
+            raise EthSnapshotError(f"{method} failed: {response['error']}")
+        return response["result"]
+
+    def take(self) -> str:
+        """
+        Takes a snapshot of the current chain state and returns its id.
+        """
+        return self._request("evm_snapshot")
+
+    def revert(self, snapshot_id: str):
+        """
+        Reverts the chain state to the given snapshot.
+        """
+        if self._request("evm_revert", [snapshot_id]) is not True:
+            raise EthSnapshotError(f"Failed to revert to snapshot {snapshot_id}.")
+
+    @contextmanager
+    def isolate(self) -> Iterator[str]:
+        """
+        Reverts every chain change made inside the context once it exits.
+        """
+        snapshot_id = self.take()
+        try:
+            yield snapshot_id
+        finally:
+            self.revert(snapshot_id)
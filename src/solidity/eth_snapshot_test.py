@@ -0,0 +1,31 @@
+from starkware.eth.eth_test_utils import EthAccount, EthContract, EthTestUtils
+from solidity.conftest import INITIAL_BALANCE
+from solidity.eth_snapshot import EthSnapshots
+
+
+def test_revert_to_snapshot(
+    eth_snapshots: EthSnapshots, governor: EthAccount, mock_erc20_contract: EthContract
+):
+    snapshot_id = eth_snapshots.take()
+    mock_erc20_contract.setBalance.transact(governor.address, 1)
+    assert mock_erc20_contract.balanceOf.call(governor.address) == 1
+
+    eth_snapshots.revert(snapshot_id)
+    assert mock_erc20_contract.balanceOf.call(governor.address) == INITIAL_BALANCE
+
+
+def test_nested_isolation(
+    eth_snapshots: EthSnapshots,
+    eth_test_utils: EthTestUtils,
+    governor: EthAccount,
+    mock_erc20_contract: EthContract,
+):
+    block_number = eth_test_utils.w3.eth.block_number
+    with eth_snapshots.isolate():
+        mock_erc20_contract.setBalance.transact(governor.address, 1)
+        with eth_snapshots.isolate():
+            mock_erc20_contract.setBalance.transact(governor.address, 2)
+            assert mock_erc20_contract.balanceOf.call(governor.address) == 2
+        assert mock_erc20_contract.balanceOf.call(governor.address) == 1
+    assert mock_erc20_contract.balanceOf.call(governor.address) == INITIAL_BALANCE
+    assert eth_test_utils.w3.eth.block_number == block_number
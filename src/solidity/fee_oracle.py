@@ -0,0 +1,135 @@
+"""
+A per-block cache of the deposit and enrollment fees of bridges (estimateDepositFeeWei and
+estimateEnrollmentFeeWei), so that bursts of deposits don't issue a view call each.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Tuple
+
+from web3 import Web3
+
+DEPOSIT_FEE_FUNCTION = "estimateDepositFeeWei"
+ENROLLMENT_FEE_FUNCTION = "estimateEnrollmentFeeWei"
+FEE_FUNCTIONS = (DEPOSIT_FEE_FUNCTION, ENROLLMENT_FEE_FUNCTION)
+FEE_FUNCTIONS_ABI = [
+    {
+        "inputs": [],
+        "name": name,
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+    for name in FEE_FUNCTIONS
+]
+# The latest block is queried at most once in that many seconds. Fees are cached per block, so
+# this bounds how stale a fee may be.
+DEFAULT_BLOCK_TTL = 1.0
+DEFAULT_MAX_WORKERS = 16
+
+
+@dataclass
+class FeeOracleMetrics:
+    hits: int = 0
+    misses: int = 0
+    # The number of fee view calls and latest block queries that were issued.
+    fee_calls: int = 0
+    block_queries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return 0.0 if lookups == 0 else self.hits / lookups
+
+
+class FeeOracle:
+    """
+    Caches the fees of any number of bridges for the latest block. The latest block is queried at
+    most once in block_ttl seconds, and the cache is dropped when it changed (by hash, so reorgs and
+    reverted snapshots are noticed as well). Hence, for up to block_ttl seconds after a new block
+    or a revert, the fees of the previous block may be returned. Use block_ttl=0 to query the latest
+    block on every lookup.
+    Thread safe.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        block_ttl: float = DEFAULT_BLOCK_TTL,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.w3 = w3
+        self.block_ttl = block_ttl
+        self.max_workers = max_workers
+        self.clock = clock
+        self.metrics = FeeOracleMetrics()
+        self._lock = threading.Lock()
+        self._block_hash = None
+        self._block_number = None
+        self._block_query_time = None
+        # (bridge address, fee function) -> fee, for the current block.
+        self._fees: Dict[Tuple[str, str], int] = {}
+
+    def deposit_fee(self, bridge_address: str) -> int:
+        return self._get_fee(bridge_address=bridge_address, function=DEPOSIT_FEE_FUNCTION)
+
+    def enrollment_fee(self, bridge_address: str) -> int:
+        return self._get_fee(bridge_address=bridge_address, function=ENROLLMENT_FEE_FUNCTION)
+
+    def refresh(self, bridge_addresses: Iterable[str]):
+        """
+        Fetches the fees of all the given bridges at once, all at the same block.
+        web3 5 has no JSON-RPC batching, so the view calls are issued concurrently.
+        """
+        with self._lock:
+            block_number = self._sync_block()
+        keys = [
+            (Web3.toChecksumAddress(bridge_address), function)
+            for bridge_address in bridge_addresses
+            for function in FEE_FUNCTIONS
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            fees = list(executor.map(lambda key: self._call(*key, block_number), keys))
+        with self._lock:
+            if self._block_number == block_number:
+                self._fees.update(zip(keys, fees))
+
+    def _get_fee(self, bridge_address: str, function: str) -> int:
+        key = (Web3.toChecksumAddress(bridge_address), function)
+        with self._lock:
+            block_number = self._sync_block()
+            if key in self._fees:
+                self.metrics.hits += 1
+                return self._fees[key]
+            self.metrics.misses += 1
+        fee = self._call(*key, block_number)
+        with self._lock:
+            if self._block_number == block_number:
+                self._fees[key] = fee
+        return fee
+
+    def _sync_block(self) -> int:
+        """
+        Queries the latest block, unless it was queried in the last block_ttl seconds, and drops
+        the cached fees if it changed. Returns the current block number.
+        Must be called with the lock held.
+        """
+        now = self.clock()
+        if self._block_query_time is None or now - self._block_query_time >= self.block_ttl:
+            block = self.w3.eth.get_block("latest")
+            self.metrics.block_queries += 1
+            self._block_query_time = now
+            if block.hash != self._block_hash:
+                self._block_hash = block.hash
+                self._block_number = block.number
+                self._fees = {}
+        return self._block_number
+
+    def _call(self, bridge_address: str, function: str, block_number: int) -> int:
+        with self._lock:
+            self.metrics.fee_calls += 1
+        contract = self.w3.eth.contract(address=bridge_address, abi=FEE_FUNCTIONS_ABI)
+        return contract.functions[function]().call(block_identifier=block_number)
@@ -0,0 +1,67 @@
+from starkware.eth.eth_test_utils import EthContract, EthTestUtils
+from solidity.conftest import TokenBridgeWrapper
+from solidity.fee_oracle import FeeOracle, FeeOracleMetrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def mine_block(eth_test_utils: EthTestUtils):
+    eth_test_utils.w3.provider.make_request("evm_mine", [])
+
+
+def test_fees_are_cached_per_block(eth_test_utils: EthTestUtils, fee_tester: EthContract):
+    clock = FakeClock()
+    oracle = FeeOracle(w3=eth_test_utils.w3, block_ttl=1, clock=clock)
+    deposit_fee = fee_tester.estimateDepositFeeWei.call()
+    enrollment_fee = fee_tester.estimateEnrollmentFeeWei.call()
+
+    assert [oracle.deposit_fee(fee_tester.address) for _ in range(3)] == [deposit_fee] * 3
+    assert oracle.enrollment_fee(fee_tester.address) == enrollment_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=2, misses=2, fee_calls=2, block_queries=1)
+
+    # A new block is only noticed once the latest block is queried again.
+    mine_block(eth_test_utils)
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=3, misses=2, fee_calls=2, block_queries=1)
+    clock.now += 1
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=3, misses=3, fee_calls=3, block_queries=2)
+
+    # The cache is kept as long as the latest block doesn't change.
+    clock.now += 1
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=4, misses=3, fee_calls=3, block_queries=3)
+
+
+def test_zero_block_ttl(eth_test_utils: EthTestUtils, fee_tester: EthContract):
+    oracle = FeeOracle(w3=eth_test_utils.w3, block_ttl=0, clock=FakeClock())
+    deposit_fee = fee_tester.estimateDepositFeeWei.call()
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=1, misses=1, fee_calls=1, block_queries=2)
+
+    # A new block is noticed on the next lookup.
+    mine_block(eth_test_utils)
+    assert oracle.deposit_fee(fee_tester.address) == deposit_fee
+    assert oracle.metrics == FeeOracleMetrics(hits=1, misses=2, fee_calls=2, block_queries=3)
+
+
+def test_batch_refresh(
+    eth_test_utils: EthTestUtils,
+    fee_tester: EthContract,
+    token_bridge_wrapper: TokenBridgeWrapper,
+):
+    oracle = FeeOracle(w3=eth_test_utils.w3, clock=FakeClock())
+    bridges = [fee_tester.address, token_bridge_wrapper.contract.address]
+    oracle.refresh(bridges)
+    assert oracle.metrics.fee_calls == 2 * len(bridges)
+    for bridge in bridges:
+        assert oracle.deposit_fee(bridge.lower()) == fee_tester.estimateDepositFeeWei.call()
+        assert oracle.enrollment_fee(bridge) == fee_tester.estimateEnrollmentFeeWei.call()
+    assert (oracle.metrics.hits, oracle.metrics.misses, oracle.metrics.hit_rate) == (4, 0, 1)
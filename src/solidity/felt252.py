@@ -0,0 +1,39 @@
+"""
+A Python reference model of src/solidity/utils/Felt252.sol.
+Strings are handled as the contract sees them: as their utf-8 bytes.
+"""
+
+from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
+
+MAX_SHORT_STRING_LENGTH = 31
+STRING_TOO_LONG = "STRING_TOO_LONG"
+
+
+class Felt252Revert(Exception):
+    """
+    Models a revert of the Felt252 library. The message is the revert reason.
+    """
+
+
+def _str_to_felt(string_bytes: bytes, length: int) -> int:
+    if length > MAX_SHORT_STRING_LENGTH:
+        raise Felt252Revert(STRING_TOO_LONG)
+    return int.from_bytes(string_bytes[:length], "big")
+
+
+def to_felt(short_string: str) -> int:
+    string_bytes = short_string.encode("utf-8")
+    return _str_to_felt(string_bytes, len(string_bytes))
+
+
+def safe_to_felt(string: str) -> int:
+    string_bytes = string.encode("utf-8")
+    return _str_to_felt(string_bytes, min(MAX_SHORT_STRING_LENGTH, len(string_bytes)))
+
+
+def is_felt(maybe_felt: int) -> bool:
+    return maybe_felt < DEFAULT_PRIME
+
+
+def is_valid_l2_address(l2_address: int) -> bool:
+    return l2_address != 0 and is_felt(l2_address)
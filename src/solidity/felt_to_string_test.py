@@ -1,17 +1,58 @@
+import random
+from typing import Callable, List, Tuple
+
 import pytest
 
+from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
 from starkware.eth.eth_test_utils import EthContract, EthRevertException, EthAccount
-from solidity.utils import felt_to_str, load_contract, str_to_felt
+from solidity import felt252, test_contracts
+from solidity.utils import (
+    FeltConversionError,
+    felt_to_str,
+    felts_to_strs,
+    str_to_felt,
+    strs_to_felts,
+)
 
 
-FeltToStrTester = load_contract("FeltToStrTester")
 simple_str = "Wen Token?"
 too_long_text = 10 * "1234567890"
 
+FUZZ_SEED = 0
+FUZZ_INPUTS = 2000
+# The number of inputs evaluated in a single call.
+FUZZ_BATCH_SIZE = 200
+# Characters of 1 to 4 utf-8 bytes, so that byte and character lengths differ.
+FUZZ_ALPHABET = [chr(c) for c in range(0x20, 0x7F)] + ["\x00", "\x7f", "é", "€", "😀"]
+# Byte lengths around the short string limit, where truncation happens.
+EDGE_LENGTHS = [0, 1, 30, 31, 32, 33, 64]
+EDGE_STRINGS = [
+    "",
+    "\x00" * 31,
+    "\x00" * 32,
+    "a" * 31,
+    "a" * 32,
+    "é" * 15 + "a",  # 31 bytes.
+    "é" * 16,  # 32 bytes.
+    "a" * 30 + "é",  # safeToFelt truncates in the middle of a character.
+    "😀" * 8,  # 32 bytes.
+]
+EDGE_UINTS = [
+    0,
+    1,
+    DEFAULT_PRIME - 2,
+    DEFAULT_PRIME - 1,
+    DEFAULT_PRIME,
+    DEFAULT_PRIME + 1,
+    2**251,
+    2**252,
+    2**256 - 1,
+]
+
 
 @pytest.fixture(scope="session")
 def tester(governor: EthAccount) -> EthContract:
-    return governor.deploy(FeltToStrTester)
+    return governor.deploy(test_contracts.FeltToStrTester)
 
 
 def test_simple_string(tester):
@@ -34,3 +75,99 @@ def test_long_str(tester):
         too_long_text[:31]
     )
     assert felt_to_str(tester.testSafeStrToFelt.call(too_long_text)) == too_long_text[:31]
+
+
+def test_batch_conversion():
+    texts = [simple_str, "", too_long_text[:31]]
+    felts = strs_to_felts(texts)
+    assert felts == [str_to_felt(text) for text in texts]
+    assert felts_to_strs(felts) == texts
+
+
+def test_batch_conversion_reports_invalid_entries():
+    with pytest.raises(FeltConversionError) as error:
+        strs_to_felts([simple_str, too_long_text, "Wen Tokén?", too_long_text[:32]])
+    assert sorted(error.value.errors) == [1, 2, 3]
+
+    with pytest.raises(FeltConversionError) as error:
+        felts_to_strs([str_to_felt(simple_str), -1, DEFAULT_PRIME, 0xFF])
+    assert sorted(error.value.errors) == [1, 2, 3]
+
+
+def fuzz_strings() -> List[str]:
+    rng = random.Random(FUZZ_SEED)
+    strings = list(EDGE_STRINGS)
+    while len(strings) < FUZZ_INPUTS:
+        length = rng.choice(EDGE_LENGTHS) if rng.random() < 0.5 else rng.randint(0, 80)
+        strings.append("".join(rng.choices(FUZZ_ALPHABET, k=length)))
+    return strings
+
+
+def fuzz_uints() -> List[int]:
+    rng = random.Random(FUZZ_SEED)
+    uints = list(EDGE_UINTS)
+    while len(uints) < FUZZ_INPUTS:
+        if rng.random() < 0.5:
+            # Values around the prime.
+            uints.append(DEFAULT_PRIME + rng.randint(-(2**64), 2**64))
+        else:
+            uints.append(rng.getrandbits(rng.randint(0, 256)))
+    return uints
+
+
+def batches(values: list) -> List[list]:
+    return [values[i : i + FUZZ_BATCH_SIZE] for i in range(0, len(values), FUZZ_BATCH_SIZE)]
+
+
+def reference_to_felt(string: str) -> Tuple[int, bool]:
+    """
+    Returns the result of felt252.to_felt in the form of testStrToFeltBatch: (felt, reverted).
+    """
+    try:
+        return felt252.to_felt(string), False
+    except felt252.Felt252Revert:
+        return 0, True
+
+
+def assert_same_results(inputs: list, actual: list, expected: list):
+    assert len(actual) == len(expected)
+    mismatches = [
+        (value, actual_result, expected_result)
+        for value, actual_result, expected_result in zip(inputs, actual, expected)
+        if actual_result != expected_result
+    ]
+    assert mismatches == [], f"{len(mismatches)} mismatches, e.g. {mismatches[:5]}."
+
+
+def test_to_felt_fuzz(tester):
+    strings = fuzz_strings()
+    actual = []
+    for batch in batches(strings):
+        felts, reverted = tester.testStrToFeltBatch.call(batch)
+        actual.extend(zip(felts, reverted))
+    assert_same_results(strings, actual, [reference_to_felt(string) for string in strings])
+
+
+def test_safe_to_felt_fuzz(tester):
+    strings = fuzz_strings()
+    actual = [
+        felt for batch in batches(strings) for felt in tester.testSafeStrToFeltBatch.call(batch)
+    ]
+    assert_same_results(strings, actual, [felt252.safe_to_felt(string) for string in strings])
+
+
+@pytest.mark.parametrize(
+    "tester_function, reference",
+    [
+        ("testIsFeltBatch", felt252.is_felt),
+        ("testIsValidL2AddressBatch", felt252.is_valid_l2_address),
+    ],
+)
+def test_uint_felt_fuzz(tester, tester_function: str, reference: Callable[[int], bool]):
+    uints = fuzz_uints()
+    actual = [
+        result
+        for batch in batches(uints)
+        for result in getattr(tester, tester_function).call(batch)
+    ]
+    assert_same_results(uints, actual, [reference(value) for value in uints])
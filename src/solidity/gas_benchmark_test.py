@@ -0,0 +1,280 @@
+import fcntl
+import json
+import os
+from typing import Dict, Optional
+
+import pytest
+
+from starkware.eth.eth_test_utils import EthAccount, EthContract, EthReceipt, EthTestUtils
+from solidity.conftest import (
+    DAY_IN_SECONDS,
+    DEFAULT_DEPOSIT_FEE,
+    L2_TOKEN_CONTRACT,
+    MESSAGE_CANCEL_DELAY,
+    EthBridgeWrapper,
+    StarknetERC20BridgeWrapper,
+    StarknetTokenBridgeWrapper,
+    TokenBridgeWrapper,
+    register_l1_withdrawal,
+    register_l1_withdrawals,
+)
+
+GAS_BASELINE_FILE = os.path.join(os.path.dirname(__file__), "gas_baseline.json")
+# A benchmark fails when it uses more than this fraction of gas above its baseline.
+GAS_REGRESSION_THRESHOLD = 0.02
+
+BRIDGE_NAMES = {
+    StarknetTokenBridgeWrapper: "StarknetTokenBridge",
+    EthBridgeWrapper: "StarknetEthBridge",
+    StarknetERC20BridgeWrapper: "StarknetERC20Bridge",
+}
+MESSAGE_LENGTHS = [0, 1, 10, 100]
+
+L2_RECIPIENT = 37
+INITIAL_BRIDGE_BALANCE = 1000
+DEPOSIT_AMOUNT = 6
+WITHDRAW_AMOUNT = 3
+
+
+class GasBaseline:
+    """
+    Checks gas measurements against the committed baseline, or records them as the new baseline.
+    """
+
+    def __init__(self, path: str, update: bool):
+        self.path = path
+        self.update = update
+        with open(path) as baseline_file:
+            self.baseline: Dict[str, int] = json.load(baseline_file)
+
+    def check(self, name: str, gas_used: int):
+        if self.update:
+            self.record(name=name, gas_used=gas_used)
+            return
+
+        expected = self.baseline.get(name)
+        assert (
+            expected is not None
+        ), f"No gas baseline for {name}. Run with --update-gas-baseline to record it."
+        assert gas_used <= expected * (1 + GAS_REGRESSION_THRESHOLD), (
+            f"Gas regression in {name}: used {gas_used}, baseline is {expected} "
+            f"(threshold: {GAS_REGRESSION_THRESHOLD:.0%})."
+        )
+
+    def record(self, name: str, gas_used: int):
+        # Parallel workers update the same file, hence the read-modify-write under a lock.
+        with open(self.path, "r+") as baseline_file:
+            fcntl.flock(baseline_file, fcntl.LOCK_EX)
+            baseline = json.load(baseline_file)
+            baseline[name] = gas_used
+            baseline_file.seek(0)
+            baseline_file.truncate()
+            json.dump(baseline, baseline_file, indent=4, sort_keys=True)
+            baseline_file.write("\n")
+
+
+@pytest.fixture(scope="session")
+def gas_baseline(request) -> GasBaseline:
+    return GasBaseline(
+        path=GAS_BASELINE_FILE, update=request.config.getoption("--update-gas-baseline")
+    )
+
+
+def benchmark_name(
+    token_bridge_wrapper: TokenBridgeWrapper,
+    entry_point: str,
+    message_length: Optional[int] = None,
+    withdrawal_limit: Optional[bool] = None,
+) -> str:
+    name = f"{BRIDGE_NAMES[type(token_bridge_wrapper)]}.{entry_point}"
+    if message_length is not None:
+        name += f"[message_length={message_length}]"
+    if withdrawal_limit is not None:
+        name += f"[withdrawal_limit={'on' if withdrawal_limit else 'off'}]"
+    return name
+
+
+def gas_used(receipt: EthReceipt) -> int:
+    return receipt.w3_tx_receipt["gasUsed"]
+
+
+def setup_bridge(token_bridge_wrapper: TokenBridgeWrapper):
+    token_bridge_wrapper.set_bridge_balance(INITIAL_BRIDGE_BALANCE)
+    token_bridge_wrapper.contract.setL2TokenBridge.transact(L2_TOKEN_CONTRACT)
+
+
+def test_deposit_gas(token_bridge_wrapper: TokenBridgeWrapper, gas_baseline: GasBaseline):
+    setup_bridge(token_bridge_wrapper=token_bridge_wrapper)
+    receipt = token_bridge_wrapper.deposit(
+        amount=DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT, fee=DEFAULT_DEPOSIT_FEE
+    )
+    gas_baseline.check(benchmark_name(token_bridge_wrapper, "deposit"), gas_used(receipt))
+
+
+@pytest.mark.parametrize("message_length", MESSAGE_LENGTHS)
+def test_deposit_with_message_gas(
+    token_bridge_wrapper: TokenBridgeWrapper, gas_baseline: GasBaseline, message_length: int
+):
+    setup_bridge(token_bridge_wrapper=token_bridge_wrapper)
+    receipt = token_bridge_wrapper.deposit(
+        amount=DEPOSIT_AMOUNT,
+        l2_recipient=L2_RECIPIENT,
+        fee=DEFAULT_DEPOSIT_FEE,
+        message=list(range(1, message_length + 1)),
+    )
+    gas_baseline.check(
+        benchmark_name(token_bridge_wrapper, "depositWithMessage", message_length=message_length),
+        gas_used(receipt),
+    )
+
+
+@pytest.mark.parametrize("withdrawal_limit", [False, True])
+def test_withdraw_gas(
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+    gas_baseline: GasBaseline,
+    withdrawal_limit: bool,
+):
+    setup_bridge(token_bridge_wrapper=token_bridge_wrapper)
+    if withdrawal_limit:
+        token_bridge_wrapper.enable_withdrawal_limit()
+    register_l1_withdrawal(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amount=WITHDRAW_AMOUNT,
+    )
+    receipt = token_bridge_wrapper.withdraw(amount=WITHDRAW_AMOUNT)
+    gas_baseline.check(
+        benchmark_name(token_bridge_wrapper, "withdraw", withdrawal_limit=withdrawal_limit),
+        gas_used(receipt),
+    )
+
+
+def test_withdraw_next_day_gas(
+    eth_test_utils: EthTestUtils,
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+    gas_baseline: GasBaseline,
+):
+    """
+    Measures the first limited withdrawal of a day, after a withdrawal on a previous day (the
+    intraday quota is rolled over).
+    """
+    setup_bridge(token_bridge_wrapper=token_bridge_wrapper)
+    token_bridge_wrapper.enable_withdrawal_limit()
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=[WITHDRAW_AMOUNT, WITHDRAW_AMOUNT],
+    )
+    token_bridge_wrapper.withdraw(amount=WITHDRAW_AMOUNT)
+    eth_test_utils.advance_time(DAY_IN_SECONDS)
+    receipt = token_bridge_wrapper.withdraw(amount=WITHDRAW_AMOUNT)
+    gas_baseline.check(
+        benchmark_name(token_bridge_wrapper, "withdraw", withdrawal_limit=True) + "[next_day]",
+        gas_used(receipt),
+    )
+
+
+# The packed layout overwrites the slot of the previous day (a nonzero to nonzero SSTORE) instead
+# of filling a new (token, day) slot (a zero to nonzero SSTORE), which costs 17100 gas less.
+MIN_PACKED_QUOTA_SAVING = 15000
+
+
+def consume_withdraw_quota_next_day_gas(
+    eth_test_utils: EthTestUtils,
+    mock_erc20_contract: EthContract,
+    withdrawal_limit_tester: EthContract,
+    layout: str,
+) -> int:
+    """
+    Returns the gas of the first quota consumption of a day, after a consumption on a previous day,
+    in the legacy intraday quota layout (a slot per (token, day)) or in the packed one (a slot per
+    token).
+    """
+    consume = {
+        "legacy": withdrawal_limit_tester.consumeLegacyWithdrawQuota,
+        "packed": withdrawal_limit_tester.consumeWithdrawQuota,
+    }[layout]
+    mock_erc20_contract.setBalance.transact(withdrawal_limit_tester.address, INITIAL_BRIDGE_BALANCE)
+    consume.transact(mock_erc20_contract.address, WITHDRAW_AMOUNT)
+    eth_test_utils.advance_time(DAY_IN_SECONDS)
+    return gas_used(consume.transact(mock_erc20_contract.address, WITHDRAW_AMOUNT))
+
+
+@pytest.mark.parametrize("layout", ["legacy", "packed"])
+def test_consume_withdraw_quota_next_day_gas(
+    eth_test_utils: EthTestUtils,
+    mock_erc20_contract: EthContract,
+    withdrawal_limit_tester: EthContract,
+    gas_baseline: GasBaseline,
+    layout: str,
+):
+    gas_baseline.check(
+        f"WithdrawalLimit.consumeWithdrawQuota[next_day][layout={layout}]",
+        consume_withdraw_quota_next_day_gas(
+            eth_test_utils, mock_erc20_contract, withdrawal_limit_tester, layout=layout
+        ),
+    )
+
+
+def test_packed_quota_next_day_saving(
+    eth_test_utils: EthTestUtils,
+    mock_erc20_contract: EthContract,
+    withdrawal_limit_tester: EthContract,
+):
+    """
+    Checks the saving of the packed intraday quota layout directly, so that it does not depend on
+    a recorded baseline.
+    """
+    legacy_gas, packed_gas = (
+        consume_withdraw_quota_next_day_gas(
+            eth_test_utils, mock_erc20_contract, withdrawal_limit_tester, layout=layout
+        )
+        for layout in ("legacy", "packed")
+    )
+    assert (
+        legacy_gas - packed_gas >= MIN_PACKED_QUOTA_SAVING
+    ), f"The packed layout used {packed_gas} gas, the legacy layout used {legacy_gas}."
+
+
+@pytest.mark.parametrize("message_length", [None] + MESSAGE_LENGTHS)
+def test_deposit_cancel_and_reclaim_gas(
+    eth_test_utils: EthTestUtils,
+    token_bridge_wrapper: TokenBridgeWrapper,
+    gas_baseline: GasBaseline,
+    message_length: Optional[int],
+):
+    setup_bridge(token_bridge_wrapper=token_bridge_wrapper)
+    message = None if message_length is None else list(range(1, message_length + 1))
+    deposit_args = dict(amount=DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT, message=message)
+    deposit_receipt = token_bridge_wrapper.deposit(fee=DEFAULT_DEPOSIT_FEE, **deposit_args)
+    nonce = token_bridge_wrapper.get_deposit_nonce(deposit_receipt)
+
+    cancel_receipt = token_bridge_wrapper.deposit_cancel_request(nonce=nonce, **deposit_args)
+    eth_test_utils.advance_time(MESSAGE_CANCEL_DELAY)
+    reclaim_receipt = token_bridge_wrapper.deposit_reclaim(nonce=nonce, **deposit_args)
+
+    gas_baseline.check(
+        benchmark_name(token_bridge_wrapper, "depositCancelRequest", message_length=message_length),
+        gas_used(cancel_receipt),
+    )
+    gas_baseline.check(
+        benchmark_name(token_bridge_wrapper, "depositReclaim", message_length=message_length),
+        gas_used(reclaim_receipt),
+    )
+
+
+def test_enroll_token_bridge_gas(
+    governor: EthAccount,
+    manager_contract: EthContract,
+    bridge_contract: EthContract,
+    erc20_contract_address_list: list[str],
+    gas_baseline: GasBaseline,
+):
+    assert bridge_contract  # The manager enrolls tokens into the bridge.
+    receipt = manager_contract.enrollTokenBridge.transact(
+        erc20_contract_address_list[0],
+        transact_args={"from": governor, "value": DEFAULT_DEPOSIT_FEE},
+    )
+    gas_baseline.check("StarkgateManager.enrollTokenBridge", gas_used(receipt))
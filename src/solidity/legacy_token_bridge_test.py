@@ -13,11 +13,8 @@ from solidity.conftest import (
     L1_TOKEN_ADDRESS_OF_ETH,
     MAX_UINT,
     TOKEN_ADDRESS,
-    UpgradeAssistEIC,
-    StarknetTokenBridge,
-    StarknetEthBridge,
-    StarknetERC20Bridge,
 )
+from solidity import contracts
 from solidity.utils import load_contract, load_legacy_contract
 from starkware.starknet.services.api.messages import (
     StarknetMessageToL1,
@@ -45,17 +42,17 @@ MIN_FEE = 10**12
 
 @pytest.fixture(scope="session")
 def multi_bridge_impl(governor: EthAccount) -> EthContract:
-    return governor.deploy(StarknetTokenBridge)
+    return governor.deploy(contracts.StarknetTokenBridge)
 
 
 @pytest.fixture(scope="session")
 def compatible_eth_bridge_impl(governor: EthAccount) -> EthContract:
-    return governor.deploy(StarknetEthBridge)
+    return governor.deploy(contracts.StarknetEthBridge)
 
 
 @pytest.fixture(scope="session")
 def compatible_erc20_bridge_impl(governor: EthAccount) -> EthContract:
-    return governor.deploy(StarknetERC20Bridge)
+    return governor.deploy(contracts.StarknetERC20Bridge)
 
 
 @pytest.fixture(scope="session")
@@ -70,7 +67,7 @@ def legacy_eth_bridge_impl(governor: EthAccount) -> EthContract:
 
 @pytest.fixture(scope="session")
 def upgrade_eic(governor: EthAccount) -> EthContract:
-    return governor.deploy(UpgradeAssistEIC)
+    return governor.deploy(contracts.UpgradeAssistEIC)
 
 
 @pytest.fixture
@@ -1,8 +1,21 @@
-from solidity.utils import load_contract
+from solidity.utils import artifacts
 
-StarknetTokenBridgeTester = load_contract("StarknetTokenBridgeTester")
-StarknetEthBridgeTester = load_contract("StarknetEthBridgeTester")
-StarknetERC20BridgeTester = load_contract("StarknetERC20BridgeTester")
-SelfRemoveTester = load_contract("SelfRemoveTester")
-StarkgateRegistry = load_contract("StarkgateRegistry")
-FeeTester = load_contract("TestFees")
+# Maps the contracts exported by this module to their artifact names.
+CONTRACT_ARTIFACTS = {
+    "StarknetTokenBridgeTester": "StarknetTokenBridgeTester",
+    "StarknetEthBridgeTester": "StarknetEthBridgeTester",
+    "StarknetERC20BridgeTester": "StarknetERC20BridgeTester",
+    "SelfRemoveTester": "SelfRemoveTester",
+    "StarkgateRegistry": "StarkgateRegistry",
+    "FeeTester": "TestFees",
+    "FeltToStrTester": "FeltToStrTester",
+    "BulkMockStarknetMessaging": "BulkMockStarknetMessaging",
+    "WithdrawalLimitTester": "TestWithdrawalLimit",
+}
+
+
+def __getattr__(name: str) -> dict:
+    # The artifacts are loaded on first access rather than on import.
+    if name in CONTRACT_ARTIFACTS:
+        return artifacts.load(CONTRACT_ARTIFACTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
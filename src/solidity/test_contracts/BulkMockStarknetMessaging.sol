@@ -0,0 +1,32 @@
+// SPDX-License-Identifier: Apache-2.0.
+pragma solidity ^0.8.20;
+
+import "starkware/starknet/testing/MockStarknetMessaging.sol";
+
+contract BulkMockStarknetMessaging is MockStarknetMessaging {
+    constructor(uint256 MessageCancellationDelay) MockStarknetMessaging(MessageCancellationDelay) {}
+
+    /**
+      Mocks many messages from L2 to L1 in a single transaction, all from fromAddress to toAddress.
+      payloads is the concatenation of the message payloads, each of payloadLength words.
+    */
+    function mockSendMessagesFromL2(
+        uint256 fromAddress,
+        uint256 toAddress,
+        uint256 payloadLength,
+        uint256[] calldata payloads
+    ) external {
+        require(payloadLength > 0, "INVALID_PAYLOAD_LENGTH");
+        require(payloads.length % payloadLength == 0, "INVALID_PAYLOADS_LENGTH");
+        uint256[] memory payload = new uint256[](payloadLength);
+        for (uint256 offset = 0; offset < payloads.length; offset += payloadLength) {
+            for (uint256 i = 0; i < payloadLength; i++) {
+                payload[i] = payloads[offset + i];
+            }
+            bytes32 msgHash = keccak256(
+                abi.encodePacked(fromAddress, toAddress, payloadLength, payload)
+            );
+            l2ToL1Messages()[msgHash] += 1;
+        }
+    }
+}
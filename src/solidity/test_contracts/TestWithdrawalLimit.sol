@@ -0,0 +1,28 @@
+// SPDX-License-Identifier: Apache-2.0.
+pragma solidity ^0.8.20;
+
+import "src/solidity/WithdrawalLimit.sol";
+
+/**
+  Exposes the intraday quota consumption of WithdrawalLimit, next to a copy of the legacy one (a
+  slot per (token, day)), so that the gas of the two storage layouts can be compared.
+*/
+contract TestWithdrawalLimit {
+    constructor() {
+        WithdrawalLimit.setWithdrawLimitPct(WithdrawalLimit.DEFAULT_WITHDRAW_LIMIT_PCT);
+    }
+
+    function consumeWithdrawQuota(address token, uint256 amount) external {
+        WithdrawalLimit.consumeWithdrawQuota(token, amount);
+    }
+
+    function consumeLegacyWithdrawQuota(address token, uint256 amount) external {
+        bytes32 key = WithdrawalLimit.withdrawQuotaKey(token);
+        uint256 storedQuota = WithdrawalLimit.intradayQuota()[key];
+        uint256 intradayAllowance = storedQuota == 0
+            ? WithdrawalLimit.calculateIntradayAllowance(token)
+            : storedQuota - WithdrawalLimit.OFFSET;
+        require(intradayAllowance >= amount, "EXCEEDS_GLOBAL_WITHDRAW_LIMIT");
+        WithdrawalLimit.intradayQuota()[key] = intradayAllowance - amount + WithdrawalLimit.OFFSET;
+    }
+}
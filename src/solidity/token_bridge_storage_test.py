@@ -4,11 +4,7 @@ import pytest
 
 from starkware.eth.eth_test_utils import EthContract, EthTestUtils
 from starkware.python.utils import from_bytes
-from solidity.test_contracts import (
-    StarknetTokenBridgeTester,
-    StarknetEthBridgeTester,
-    StarknetERC20BridgeTester,
-)
+from solidity import test_contracts
 
 
 LAYOUT_SIZE = 0
@@ -16,19 +12,19 @@ LAYOUT_SIZE = 0
 
 @pytest.fixture(scope="session")
 def eth_tester(eth_test_utils: EthTestUtils) -> EthContract:
-    contract = eth_test_utils.accounts[0].deploy(StarknetEthBridgeTester)
+    contract = eth_test_utils.accounts[0].deploy(test_contracts.StarknetEthBridgeTester)
     return contract
 
 
 @pytest.fixture(scope="session")
 def erc20_tester(eth_test_utils: EthTestUtils) -> EthContract:
-    contract = eth_test_utils.accounts[0].deploy(StarknetERC20BridgeTester)
+    contract = eth_test_utils.accounts[0].deploy(test_contracts.StarknetERC20BridgeTester)
     return contract
 
 
 @pytest.fixture(scope="session")
 def token_tester(eth_test_utils: EthTestUtils) -> EthContract:
-    contract = eth_test_utils.accounts[0].deploy(StarknetTokenBridgeTester)
+    contract = eth_test_utils.accounts[0].deploy(test_contracts.StarknetTokenBridgeTester)
     return contract
 
 
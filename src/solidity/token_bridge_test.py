@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
@@ -10,18 +12,39 @@ from solidity.conftest import (
     DEFAULT_DEPOSIT_FEE,
     DAY_IN_SECONDS,
     L2_TOKEN_CONTRACT,
+    MAX_BATCH_SIZE,
     MAX_UINT,
     HANDLE_TOKEN_DEPOSIT_SELECTOR,
     HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR,
+    HANDLE_DEPOSIT_BATCH_SELECTOR,
     HANDLE_TOKEN_DEPLOYMENT_SELECTOR,
     TOKEN_ADDRESS,
+    register_l1_withdrawal,
+    register_l1_withdrawals,
+    register_l1_withdrawal_batch,
+    withdrawal_batch_message_payload,
+    withdrawal_message_payload,
 )
 
+from solidity.bridge_event_index import BridgeEventIndex
+from solidity.deposit_reconciliation import (
+    DEPOSIT_HANDLED_KEY,
+    ReconciliationStatus,
+    l1_deposits_from_index,
+    merge_reconcile,
+    parse_l2_deposit_event,
+)
+from solidity.withdrawal_limit import WithdrawalLimit, WithdrawalLimitRevert
+from solidity.deposit_messages import (
+    DepositMessage,
+    deposit_batch_message_payload,
+    deposit_message_hashes,
+    l1_to_l2_message_hash,
+)
 from starkware.starknet.services.api.messages import (
     StarknetMessageToL1,
     StarknetMessageToL2,
 )
-from starkware.starknet.testing.contracts import MockStarknetMessaging
 from starkware.starknet.public.abi import get_selector_from_name
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
@@ -40,41 +63,6 @@ MESSAGE_CANCEL_DELAY = 1000
 DEFAULT_WITHDRAW_LIMIT_PCT = 5
 
 
-@pytest.fixture
-def messaging_contract(eth_test_utils: EthTestUtils) -> EthContract:
-    return eth_test_utils.accounts[0].deploy(MockStarknetMessaging, MESSAGE_CANCEL_DELAY)
-
-
-@pytest.fixture(params=[StarknetTokenBridgeWrapper, EthBridgeWrapper, StarknetERC20BridgeWrapper])
-def token_bridge_wrapper(
-    request,
-    messaging_contract: EthContract,
-    eth_test_utils: EthTestUtils,
-    registry_contract: EthContract,
-) -> TokenBridgeWrapper:
-    return request.param(
-        messaging_contract=messaging_contract,
-        registry_contract=registry_contract,
-        eth_test_utils=eth_test_utils,
-    )
-
-
-def register_l1_withdrawal(
-    token_bridge_wrapper: TokenBridgeWrapper, messaging_contract: EthContract, withdraw_amount: int
-):
-    messaging_contract.mockSendMessageFromL2.transact(
-        L2_TOKEN_CONTRACT,
-        int(token_bridge_wrapper.contract.address, 16),
-        [
-            WITHDRAW,
-            int(token_bridge_wrapper.default_user.address, 16),
-            int(token_bridge_wrapper.token_address(), 16),
-            withdraw_amount % 2**128,
-            withdraw_amount // 2**128,
-        ],
-    )
-
-
 def setup_contracts(
     token_bridge_wrapper: TokenBridgeWrapper,
     initial_bridge_balance: int = INITIAL_BRIDGE_BALANCE,
@@ -93,6 +81,7 @@ def test_selectors():
         get_selector_from_name("handle_deposit_with_message")
         == HANDLE_DEPOSIT_WITH_MESSAGE_SELECTOR
     )
+    assert get_selector_from_name("handle_deposit_batch") == HANDLE_DEPOSIT_BATCH_SELECTOR
     assert get_selector_from_name("handle_token_deployment") == HANDLE_TOKEN_DEPLOYMENT_SELECTOR
 
 
@@ -280,6 +269,76 @@ def test_positive_flow(
     assert eth_test_utils.get_balance(messaging_contract.address) == fee * 2
 
 
+def test_pipelined_deposits_and_withdrawals(
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+    eth_test_utils: EthTestUtils,
+):
+    fee = DEFAULT_DEPOSIT_FEE
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper, initial_bridge_balance=0)
+    default_user = token_bridge_wrapper.default_user
+    initial_user_balance = token_bridge_wrapper.get_account_balance(default_user)
+    amounts = [HALF_DEPOSIT_AMOUNT, DEPOSIT_AMOUNT, HALF_DEPOSIT_AMOUNT]
+
+    deposit_results = token_bridge_wrapper.deposit_many(
+        amounts=amounts,
+        l2_recipients=[L2_RECIPIENT] * len(amounts),
+        fee=fee,
+        messages=[None, MESSAGE, None],
+    )
+    assert all(result.succeeded for result in deposit_results)
+    assert token_bridge_wrapper.get_bridge_balance() == sum(amounts)
+    assert eth_test_utils.get_balance(messaging_contract.address) == fee * len(amounts)
+    total_costs = sum(result.cost for result in deposit_results)
+
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=amounts,
+    )
+    withdrawal_results = token_bridge_wrapper.withdraw_many(amounts=amounts)
+    assert all(result.succeeded for result in withdrawal_results)
+    total_costs += sum(result.cost for result in withdrawal_results)
+
+    assert token_bridge_wrapper.get_bridge_balance() == 0
+    assert token_bridge_wrapper.get_account_balance(default_user) == (
+        initial_user_balance - total_costs
+    )
+
+
+def test_bulk_withdrawal_registration(
+    token_bridge_wrapper: TokenBridgeWrapper, messaging_contract: EthContract
+):
+    n_withdrawals = 2000
+    amounts = [1, 2, 3, 4]
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=[amounts[i % len(amounts)] for i in range(n_withdrawals)],
+    )
+
+    expected_count = n_withdrawals // len(amounts)
+    message_hashes = [
+        StarknetMessageToL1(
+            from_address=L2_TOKEN_CONTRACT,
+            to_address=int(token_bridge_wrapper.contract.address, 16),
+            payload=withdrawal_message_payload(
+                recipient=token_bridge_wrapper.default_user.address,
+                token=token_bridge_wrapper.token_address(),
+                amount=amount,
+            ),
+        ).get_hash()
+        for amount in amounts
+    ]
+    for message_hash in message_hashes:
+        assert messaging_contract.l2ToL1Messages.call(message_hash) == expected_count
+
+    # The registered messages are consumed by withdraw.
+    token_bridge_wrapper.withdraw(amount=amounts[0])
+    assert messaging_contract.l2ToL1Messages.call(message_hashes[0]) == expected_count - 1
+
+
 def test_deposit_events(token_bridge_wrapper: TokenBridgeWrapper):
     fee = DEFAULT_DEPOSIT_FEE
     deposit_filter = token_bridge_wrapper.contract.w3_contract.events.Deposit.createFilter(
@@ -355,6 +414,111 @@ def test_withdraw_events(token_bridge_wrapper: TokenBridgeWrapper, messaging_con
     assert len(deposit_with_message_filter.get_new_entries()) == 0
 
 
+def test_bridge_event_index(token_bridge_wrapper: TokenBridgeWrapper, messaging_contract, tmp_path):
+    fee = DEFAULT_DEPOSIT_FEE
+    user = token_bridge_wrapper.default_user.address
+    token = token_bridge_wrapper.token_address()
+    index = BridgeEventIndex(
+        path=str(tmp_path / "events.db"),
+        w3=token_bridge_wrapper.w3,
+        bridge_address=token_bridge_wrapper.contract.address,
+        bridge_abi=token_bridge_wrapper.contract.w3_contract.abi,
+        start_block=token_bridge_wrapper.w3.eth.block_number,
+        block_chunk_size=2,
+    )
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    token_bridge_wrapper.deposit(amount=HALF_DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT, fee=fee)
+    assert index.catch_up() == 1
+
+    token_bridge_wrapper.deposit(
+        amount=HALF_DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT + 1, message=MESSAGE, fee=fee
+    )
+    register_l1_withdrawal(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amount=WITHDRAW_AMOUNT,
+    )
+    token_bridge_wrapper.withdraw(amount=WITHDRAW_AMOUNT)
+    # Only the blocks after the last indexed one are fetched.
+    assert index.catch_up() == 2
+    assert index.catch_up() == 0
+    assert index.last_indexed_block == token_bridge_wrapper.w3.eth.block_number
+
+    deposits = index.deposits(token=token, depositor=user)
+    assert [(deposit.event, deposit.nonce) for deposit in deposits] == [
+        ("Deposit", 0),
+        ("DepositWithMessage", 1),
+    ]
+    assert all(deposit.amount == HALF_DEPOSIT_AMOUNT and deposit.fee == fee for deposit in deposits)
+    (with_message,) = index.deposits(l2_recipient=L2_RECIPIENT + 1)
+    assert with_message.message == MESSAGE and with_message.nonce == 1
+    assert index.deposits(nonce=0)[0].message is None
+
+    # A batch is indexed as a deposit per recipient, with the nonce of its message.
+    token_bridge_wrapper.deposit_batch(
+        amounts=BATCH_AMOUNTS, l2_recipients=BATCH_L2_RECIPIENTS, fee=fee
+    )
+    assert index.catch_up() == len(BATCH_AMOUNTS)
+    batch = index.deposits(nonce=2)
+    assert [
+        (deposit.event, deposit.batch_index, deposit.amount, deposit.l2_recipient, deposit.fee)
+        for deposit in batch
+    ] == [
+        ("DepositBatch", i, amount, l2_recipient, fee if i == 0 else 0)
+        for i, (amount, l2_recipient) in enumerate(zip(BATCH_AMOUNTS, BATCH_L2_RECIPIENTS))
+    ]
+    assert all(deposit.sender == user.lower() and deposit.message is None for deposit in batch)
+    assert index.deposits(depositor=token_bridge_wrapper.non_default_user.address) == []
+
+    (withdrawal,) = index.withdrawals(token=token, recipient=user)
+    assert withdrawal.amount == WITHDRAW_AMOUNT
+    index.close()
+
+
+def test_deposit_reconciliation(token_bridge_wrapper: TokenBridgeWrapper, tmp_path):
+    fee = DEFAULT_DEPOSIT_FEE
+    w3 = token_bridge_wrapper.w3
+    index = BridgeEventIndex(
+        path=str(tmp_path / "events.db"),
+        w3=w3,
+        bridge_address=token_bridge_wrapper.contract.address,
+        bridge_abi=token_bridge_wrapper.contract.w3_contract.abi,
+        start_block=w3.eth.block_number,
+    )
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    token_bridge_wrapper.deposit(amount=HALF_DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT, fee=fee)
+    token_bridge_wrapper.deposit(
+        amount=HALF_DEPOSIT_AMOUNT, l2_recipient=L2_RECIPIENT, message=MESSAGE, fee=fee
+    )
+    index.catch_up()
+    handled_deposit, unhandled_deposit = l1_deposits_from_index(index)
+    # The L2 events of the L1 handler transactions of the first deposit, as token_bridge.cairo
+    # emits them.
+    l2_deposits = [
+        parse_l2_deposit_event(
+            keys=[DEPOSIT_HANDLED_KEY, handled_deposit.token, L2_RECIPIENT],
+            data=[HALF_DEPOSIT_AMOUNT, 0],
+            nonce=handled_deposit.nonce,
+            timestamp=handled_deposit.timestamp + 1,
+        )
+    ]
+    reconciliations = list(
+        merge_reconcile(
+            l1_deposits=l1_deposits_from_index(index),
+            l2_deposits=l2_deposits,
+            as_of=unhandled_deposit.timestamp,
+        )
+    )
+    assert [
+        (reconciliation.status, reconciliation.nonce) for reconciliation in reconciliations
+    ] == [
+        (ReconciliationStatus.MATCHED, 0),
+        (ReconciliationStatus.PENDING, 1),
+    ]
+    assert unhandled_deposit.message == tuple(MESSAGE)
+    index.close()
+
+
 def test_set_values_events(token_bridge_wrapper: TokenBridgeWrapper):
     w3_events = token_bridge_wrapper.contract.w3_contract.events
     l2_token_bridge_filter = w3_events.SetL2TokenBridge.createFilter(fromBlock="latest")
@@ -418,6 +582,25 @@ def test_deposit_message_sent_consumed(
 
     assert messaging_contract.l1ToL2Messages.call(l1_to_l2_msg_2.get_hash()) == fee + 1
 
+    # The same hashes, computed offline from the deposits.
+    offline_hashes = deposit_message_hashes(
+        [
+            DepositMessage(
+                from_address=token_bridge_wrapper.contract.address,
+                to_address=L2_TOKEN_CONTRACT,
+                token=token_bridge_wrapper.token_address(),
+                depositor=depositor,
+                l2_recipient=L2_RECIPIENT,
+                amount=HALF_DEPOSIT_AMOUNT,
+                nonce=nonce,
+                message=message,
+            )
+            for nonce, message in [(0, None), (1, MESSAGE)]
+        ]
+    )
+    for offline_hash in offline_hashes:
+        assert messaging_contract.l1ToL2Messages.call(offline_hash) == fee + 1
+
     deposit_msg_params = (
         l1_to_l2_msg_1.from_address,
         l1_to_l2_msg_1.to_address,
@@ -578,6 +761,163 @@ def test_withdraw_old_format(token_bridge_wrapper: TokenBridgeWrapper, messaging
             token_bridge_wrapper.withdraw(amount=WITHDRAW_AMOUNT)
 
 
+def test_withdraw_batch(token_bridge_wrapper: TokenBridgeWrapper, messaging_contract):
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    default_user = token_bridge_wrapper.default_user
+    non_default_user = token_bridge_wrapper.non_default_user
+    amounts = [WITHDRAW_AMOUNT, 1, 2]
+    recipients = [non_default_user, default_user, non_default_user]
+    register_l1_withdrawal_batch(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=amounts,
+        recipients=[recipient.address for recipient in recipients],
+    )
+    l2_to_l1_msg = StarknetMessageToL1(
+        from_address=L2_TOKEN_CONTRACT,
+        to_address=int(token_bridge_wrapper.contract.address, 16),
+        payload=withdrawal_batch_message_payload(
+            recipients=[recipient.address for recipient in recipients],
+            token=token_bridge_wrapper.token_address(),
+            amounts=amounts,
+        ),
+    )
+    assert messaging_contract.l2ToL1Messages.call(l2_to_l1_msg.get_hash()) == 1
+
+    # The batch is consumed as a unit.
+    with pytest.raises(EthRevertException, match="INVALID_MESSAGE_TO_CONSUME"):
+        token_bridge_wrapper.withdraw_batch(amounts=amounts[:2], recipients=recipients[:2])
+    with pytest.raises(EthRevertException, match="BATCH_LENGTH_MISMATCH"):
+        token_bridge_wrapper.withdraw_batch(amounts=amounts[:2], recipients=recipients)
+
+    initial_user_balance = token_bridge_wrapper.get_account_balance(non_default_user)
+    tx_receipt = token_bridge_wrapper.withdraw_batch(amounts=amounts, recipients=recipients)
+    assert messaging_contract.l2ToL1Messages.call(l2_to_l1_msg.get_hash()) == 0
+    assert token_bridge_wrapper.get_bridge_balance() == INITIAL_BRIDGE_BALANCE - sum(amounts)
+    assert token_bridge_wrapper.get_account_balance(non_default_user) == (
+        initial_user_balance + amounts[0] + amounts[2]
+    )
+    assert token_bridge_wrapper.contract.get_events(tx=tx_receipt, name="Withdrawal") == [
+        {
+            "recipient": recipient.address,
+            "token": token_bridge_wrapper.token_address(),
+            "amount": amount,
+        }
+        for recipient, amount in zip(recipients, amounts)
+    ]
+
+    with pytest.raises(EthRevertException, match="INVALID_MESSAGE_TO_CONSUME"):
+        token_bridge_wrapper.withdraw_batch(amounts=amounts, recipients=recipients)
+
+
+def test_withdraw_batch_limit(token_bridge_wrapper: TokenBridgeWrapper, messaging_contract):
+    """
+    Checks that the quota of a batch withdrawal is its total amount.
+    """
+    initial_bridge_balance = 100
+    setup_contracts(
+        token_bridge_wrapper=token_bridge_wrapper,
+        initial_bridge_balance=initial_bridge_balance,
+    )
+    token_bridge_wrapper.enable_withdrawal_limit()
+    limit_withdraw_amount = initial_bridge_balance * DEFAULT_WITHDRAW_LIMIT_PCT // 100
+    recipients = [token_bridge_wrapper.non_default_user] * 2
+    for amounts in ([limit_withdraw_amount, 1], [limit_withdraw_amount - 1, 1]):
+        register_l1_withdrawal_batch(
+            token_bridge_wrapper=token_bridge_wrapper,
+            messaging_contract=messaging_contract,
+            withdraw_amounts=amounts,
+            recipients=[recipient.address for recipient in recipients],
+        )
+
+    with pytest.raises(EthRevertException, match="EXCEEDS_GLOBAL_WITHDRAW_LIMIT"):
+        token_bridge_wrapper.withdraw_batch(
+            amounts=[limit_withdraw_amount, 1], recipients=recipients
+        )
+    token_bridge_wrapper.withdraw_batch(
+        amounts=[limit_withdraw_amount - 1, 1], recipients=recipients
+    )
+    assert token_bridge_wrapper.get_remaining_intraday_allowance() == 0
+
+
+def test_withdraw_batch_too_large(token_bridge_wrapper: TokenBridgeWrapper):
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    n_withdrawals = MAX_BATCH_SIZE + 1
+    with pytest.raises(EthRevertException, match="BATCH_TOO_LARGE"):
+        token_bridge_wrapper.withdraw_batch(
+            amounts=[1] * n_withdrawals,
+            recipients=[token_bridge_wrapper.non_default_user] * n_withdrawals,
+        )
+
+
+def test_withdraw_batch_failed_transfer(
+    token_bridge_wrapper: TokenBridgeWrapper, messaging_contract
+):
+    """
+    Checks that a withdrawal of a batch whose transfer fails is deferred, without failing the rest
+    of the batch, and that it can be claimed later.
+    """
+    # The bridge can cover only the first withdrawal, so the transfer of the second one fails.
+    amounts = [WITHDRAW_AMOUNT, 1]
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper, initial_bridge_balance=amounts[0])
+    default_user = token_bridge_wrapper.default_user
+    non_default_user = token_bridge_wrapper.non_default_user
+    recipients = [default_user, non_default_user]
+    register_l1_withdrawal_batch(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=amounts,
+        recipients=[recipient.address for recipient in recipients],
+    )
+
+    token = token_bridge_wrapper.token_address()
+    initial_user_balance = token_bridge_wrapper.get_account_balance(non_default_user)
+    tx_receipt = token_bridge_wrapper.withdraw_batch(amounts=amounts, recipients=recipients)
+    assert token_bridge_wrapper.get_bridge_balance() == 0
+    assert token_bridge_wrapper.get_account_balance(non_default_user) == initial_user_balance
+    assert token_bridge_wrapper.contract.get_events(tx=tx_receipt, name="Withdrawal") == [
+        {"recipient": default_user.address, "token": token, "amount": amounts[0]}
+    ]
+    assert token_bridge_wrapper.contract.get_events(tx=tx_receipt, name="WithdrawalDeferred") == [
+        {"recipient": non_default_user.address, "token": token, "amount": amounts[1]}
+    ]
+    assert (
+        token_bridge_wrapper.contract.getDeferredWithdrawal.call(token, non_default_user.address)
+        == amounts[1]
+    )
+
+    # Only the bridge may transfer a withdrawal of a batch.
+    with pytest.raises(EthRevertException, match="ONLY_SELF"):
+        token_bridge_wrapper.contract.transferOutBatchWithdrawal.transact(
+            token, amounts[1], default_user.address
+        )
+    # The claim fails as long as the transfer does.
+    with pytest.raises(EthRevertException):
+        token_bridge_wrapper.contract.claimDeferredWithdrawal.transact(
+            token, non_default_user.address
+        )
+
+    token_bridge_wrapper.set_bridge_balance(amounts[1])
+    tx_receipt = token_bridge_wrapper.contract.claimDeferredWithdrawal.transact(
+        token, non_default_user.address
+    )
+    assert token_bridge_wrapper.get_bridge_balance() == 0
+    assert token_bridge_wrapper.get_account_balance(non_default_user) == (
+        initial_user_balance + amounts[1]
+    )
+    assert token_bridge_wrapper.contract.get_events(tx=tx_receipt, name="Withdrawal") == [
+        {"recipient": non_default_user.address, "token": token, "amount": amounts[1]}
+    ]
+    assert (
+        token_bridge_wrapper.contract.getDeferredWithdrawal.call(token, non_default_user.address)
+        == 0
+    )
+    with pytest.raises(EthRevertException, match="NO_DEFERRED_WITHDRAWAL"):
+        token_bridge_wrapper.contract.claimDeferredWithdrawal.transact(
+            token, non_default_user.address
+        )
+
+
 def test_limit_withdrawal(
     eth_test_utils: EthTestUtils, token_bridge_wrapper: TokenBridgeWrapper, messaging_contract
 ):
@@ -615,17 +955,16 @@ def test_limit_withdrawal(
     )
 
     # Setup the withdraw messages.
-    for withdraw_amount in [
-        first_withdraw_amount,
-        second_withdraw_amount,
-        second_day_limit_withdraw_amount,
-        balance_after_second_day_withdraw,
-    ]:
-        register_l1_withdrawal(
-            token_bridge_wrapper=token_bridge_wrapper,
-            messaging_contract=messaging_contract,
-            withdraw_amount=withdraw_amount,
-        )
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=[
+            first_withdraw_amount,
+            second_withdraw_amount,
+            second_day_limit_withdraw_amount,
+            balance_after_second_day_withdraw,
+        ],
+    )
 
     # Check that the limit withdrawal mechanism is disabled by default.
     assert token_bridge_wrapper.get_remaining_intraday_allowance() == MAX_UINT
@@ -667,6 +1006,100 @@ def test_limit_withdrawal(
     assert token_bridge_wrapper.get_bridge_balance() == 0
 
 
+PACKED_INTRADAY_QUOTA_TAG = "WITHDRAWL_LIMIT_PACKED_INTRADAY_QUOTA_SLOT_TAG"
+QUOTA_BITS = 224
+
+
+def test_withdrawal_limit_packed_slot(
+    eth_test_utils: EthTestUtils, token_bridge_wrapper: TokenBridgeWrapper, messaging_contract
+):
+    """
+    Checks that the intraday quota of a token is kept in a single slot, as (day + 1, quota), which
+    is overwritten when the day changes.
+    """
+    initial_bridge_balance = 100
+    setup_contracts(
+        token_bridge_wrapper=token_bridge_wrapper,
+        initial_bridge_balance=initial_bridge_balance,
+    )
+    token_bridge_wrapper.enable_withdrawal_limit()
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=[1, 1],
+    )
+    w3 = eth_test_utils.w3
+    mapping_slot = w3.keccak(text=PACKED_INTRADAY_QUOTA_TAG)
+    token = bytes.fromhex(token_bridge_wrapper.token_address()[2:])
+    quota_slot = int.from_bytes(w3.keccak(token.rjust(32, b"\0") + mapping_slot), "big")
+
+    balance = initial_bridge_balance
+    for _ in range(2):
+        receipt = token_bridge_wrapper.withdraw(amount=1)
+        day = w3.eth.get_block(receipt.w3_tx_receipt["blockNumber"]).timestamp // DAY_IN_SECONDS
+        quota = balance * DEFAULT_WITHDRAW_LIMIT_PCT // 100 - 1
+        packed_quota = w3.eth.get_storage_at(token_bridge_wrapper.contract.address, quota_slot)
+        assert int.from_bytes(packed_quota, "big") == ((day + 1) << QUOTA_BITS) | quota
+        assert token_bridge_wrapper.get_remaining_intraday_allowance() == quota
+        balance -= 1
+        eth_test_utils.advance_time(DAY_IN_SECONDS)
+
+
+def test_withdrawal_limit_model(
+    eth_test_utils: EthTestUtils, token_bridge_wrapper: TokenBridgeWrapper, messaging_contract
+):
+    """
+    Validates the withdrawal limit model (solidity/withdrawal_limit.py) against the bridge on a few
+    sampled days of random deposits and withdrawals.
+    """
+    rng = random.Random(0)
+    n_days, n_operations_per_day = 3, 6
+    balance = 1000
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper, initial_bridge_balance=balance)
+    token_bridge_wrapper.enable_withdrawal_limit()
+    withdraw_amounts = [rng.randint(1, 30) for _ in range(n_days * n_operations_per_day)]
+    register_l1_withdrawals(
+        token_bridge_wrapper=token_bridge_wrapper,
+        messaging_contract=messaging_contract,
+        withdraw_amounts=withdraw_amounts,
+    )
+    model = WithdrawalLimit(withdraw_limit_pct=DEFAULT_WITHDRAW_LIMIT_PCT)
+    token = token_bridge_wrapper.token_address()
+    amounts = iter(withdraw_amounts)
+    for _ in range(n_days):
+        # Skip to the middle of a later day, so that all the operations happen in the same day.
+        now = token_bridge_wrapper.w3.eth.get_block("latest").timestamp
+        eth_test_utils.advance_time(
+            (now // DAY_IN_SECONDS + rng.randint(1, 30)) * DAY_IN_SECONDS
+            + DAY_IN_SECONDS // 2
+            - now
+        )
+        now = token_bridge_wrapper.w3.eth.get_block("latest").timestamp
+        for _ in range(n_operations_per_day):
+            if rng.random() < 0.3:
+                amount = rng.randint(1, 100)
+                token_bridge_wrapper.deposit(
+                    amount=amount, l2_recipient=L2_RECIPIENT, fee=DEFAULT_DEPOSIT_FEE
+                )
+                balance += amount
+            else:
+                amount = next(amounts)
+                try:
+                    model.consume_withdraw_quota(
+                        token=token, amount=amount, timestamp=now, balance=balance
+                    )
+                except WithdrawalLimitRevert as revert:
+                    with pytest.raises(EthRevertException, match=str(revert)):
+                        token_bridge_wrapper.withdraw(amount=amount)
+                else:
+                    token_bridge_wrapper.withdraw(amount=amount)
+                    balance -= amount
+            assert token_bridge_wrapper.get_bridge_balance() == balance
+            assert token_bridge_wrapper.get_remaining_intraday_allowance() == (
+                model.get_remaining_intraday_allowance(token=token, timestamp=now, balance=balance)
+            )
+
+
 def test_deposit_invalid_l2_recipient(token_bridge_wrapper: TokenBridgeWrapper, fee: int):
     setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
     with pytest.raises(EthRevertException, match="L2_ADDRESS_OUT_OF_RANGE"):
@@ -1042,6 +1475,140 @@ def test_cancel_deposit_with_message(
         )
 
 
+BATCH_AMOUNTS = [DEPOSIT_AMOUNT, HALF_DEPOSIT_AMOUNT, 1]
+BATCH_L2_RECIPIENTS = [L2_RECIPIENT, L2_RECIPIENT + 1, L2_RECIPIENT]
+
+
+def test_deposit_batch(
+    eth_test_utils: EthTestUtils,
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+):
+    fee = DEFAULT_DEPOSIT_FEE
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper, initial_bridge_balance=0)
+    default_user = token_bridge_wrapper.default_user
+    initial_user_balance = token_bridge_wrapper.get_account_balance(default_user)
+
+    tx_receipt = token_bridge_wrapper.deposit_batch(
+        amounts=BATCH_AMOUNTS, l2_recipients=BATCH_L2_RECIPIENTS, fee=fee
+    )
+    assert token_bridge_wrapper.get_bridge_balance() == sum(BATCH_AMOUNTS)
+    assert token_bridge_wrapper.get_account_balance(default_user) == initial_user_balance - sum(
+        BATCH_AMOUNTS
+    ) - token_bridge_wrapper.get_tx_cost(tx_receipt)
+
+    assert token_bridge_wrapper.contract.get_events(tx=tx_receipt, name="DepositBatch")[-1] == {
+        "sender": default_user.address,
+        "token": token_bridge_wrapper.token_address(),
+        "amounts": BATCH_AMOUNTS,
+        "l2Recipients": BATCH_L2_RECIPIENTS,
+        "nonce": 0,
+        "fee": fee,
+    }
+
+    # The whole batch is sent as a single message, paying the fee once.
+    payload = deposit_batch_message_payload(
+        token=token_bridge_wrapper.token_address(),
+        depositor=default_user.address,
+        amounts=BATCH_AMOUNTS,
+        l2_recipients=BATCH_L2_RECIPIENTS,
+    )
+    assert payload[:6] == [
+        int(token_bridge_wrapper.token_address(), 16),
+        int(default_user.address, 16),
+        len(BATCH_AMOUNTS),
+        L2_RECIPIENT,
+        DEPOSIT_AMOUNT,
+        0,
+    ]
+    msg_hash = l1_to_l2_message_hash(
+        from_address=token_bridge_wrapper.contract.address,
+        to_address=L2_TOKEN_CONTRACT,
+        nonce=0,
+        selector=HANDLE_DEPOSIT_BATCH_SELECTOR,
+        payload=payload,
+    )
+    assert messaging_contract.l1ToL2Messages.call(msg_hash) == fee + 1
+    assert eth_test_utils.get_balance(messaging_contract.address) == fee
+
+
+def test_deposit_batch_invalid(token_bridge_wrapper: TokenBridgeWrapper):
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper)
+    for amounts, l2_recipients, error_message in [
+        ([1, 2], [L2_RECIPIENT], "BATCH_LENGTH_MISMATCH"),
+        ([], [], "EMPTY_BATCH"),
+        ([1, 0], [L2_RECIPIENT, L2_RECIPIENT], "ZERO_DEPOSIT"),
+        ([1, 2], [L2_RECIPIENT, DEFAULT_PRIME], "L2_ADDRESS_OUT_OF_RANGE"),
+        ([1] * (MAX_BATCH_SIZE + 1), [L2_RECIPIENT] * (MAX_BATCH_SIZE + 1), "BATCH_TOO_LARGE"),
+    ]:
+        with pytest.raises(EthRevertException, match=error_message):
+            token_bridge_wrapper.deposit_batch(
+                amounts=amounts, l2_recipients=l2_recipients, fee=DEFAULT_DEPOSIT_FEE
+            )
+
+
+def test_cancel_deposit_batch(
+    eth_test_utils: EthTestUtils,
+    token_bridge_wrapper: TokenBridgeWrapper,
+    messaging_contract: EthContract,
+):
+    fee = DEFAULT_DEPOSIT_FEE
+    amounts = BATCH_AMOUNTS[:2]
+    l2_recipients = BATCH_L2_RECIPIENTS[:2]
+    setup_contracts(token_bridge_wrapper=token_bridge_wrapper, initial_bridge_balance=0)
+    bridge = token_bridge_wrapper.contract
+    depositor = token_bridge_wrapper.default_user.address
+    token_bridge_wrapper.deposit_batch(amounts=amounts, l2_recipients=l2_recipients, fee=fee)
+
+    # The batch is cancelled as a unit; a part of it is not a message.
+    with pytest.raises(EthRevertException, match="NO_MESSAGE_TO_CANCEL"):
+        token_bridge_wrapper.deposit_batch_cancel_request(
+            amounts=amounts[:1], l2_recipients=l2_recipients[:1], nonce=0
+        )
+    tx_receipt = token_bridge_wrapper.deposit_batch_cancel_request(
+        amounts=amounts, l2_recipients=l2_recipients, nonce=0
+    )
+    batch_event = {
+        "sender": depositor,
+        "token": token_bridge_wrapper.token_address(),
+        "amounts": amounts,
+        "l2Recipients": l2_recipients,
+        "nonce": 0,
+    }
+    assert bridge.get_events(tx=tx_receipt, name="DepositBatchCancelRequest")[-1] == batch_event
+    msg_cancel_req_ev = messaging_contract.get_events(
+        tx=tx_receipt, name="MessageToL2CancellationStarted"
+    )[-1]
+    assert msg_cancel_req_ev["selector"] == HANDLE_DEPOSIT_BATCH_SELECTOR
+    assert msg_cancel_req_ev["payload"] == deposit_batch_message_payload(
+        token=token_bridge_wrapper.token_address(),
+        depositor=depositor,
+        amounts=amounts,
+        l2_recipients=l2_recipients,
+    )
+
+    with pytest.raises(EthRevertException, match="MESSAGE_CANCELLATION_NOT_ALLOWED_YET"):
+        token_bridge_wrapper.deposit_batch_reclaim(
+            amounts=amounts, l2_recipients=l2_recipients, nonce=0
+        )
+
+    # Reclaim the whole batch successfully.
+    eth_test_utils.advance_time(MESSAGE_CANCEL_DELAY)
+    tx_receipt = token_bridge_wrapper.deposit_batch_reclaim(
+        amounts=amounts, l2_recipients=l2_recipients, nonce=0
+    )
+    assert bridge.get_events(tx=tx_receipt, name="DepositBatchReclaimed")[-1] == batch_event
+
+    # Deposit funds are returned, fee is not.
+    assert token_bridge_wrapper.get_bridge_balance() == 0
+    assert eth_test_utils.get_balance(messaging_contract.address) == fee
+
+    with pytest.raises(EthRevertException, match="NO_MESSAGE_TO_CANCEL"):
+        token_bridge_wrapper.deposit_batch_reclaim(
+            amounts=amounts, l2_recipients=l2_recipients, nonce=0
+        )
+
+
 def test_deactivate(
     bridge_contract: EthContract,
 ):
@@ -1,28 +1,188 @@
 import json
+import mmap
+import numbers
 import os
+import struct
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Point to the ROOT_DIRECTORY_OF_THE_PROJECT/artifacts.
 ARTIFACTS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "artifacts")
 LEGACY_ARTIFACTS = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
     "starkware/solidity/test_contracts/legacy_artifacts",
 )
+ARTIFACTS_BUNDLE = os.path.join(ARTIFACTS, "artifacts.bundle")
+# See scripts/extract_artifacts.py for the bundle format.
+BUNDLE_MAGIC = b"SGBUNDL1"
+ARTIFACT_HASHES_FILE_NAME = "artifact_hashes.json"
+
+
+class ArtifactBundle:
+    """
+    A single-file artifacts bundle, produced by scripts/extract_artifacts.py --output_bundle.
+    The bundle is memory-mapped: opening it only parses its index, and load() decodes only the
+    requested contract.
+    """
+
+    def __init__(self, path: str):
+        self.mtime = os.stat(path).st_mtime_ns
+        with open(path, "rb") as bundle_file:
+            self._mmap = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        assert (
+            self._mmap[: len(BUNDLE_MAGIC)] == BUNDLE_MAGIC
+        ), f"{path} is not an artifacts bundle."
+        (index_size,) = struct.unpack_from(">Q", self._mmap, len(BUNDLE_MAGIC))
+        index_offset = len(BUNDLE_MAGIC) + 8
+        self.index: Dict[str, dict] = json.loads(
+            self._mmap[index_offset : index_offset + index_size]
+        )
+        self._data_offset = index_offset + index_size
+
+    def _read(self, location: list) -> bytes:
+        offset, size = location
+        start = self._data_offset + offset
+        return self._mmap[start : start + size]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def is_current(self, name: str, hashes: Dict[str, str]) -> bool:
+        """
+        Returns whether the bundled artifact matches the extracted one with the given hashes.
+        """
+        entry = self.index.get(name)
+        return (
+            entry is not None
+            and entry.get("hash") is not None
+            and entry["hash"] == hashes.get(name)
+        )
+
+    def load(self, name: str) -> dict:
+        entry = self.index[name]
+        return {
+            "contractName": name,
+            "abi": json.loads(self._read(entry["abi"])),
+            "bytecode": (
+                None if entry["bytecode"] is None else "0x" + self._read(entry["bytecode"]).hex()
+            ),
+        }
+
+    def close(self):
+        self._mmap.close()
+
+
+class ArtifactStore:
+    """
+    A lazy registry of the contract jsons in an artifacts directory.
+    An artifact is parsed on first access (artifacts.load("Proxy") or simply artifacts.Proxy), and
+    is kept in memory for later accesses, until its file is modified (i.e. rebuilt).
+    Only the max_size most recently used artifacts are kept in memory.
+    If bundle_path points to an existing artifacts bundle, the artifacts it contains are read from
+    it rather than from their json files, unless they were extracted again since the bundle was
+    written (per the artifact hashes of the directory).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "",
+        max_size: int = 64,
+        bundle_path: Optional[str] = None,
+    ):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_size = max_size
+        self.bundle_path = bundle_path
+        self._bundle: Optional[ArtifactBundle] = None
+        # The modification time and the content of the artifact hashes file.
+        self._hashes: Optional[Tuple[int, Dict[str, str]]] = None
+        # Maps an artifact name to the file it was read from, the modification time of that file
+        # and the parsed artifact.
+        self._cache: "OrderedDict[str, Tuple[str, int, dict]]" = OrderedDict()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}{name}.json")
+
+    def bundle(self) -> Optional[ArtifactBundle]:
+        """
+        Returns the artifacts bundle (remapped if it was rebuilt), or None if there is none.
+        """
+        if self.bundle_path is None or not os.path.exists(self.bundle_path):
+            return None
+        if self._bundle is None or self._bundle.mtime != os.stat(self.bundle_path).st_mtime_ns:
+            if self._bundle is not None:
+                self._bundle.close()
+            self._bundle = ArtifactBundle(self.bundle_path)
+        return self._bundle
+
+    def artifact_hashes(self) -> Dict[str, str]:
+        """
+        Returns the hashes of the extracted artifacts (reloaded if they were extracted again), or an
+        empty dict if the directory has no hashes file.
+        """
+        path = os.path.join(self.directory, ARTIFACT_HASHES_FILE_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if self._hashes is None or self._hashes[0] != mtime:
+            with open(path) as hashes_file:
+                self._hashes = (mtime, json.load(hashes_file))
+        return self._hashes[1]
+
+    def load(self, name: str) -> dict:
+        bundle = self.bundle()
+        if bundle is not None and bundle.is_current(name, hashes=self.artifact_hashes()):
+            path, mtime = self.bundle_path, bundle.mtime
+        else:
+            path = self.path(name)
+            mtime = os.stat(path).st_mtime_ns
+        cached = self._cache.get(name)
+        if cached is not None and cached[:2] == (path, mtime):
+            self._cache.move_to_end(name)
+            return cached[2]
+
+        if path == self.bundle_path:
+            artifact = bundle.load(name)
+        else:
+            with open(path) as artifact_file:
+                artifact = json.load(artifact_file)
+        self._cache[name] = (path, mtime, artifact)
+        self._cache.move_to_end(name)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return artifact
+
+    def __getattr__(self, name: str) -> dict:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.load(name)
+
+
+artifacts = ArtifactStore(directory=ARTIFACTS, bundle_path=ARTIFACTS_BUNDLE)
+legacy_artifacts = ArtifactStore(directory=LEGACY_ARTIFACTS, prefix="legacy_")
 
 
 def load_contract(name: str) -> dict:
     """
     Loads a contract json from the artifacts directory.
     """
-    return json.load(open(f"{ARTIFACTS}/{name}.json"))
+    return artifacts.load(name)
 
 
 def load_legacy_contract(name: str) -> dict:
     """
-    Loads a contract json from the artifacts directory.
+    Loads a contract json from the legacy artifacts directory.
     """
-    return json.load(open(f"{LEGACY_ARTIFACTS}/legacy_{name}.json"))
+    return legacy_artifacts.load(name)
 
 
 def str_to_felt(short_text: str) -> int:
@@ -37,3 +197,84 @@ def felt_to_str(felt: int) -> str:
     # Find "real" length to truncate leading zeros.
     _len = ((-len_bits) % BYTE_LEN + len_bits) // 8
     return felt.to_bytes(_len, "big").decode(encoding="ascii")
+
+
+# Every 31-byte string fits in a felt. A 32-byte one fits only if it is smaller than the prime.
+MAX_SAFE_SHORT_STRING_LENGTH = 31
+PRIME_BYTE_LENGTH = (DEFAULT_PRIME.bit_length() + 7) // 8
+
+
+class FeltConversionError(ValueError):
+    """
+    Raised by the batch felt conversions, with the error of every invalid entry by its index.
+    """
+
+    def __init__(self, errors: Dict[int, str]):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} invalid entries: "
+            + ", ".join(f"[{index}]: {error}" for index, error in errors.items())
+        )
+
+
+def _batch_result(values, results: list, errors: Dict[int, str]):
+    if len(errors) > 0:
+        raise FeltConversionError(errors)
+    if np is not None and isinstance(values, np.ndarray):
+        array = np.empty(len(results), dtype=object)
+        array[:] = results
+        return array.reshape(values.shape)
+    return results
+
+
+def strs_to_felts(
+    short_texts: Union[Iterable[str], "np.ndarray"]
+) -> Union[List[int], "np.ndarray"]:
+    """
+    Batch version of str_to_felt. Accepts a list or a NumPy object array of strings, and returns
+    the felts in the same form.
+    Raises a FeltConversionError that lists every invalid string, rather than the first one.
+    """
+    values = (
+        short_texts.ravel()
+        if np is not None and isinstance(short_texts, np.ndarray)
+        else short_texts
+    )
+    felts: List[int] = []
+    errors: Dict[int, str] = {}
+    for index, short_text in enumerate(values):
+        try:
+            text_bytes = short_text.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            errors[index] = f"{short_text!r} is not an ascii string"
+            continue
+        felt = int.from_bytes(text_bytes, "big")
+        # Only strings as long as the prime may be out of range, so only they are compared.
+        if len(text_bytes) > MAX_SAFE_SHORT_STRING_LENGTH and (
+            len(text_bytes) > PRIME_BYTE_LENGTH or felt >= DEFAULT_PRIME
+        ):
+            errors[index] = f"{short_text} is too long"
+            continue
+        felts.append(felt)
+    return _batch_result(short_texts, felts, errors)
+
+
+def felts_to_strs(felts: Union[Iterable[int], "np.ndarray"]) -> Union[List[str], "np.ndarray"]:
+    """
+    Batch version of felt_to_str. Accepts a list or a NumPy object array of felts, and returns the
+    strings in the same form.
+    Raises a FeltConversionError that lists every invalid felt, rather than the first one.
+    """
+    values = felts.ravel() if np is not None and isinstance(felts, np.ndarray) else felts
+    short_texts: List[str] = []
+    errors: Dict[int, str] = {}
+    for index, felt in enumerate(values):
+        if not isinstance(felt, numbers.Integral) or not 0 <= felt < DEFAULT_PRIME:
+            errors[index] = f"{felt!r} is not a felt"
+            continue
+        felt = int(felt)
+        try:
+            short_texts.append(felt.to_bytes((felt.bit_length() + 7) // 8, "big").decode("ascii"))
+        except UnicodeDecodeError:
+            errors[index] = f"{felt} is not an ascii string"
+    return _batch_result(felts, short_texts, errors)
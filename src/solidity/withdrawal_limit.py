@@ -0,0 +1,224 @@
+"""
+A Python model of the daily withdrawal limit of the bridges: WithdrawalLimit.sol on L1, and the
+withdrawal quota of token_bridge.cairo on L2, and a simulator that replays deposit and withdrawal
+traces to evaluate candidate limit percentages.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SECONDS_IN_DAY = 86400
+DEFAULT_WITHDRAW_LIMIT_PCT = 5
+# Stored quotas are offset by 1, to distinguish between an unset quota and a quota of 0.
+OFFSET = 1
+EXCEEDS_GLOBAL_WITHDRAW_LIMIT = "EXCEEDS_GLOBAL_WITHDRAW_LIMIT"
+LIMIT_EXCEEDED = "LIMIT_EXCEEDED"
+LIMIT_PCT_TOO_HIGH = "LIMIT_PCT_TOO_HIGH"
+# Above that, the simulator keeps balances as Python integers rather than as int64.
+MAX_INT64 = 2**63 - 1
+
+
+class WithdrawalLimitRevert(Exception):
+    """
+    Models a revert of the withdrawal limit. The message is the revert reason.
+    """
+
+
+def quota_key(token: str, timestamp: int) -> Tuple[str, int]:
+    # The quota is keyed by (token, day). On L1, a single slot per token holds the quota of the
+    # latest day, which is equivalent as only the quota of the current day is read.
+    return token, timestamp // SECONDS_IN_DAY
+
+
+class WithdrawalLimit:
+    """
+    A model of WithdrawalLimit.sol. The balance of the bridge is given to every call, as the
+    contract reads it live.
+    """
+
+    revert_reason = EXCEEDS_GLOBAL_WITHDRAW_LIMIT
+
+    def __init__(self, withdraw_limit_pct: int = DEFAULT_WITHDRAW_LIMIT_PCT):
+        self.withdraw_limit_pct = withdraw_limit_pct
+        # Offset-encoded remaining quotas, by quota_key.
+        self.intraday_quota: Dict[Tuple[str, int], int] = {}
+
+    def calculate_intraday_allowance(self, balance: int) -> int:
+        return balance * self.withdraw_limit_pct // 100
+
+    def get_remaining_intraday_allowance(self, token: str, timestamp: int, balance: int) -> int:
+        stored_quota = self.intraday_quota.get(quota_key(token=token, timestamp=timestamp), 0)
+        if stored_quota == 0:
+            return self.calculate_intraday_allowance(balance=balance)
+        return stored_quota - OFFSET
+
+    def consume_withdraw_quota(self, token: str, amount: int, timestamp: int, balance: int):
+        intraday_allowance = self.get_remaining_intraday_allowance(
+            token=token, timestamp=timestamp, balance=balance
+        )
+        if intraday_allowance < amount:
+            raise WithdrawalLimitRevert(self.revert_reason)
+        self.intraday_quota[quota_key(token=token, timestamp=timestamp)] = (
+            intraday_allowance - amount + OFFSET
+        )
+
+
+class L2WithdrawalQuota(WithdrawalLimit):
+    """
+    A model of the withdrawal quota of token_bridge.cairo. The quota is a percentage of the total
+    supply of the L2 token, rather than of the bridge balance.
+    """
+
+    revert_reason = LIMIT_EXCEEDED
+
+    def __init__(self, daily_withdrawal_limit_pct: int = DEFAULT_WITHDRAW_LIMIT_PCT):
+        if daily_withdrawal_limit_pct > 100:
+            raise WithdrawalLimitRevert(LIMIT_PCT_TOO_HIGH)
+        super().__init__(withdraw_limit_pct=daily_withdrawal_limit_pct)
+
+    def get_remaining_withdrawal_quota(self, l2_token: str, timestamp: int, total_supply: int):
+        return self.get_remaining_intraday_allowance(
+            token=l2_token, timestamp=timestamp, balance=total_supply
+        )
+
+    def consume_withdrawal_quota(
+        self, l2_token: str, amount_to_withdraw: int, timestamp: int, total_supply: int
+    ):
+        self.consume_withdraw_quota(
+            token=l2_token, amount=amount_to_withdraw, timestamp=timestamp, balance=total_supply
+        )
+
+
+class BridgeTrace(NamedTuple):
+    """
+    The deposits and withdrawals of a single token, sorted by timestamp.
+    For an L2 trace, deposits mint and withdrawals burn, so the balance is the total supply.
+    """
+
+    timestamps: Sequence[int]
+    amounts: Sequence[int]
+    is_withdrawal: Sequence[bool]
+
+    @classmethod
+    def from_events(cls, events: Iterable[Tuple[int, int, bool]]) -> "BridgeTrace":
+        """
+        Builds a trace from (timestamp, amount, is_withdrawal) events.
+        """
+        events = sorted(events, key=lambda event: event[0])
+        return cls(
+            timestamps=[event[0] for event in events],
+            amounts=[event[1] for event in events],
+            is_withdrawal=[event[2] for event in events],
+        )
+
+
+class SimulationResult(NamedTuple):
+    limit_pcts: List[int]
+    # blocked[i][j] is set if the j-th withdrawal of the trace is blocked with limit_pcts[i].
+    blocked: Sequence[Sequence[bool]]
+    n_blocked: List[int]
+    blocked_amount: List[int]
+
+    def report(self) -> str:
+        lines = [f"{'limit pct':>9} {'blocked':>9} {'blocked amount':>40}"]
+        lines += [
+            f"{pct:>9} {n_blocked:>9} {amount:>40}"
+            for pct, n_blocked, amount in zip(self.limit_pcts, self.n_blocked, self.blocked_amount)
+        ]
+        return "\n".join(lines)
+
+
+def _simulate_scalar(
+    trace: BridgeTrace, limit_pct: int, initial_balance: int, token: str = "token"
+) -> List[bool]:
+    limit = WithdrawalLimit(withdraw_limit_pct=limit_pct)
+    balance = initial_balance
+    blocked = []
+    for timestamp, amount, is_withdrawal in zip(*trace):
+        if not is_withdrawal:
+            balance += amount
+            continue
+        try:
+            limit.consume_withdraw_quota(
+                token=token, amount=amount, timestamp=timestamp, balance=balance
+            )
+        except WithdrawalLimitRevert:
+            blocked.append(True)
+            continue
+        balance -= amount
+        blocked.append(False)
+    return blocked
+
+
+def _simulate_vectorized(
+    trace: BridgeTrace, limit_pcts: Sequence[int], initial_balance: int
+) -> "np.ndarray":
+    # Deposits are always accepted, so they are accumulated up front. The withdrawals are replayed
+    # in order (a blocked withdrawal doesn't change the balance), vectorized over the candidate
+    # percentages.
+    is_withdrawal = np.asarray(trace.is_withdrawal, dtype=bool)
+    amounts = np.asarray(trace.amounts, dtype=object)
+    deposits_before = np.cumsum(np.where(is_withdrawal, 0, amounts))[is_withdrawal]
+    max_balance = initial_balance + (deposits_before[-1] if len(deposits_before) > 0 else 0)
+    max_amount = max(amounts[is_withdrawal], default=0)
+    # Bounds the intermediate values: the allowance, and the withdrawn amount plus a withdrawal.
+    max_value = max(max_balance * max(limit_pcts, default=0), max_balance + max_amount)
+    dtype = np.int64 if max_value <= MAX_INT64 else object
+    days = np.asarray(trace.timestamps)[is_withdrawal] // SECONDS_IN_DAY
+    new_day = np.concatenate([[True], days[1:] != days[:-1]])
+
+    pcts = np.array(limit_pcts, dtype=dtype)
+    withdrawn = np.zeros(len(pcts), dtype=dtype)
+    remaining = np.zeros(len(pcts), dtype=dtype)
+    # Whether a withdrawal already succeeded today, i.e., the quota of the day is stored.
+    initialized = np.zeros(len(pcts), dtype=bool)
+    blocked = np.zeros((len(pcts), len(days)), dtype=bool)
+    for i, (amount, deposited, is_new_day) in enumerate(
+        zip(amounts[is_withdrawal].tolist(), deposits_before.tolist(), new_day.tolist())
+    ):
+        if is_new_day:
+            initialized[:] = False
+        balance = initial_balance + deposited - withdrawn
+        allowance = np.where(initialized, remaining, balance * pcts // 100)
+        allowed = allowance >= amount
+        remaining = np.where(allowed, allowance - amount, remaining)
+        withdrawn = np.where(allowed, withdrawn + amount, withdrawn)
+        initialized |= allowed
+        blocked[:, i] = ~allowed
+    return blocked
+
+
+def simulate_withdrawal_limits(
+    trace: BridgeTrace, limit_pcts: Sequence[int], initial_balance: int
+) -> SimulationResult:
+    """
+    Replays the trace with every candidate limit percentage and returns the withdrawals that would
+    have been blocked. Blocked withdrawals are dropped, as the contract reverts them.
+    Uses NumPy when available.
+    """
+    limit_pcts = list(limit_pcts)
+    if np is not None:
+        blocked = _simulate_vectorized(
+            trace=trace, limit_pcts=limit_pcts, initial_balance=initial_balance
+        ).tolist()
+    else:
+        blocked = [
+            _simulate_scalar(trace=trace, limit_pct=pct, initial_balance=initial_balance)
+            for pct in limit_pcts
+        ]
+    withdrawal_amounts = [
+        amount for amount, is_withdrawal in zip(trace.amounts, trace.is_withdrawal) if is_withdrawal
+    ]
+    return SimulationResult(
+        limit_pcts=limit_pcts,
+        blocked=blocked,
+        n_blocked=[sum(row) for row in blocked],
+        blocked_amount=[
+            sum(amount for amount, is_blocked in zip(withdrawal_amounts, row) if is_blocked)
+            for row in blocked
+        ],
+    )
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from solidity import withdrawal_limit
+from solidity.withdrawal_limit import (
+    EXCEEDS_GLOBAL_WITHDRAW_LIMIT,
+    LIMIT_EXCEEDED,
+    LIMIT_PCT_TOO_HIGH,
+    OFFSET,
+    SECONDS_IN_DAY,
+    BridgeTrace,
+    L2WithdrawalQuota,
+    WithdrawalLimit,
+    WithdrawalLimitRevert,
+    _simulate_scalar,
+    simulate_withdrawal_limits,
+)
+
+TOKEN = "0x0000000000000000000000000000000000123456"
+N_DAYS = 90
+LIMIT_PCTS = [1, 2, 5, 10, 20, 100]
+
+
+def random_trace(rng: random.Random, amount_bits: int) -> BridgeTrace:
+    events = []
+    for day in range(N_DAYS):
+        for _ in range(rng.randint(0, 20)):
+            timestamp = day * SECONDS_IN_DAY + rng.randrange(SECONDS_IN_DAY)
+            events.append((timestamp, rng.getrandbits(amount_bits), rng.random() < 0.5))
+    return BridgeTrace.from_events(events)
+
+
+def test_withdrawal_limit_model():
+    limit = WithdrawalLimit()
+    assert limit.get_remaining_intraday_allowance(token=TOKEN, timestamp=0, balance=100) == 5
+    limit.consume_withdraw_quota(token=TOKEN, amount=5, timestamp=0, balance=100)
+    # A quota of 0 is stored as OFFSET, so it is not recalculated from the balance.
+    assert limit.intraday_quota == {(TOKEN, 0): OFFSET}
+    assert limit.get_remaining_intraday_allowance(token=TOKEN, timestamp=1, balance=1000) == 0
+    with pytest.raises(WithdrawalLimitRevert, match=EXCEEDS_GLOBAL_WITHDRAW_LIMIT):
+        limit.consume_withdraw_quota(token=TOKEN, amount=1, timestamp=1, balance=1000)
+    # The quota is reset every day.
+    assert (
+        limit.get_remaining_intraday_allowance(token=TOKEN, timestamp=SECONDS_IN_DAY, balance=95)
+        == 4
+    )
+
+
+def test_l2_withdrawal_quota_model():
+    quota = L2WithdrawalQuota(daily_withdrawal_limit_pct=10)
+    assert quota.get_remaining_withdrawal_quota(l2_token=TOKEN, timestamp=0, total_supply=100) == 10
+    quota.consume_withdrawal_quota(
+        l2_token=TOKEN, amount_to_withdraw=4, timestamp=0, total_supply=100
+    )
+    assert quota.get_remaining_withdrawal_quota(l2_token=TOKEN, timestamp=0, total_supply=96) == 6
+    with pytest.raises(WithdrawalLimitRevert, match=LIMIT_EXCEEDED):
+        quota.consume_withdrawal_quota(
+            l2_token=TOKEN, amount_to_withdraw=7, timestamp=0, total_supply=96
+        )
+    with pytest.raises(WithdrawalLimitRevert, match=LIMIT_PCT_TOO_HIGH):
+        L2WithdrawalQuota(daily_withdrawal_limit_pct=101)
+
+
+@pytest.mark.parametrize(
+    "trace, initial_balance",
+    [
+        (random_trace(rng=random.Random(32), amount_bits=32), 2**36),
+        (random_trace(rng=random.Random(200), amount_bits=200), 2**204),
+        # The balance fits in int64, but a withdrawal amount doesn't.
+        (BridgeTrace.from_events([(0, 2**70, True), (1, 1, True)]), 100),
+    ],
+    ids=["int64", "uint256", "large_amount"],
+)
+def test_simulation_matches_model(trace: BridgeTrace, initial_balance: int):
+    """
+    Checks the simulator against the model, both with int64 values and with uint256 ones.
+    """
+    result = simulate_withdrawal_limits(
+        trace=trace, limit_pcts=LIMIT_PCTS, initial_balance=initial_balance
+    )
+    for pct, blocked in zip(LIMIT_PCTS, result.blocked):
+        assert blocked == _simulate_scalar(
+            trace=trace, limit_pct=pct, initial_balance=initial_balance
+        )
+    assert 0 < result.n_blocked[0] < len(result.blocked[0])
+    assert len(result.report().splitlines()) == len(LIMIT_PCTS) + 1
+
+
+def test_simulation_without_numpy(monkeypatch):
+    trace = random_trace(rng=random.Random(0), amount_bits=32)
+    expected = simulate_withdrawal_limits(
+        trace=trace, limit_pcts=LIMIT_PCTS, initial_balance=2**36
+    )
+    monkeypatch.setattr(withdrawal_limit, "np", None)
+    assert (
+        simulate_withdrawal_limits(trace=trace, limit_pcts=LIMIT_PCTS, initial_balance=2**36)
+        == expected
+    )
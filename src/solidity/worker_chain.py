@@ -0,0 +1,60 @@
+import fcntl
+import os
+from contextlib import ExitStack, contextmanager
+from typing import Iterator
+
+import pytest
+from starkware.eth.eth_test_utils import EthTestUtils
+
+MASTER_WORKER_ID = "master"
+# The balance every account of a local chain starts with, regardless of the node defaults.
+ACCOUNT_BALANCE = 10**21
+
+
+def worker_id() -> str:
+    """
+    Returns the id of the current pytest-xdist worker (e.g. "gw0"), or "master" when the tests
+    run in a single process.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", MASTER_WORKER_ID)
+
+
+def shared_tmp_dir(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """
+    Returns a temporary directory shared by all the workers of the current pytest run.
+    """
+    base_tmp = tmp_path_factory.getbasetemp()
+    # pytest-xdist places the base temp directory of each worker under a common run directory.
+    return str(base_tmp if worker_id() == MASTER_WORKER_ID else base_tmp.parent)
+
+
+@contextmanager
+def chain_startup_lock(lock_dir: str) -> Iterator[None]:
+    """
+    Serializes local chain startups across the workers of a run, so that two nodes never pick the
+    same free port.
+    """
+    with open(os.path.join(lock_dir, "eth_chain_startup.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def fund_accounts(eth_test_utils: EthTestUtils, balance: int = ACCOUNT_BALANCE):
+    for account in eth_test_utils.accounts:
+        eth_test_utils.set_account_balance(address=account.address, balance=balance)
+
+
+@contextmanager
+def worker_eth_test_utils(lock_dir: str) -> Iterator[EthTestUtils]:
+    """
+    Starts a local chain dedicated to the current worker, with a deterministically funded account
+    set, and stops it on exit.
+    """
+    with ExitStack() as stack:
+        with chain_startup_lock(lock_dir=lock_dir):
+            eth_test_utils = stack.enter_context(EthTestUtils.context_manager())
+        fund_accounts(eth_test_utils=eth_test_utils)
+        yield eth_test_utils